@@ -0,0 +1,66 @@
+"""mssql adaptive batch sizing."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+# The most a batch is allowed to grow or shrink after one write
+BATCH_SIZE_MAX_STEP: float = 2.0
+
+
+@dataclass
+class AdaptiveBatchSize:
+    """Pick a batch size from how fast the last batches were written.
+
+    After each write the rows per second are used to work out how many
+    rows would take `target_seconds` to write.  The size moves toward that
+    number by at most a factor of two per batch, stays between `min_rows`
+    and `max_rows`, and is capped so a batch of rows the size of the last
+    ones stays under `max_bytes`.
+    """
+
+    size: int
+    min_rows: int
+    max_rows: int
+    target_seconds: float
+    max_bytes: int
+
+    def __post_init__(self) -> None:
+        """Keep the starting size inside the bounds."""
+        self.size = self.clamp(self.size)
+
+    def clamp(self, size: float) -> int:
+        """Return a size inside the configured bounds.
+
+        Args:
+            size: A proposed batch size.
+
+        Returns:
+            The size limited to min_rows and max_rows.
+        """
+        return int(max(self.min_rows, min(self.max_rows, size)))
+
+    def observe(self, rows: int, seconds: float, batch_bytes: int) -> int:
+        """Record a write and work out the next batch size.
+
+        Args:
+            rows: The number of rows written.
+            seconds: How long the write took, commit included.
+            batch_bytes: Roughly how much memory the batch took.
+
+        Returns:
+            The new batch size.
+        """
+        if rows <= 0 or seconds <= 0:
+            return self.size
+
+        wanted = rows / seconds * self.target_seconds
+        wanted = max(
+            self.size / BATCH_SIZE_MAX_STEP,
+            min(self.size * BATCH_SIZE_MAX_STEP, wanted),
+        )
+        if batch_bytes > 0:
+            wanted = min(wanted, self.max_bytes / (batch_bytes / rows))
+
+        self.size = self.clamp(wanted)
+        return self.size
@@ -0,0 +1,402 @@
+"""mssql catalog metadata cache, which saves reflecting every table."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import typing as t
+from pathlib import Path
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.mssql.base import ischema_names
+
+if t.TYPE_CHECKING:
+    import logging
+
+CATALOG_CACHE_VERSION: int = 2
+CATALOG_STALE_ID_LIMIT: int = 1000
+
+OBJECTS_QUERY: str = """
+SELECT s.name AS schema_name,
+       o.name AS table_name,
+       o.object_id,
+       CONVERT(varchar(33), o.modify_date, 126) AS modify_date
+FROM sys.schemas AS s
+LEFT JOIN sys.objects AS o
+    ON o.schema_id = s.schema_id
+   AND o.type = 'U'
+"""
+
+COLUMNS_QUERY: str = """
+SELECT o.object_id,
+       s.name AS schema_name,
+       o.name AS table_name,
+       CONVERT(varchar(33), o.modify_date, 126) AS modify_date,
+       c.column_id,
+       c.name AS column_name,
+       TYPE_NAME(c.user_type_id) AS type_name,
+       TYPE_NAME(c.system_type_id) AS base_type_name,
+       c.max_length,
+       c.precision,
+       c.scale,
+       c.is_nullable,
+       c.collation_name,
+       CAST(CASE WHEN ic.column_id IS NULL THEN 0 ELSE 1 END AS bit) AS is_primary_key,
+       c.is_identity,
+       CAST(idc.seed_value AS bigint) AS identity_seed,
+       CAST(idc.increment_value AS bigint) AS identity_increment,
+       dc.definition AS default_definition,
+       cc.definition AS computed_definition
+FROM sys.objects AS o
+JOIN sys.schemas AS s
+    ON s.schema_id = o.schema_id
+JOIN sys.columns AS c
+    ON c.object_id = o.object_id
+LEFT JOIN sys.indexes AS i
+    ON i.object_id = o.object_id
+   AND i.is_primary_key = 1
+LEFT JOIN sys.index_columns AS ic
+    ON ic.object_id = i.object_id
+   AND ic.index_id = i.index_id
+   AND ic.column_id = c.column_id
+LEFT JOIN sys.identity_columns AS idc
+    ON idc.object_id = c.object_id
+   AND idc.column_id = c.column_id
+LEFT JOIN sys.default_constraints AS dc
+    ON dc.object_id = c.default_object_id
+LEFT JOIN sys.computed_columns AS cc
+    ON cc.object_id = c.object_id
+   AND cc.column_id = c.column_id
+WHERE o.type = 'U'
+"""
+
+
+def catalog_key(schema_name: str | None, table_name: str) -> str:
+    """Return the lower case lookup key of a table.
+
+    MS SQL Server does not care about case so neither does the cache.
+
+    Args:
+        schema_name: The schema name, `None` means dbo.
+        table_name: The table name.
+
+    Returns:
+        The lookup key.
+    """
+    return f"{schema_name or 'dbo'}.{table_name}".lower()
+
+
+def column_type_from_catalog(column: dict) -> sa.types.TypeEngine:
+    """Build a SQLAlchemy type from a cached sys.columns row.
+
+    This follows what the SQLAlchemy mssql dialect does when it
+    reflects a column.
+
+    Args:
+        column: A cached column dictionary.
+
+    Returns:
+        The SQLAlchemy type of the column.
+    """
+    type_name: str = column["type_name"]
+    coltype = ischema_names.get(type_name)
+    if coltype is None:
+        type_name = column["base_type_name"]
+        coltype = ischema_names.get(type_name)
+    if coltype is None:
+        return sa.types.NullType()
+
+    max_length: int = column["max_length"]
+    collation: str | None = column["collation_name"]
+    kwargs: dict[str, t.Any] = {}
+    if type_name in {"binary", "varbinary", "char", "varchar"}:
+        kwargs["length"] = max_length if max_length != -1 else None
+    elif type_name in {"nchar", "nvarchar"}:
+        kwargs["length"] = max_length // 2 if max_length != -1 else None
+    if collation and type_name in {"char", "varchar", "nchar", "nvarchar", "text", "ntext"}:  # noqa: E501
+        kwargs["collation"] = collation
+
+    if issubclass(coltype, (sa.types.Numeric, sa.types.Float)):
+        kwargs["precision"] = column["precision"]
+        if not issubclass(coltype, sa.types.Float):
+            kwargs["scale"] = column["scale"]
+
+    return coltype(**kwargs)
+
+
+def column_from_catalog(column: dict) -> sa.Column:
+    """Build a Column from a cached sys.columns row.
+
+    Identity, default and computed columns get the same Identity,
+    server_default and Computed the dialect gives them when it reflects
+    the table, so the sink knows to leave them out of inserts.
+
+    Args:
+        column: A cached column dictionary.
+
+    Returns:
+        A new Column.
+    """
+    args: list[t.Any] = []
+    kwargs: dict[str, t.Any] = {}
+    if column["is_identity"]:
+        args.append(
+            sa.Identity(
+                start=column["identity_seed"],
+                increment=column["identity_increment"],
+            )
+        )
+        kwargs["autoincrement"] = True
+    if column["computed_definition"] is not None:
+        args.append(sa.Computed(column["computed_definition"]))
+    if column["default_definition"] is not None:
+        kwargs["server_default"] = sa.text(column["default_definition"])
+    return sa.Column(
+        column["name"],
+        column_type_from_catalog(column),
+        *args,
+        nullable=column["is_nullable"],
+        primary_key=column["is_primary_key"],
+        **kwargs,
+    )
+
+
+class CatalogCache:
+    """Column metadata for every user table in the target database.
+
+    The first time it is used the cache reads its file from local disk and
+    asks the server for the modify_date of every table.  Only the tables
+    that are new or have been changed since the file was written are read
+    from sys.columns, all in one query.  The file is then written back for
+    the next run.
+    """
+
+    def __init__(
+        self,
+        engine: sa.Engine,
+        path: str | None,
+        logger: logging.Logger,
+    ) -> None:
+        """Class Default Init.
+
+        Args:
+            engine: The engine of the target database.
+            path: Where to keep the cache between runs, None to keep it in memory.
+            logger: The connector's logger.
+        """
+        self._engine = engine
+        self._path = Path(path) if path else None
+        self.logger = logger
+        self._lock = threading.RLock()
+        self._loaded: bool = False
+        self._schemas: set[str] = set()
+        self._tables: dict[str, dict] = {}
+
+    @property
+    def database_id(self) -> str:
+        """Return what the cache file is keyed on so files aren't mixed up.
+
+        Returns:
+            The host and database of the engine's URL.
+        """
+        url = self._engine.url
+        return f"{url.host}:{url.port or ''}/{url.database}".lower()
+
+    @property
+    def schema_names(self) -> set[str]:
+        """Return the lower case schema names of the target database.
+
+        Returns:
+            A set of schema names.
+        """
+        self.load()
+        return set(self._schemas)
+
+    def load(self) -> None:
+        """Read the cache file and bring it up to date with the server."""
+        with self._lock:
+            if self._loaded:
+                return
+
+            cached_tables = self._read_file()
+
+            with self._engine.connect() as conn:
+                objects = conn.execute(sa.text(OBJECTS_QUERY)).mappings().all()
+
+            self._schemas = {str(row["schema_name"]).lower() for row in objects}
+            stale_ids: list[int] = []
+            for row in objects:
+                if row["object_id"] is None:
+                    continue
+                key = catalog_key(row["schema_name"], row["table_name"])
+                cached = cached_tables.get(key)
+                if (
+                    cached is not None
+                    and cached["object_id"] == row["object_id"]
+                    and cached["modify_date"] == row["modify_date"]
+                ):
+                    self._tables[key] = cached
+                else:
+                    stale_ids.append(row["object_id"])
+
+            if stale_ids:
+                self._load_columns(stale_ids)
+            self.logger.info(
+                "Catalog cache loaded %s tables, %s read from the server.",
+                len(self._tables),
+                len(stale_ids),
+            )
+            self._loaded = True
+            self._write_file()
+
+    def _load_columns(self, object_ids: list[int] | None = None) -> None:
+        """Read the columns of some or all tables from sys.columns.
+
+        Args:
+            object_ids: The tables to read.  When there are a lot of them
+                every table is read instead.
+        """
+        query = COLUMNS_QUERY
+        if object_ids is not None and len(object_ids) <= CATALOG_STALE_ID_LIMIT:
+            # object_ids are ints straight from sys.objects
+            id_list = ", ".join(str(int(i)) for i in object_ids)
+            query += f"  AND o.object_id IN ({id_list})\n"
+        query += "ORDER BY o.object_id, c.column_id"
+
+        with self._engine.connect() as conn:
+            rows = conn.execute(sa.text(query)).mappings().all()
+
+        loaded: dict[str, dict] = {}
+        for row in rows:
+            key = catalog_key(row["schema_name"], row["table_name"])
+            table = loaded.setdefault(
+                key,
+                {
+                    "schema_name": row["schema_name"],
+                    "table_name": row["table_name"],
+                    "object_id": row["object_id"],
+                    "modify_date": row["modify_date"],
+                    "columns": [],
+                },
+            )
+            table["columns"].append(
+                {
+                    "name": row["column_name"],
+                    "type_name": row["type_name"],
+                    "base_type_name": row["base_type_name"],
+                    "max_length": row["max_length"],
+                    "precision": row["precision"],
+                    "scale": row["scale"],
+                    "is_nullable": bool(row["is_nullable"]),
+                    "collation_name": row["collation_name"],
+                    "is_primary_key": bool(row["is_primary_key"]),
+                    "is_identity": bool(row["is_identity"]),
+                    "identity_seed": row["identity_seed"],
+                    "identity_increment": row["identity_increment"],
+                    "default_definition": row["default_definition"],
+                    "computed_definition": row["computed_definition"],
+                }
+            )
+        self._tables.update(loaded)
+
+    def _read_file(self) -> dict[str, dict]:
+        """Read the tables saved by an earlier run.
+
+        Returns:
+            The cached tables, empty if there is no usable cache file.
+        """
+        if self._path is None or not self._path.exists():
+            return {}
+        try:
+            contents = json.loads(self._path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            self.logger.warning(
+                "Ignoring unreadable catalog cache %s: %s", self._path, e
+            )
+            return {}
+        if (
+            contents.get("version") != CATALOG_CACHE_VERSION
+            or contents.get("database") != self.database_id
+        ):
+            return {}
+        return contents.get("tables", {})
+
+    def _write_file(self) -> None:
+        """Save the cache for the next run."""
+        if self._path is None:
+            return
+        contents = {
+            "version": CATALOG_CACHE_VERSION,
+            "database": self.database_id,
+            "tables": self._tables,
+        }
+        # Write a temp file and swap it in so a crash can't leave half a file
+        temp_path = self._path.with_name(f"{self._path.name}.{os.getpid()}.tmp")
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path.write_text(json.dumps(contents), encoding="utf-8")
+            temp_path.replace(self._path)
+        except OSError as e:
+            self.logger.warning("Unable to save catalog cache %s: %s", self._path, e)
+
+    def add_schema(self, schema_name: str) -> None:
+        """Record a schema the target created.
+
+        Args:
+            schema_name: The new schema.
+        """
+        self.load()
+        with self._lock:
+            self._schemas.add(schema_name.lower())
+
+    def get_table(self, schema_name: str | None, table_name: str) -> dict | None:
+        """Return the cached metadata of a table.
+
+        Args:
+            schema_name: The schema name.
+            table_name: The table name.
+
+        Returns:
+            The table dictionary or None if the table doesn't exist.
+        """
+        self.load()
+        return self._tables.get(catalog_key(schema_name, table_name))
+
+    def get_columns(self, schema_name: str | None, table_name: str) -> list[sa.Column]:
+        """Return new Column objects for a cached table.
+
+        Args:
+            schema_name: The schema name.
+            table_name: The table name.
+
+        Returns:
+            The columns in column_id order, empty if the table doesn't exist.
+        """
+        table = self.get_table(schema_name, table_name)
+        if table is None:
+            return []
+        return [column_from_catalog(column) for column in table["columns"]]
+
+    def refresh_table(self, schema_name: str | None, table_name: str) -> None:
+        """Re-read one table after the target has changed it.
+
+        Args:
+            schema_name: The schema name.
+            table_name: The table name.
+        """
+        self.load()
+        key = catalog_key(schema_name, table_name)
+        preparer = self._engine.dialect.identifier_preparer
+        quoted_name = f"{preparer.quote_schema(schema_name or 'dbo')}.{preparer.quote(table_name)}"  # noqa: E501
+        with self._engine.connect() as conn:
+            object_id = conn.execute(
+                sa.text("SELECT OBJECT_ID(:name, 'U')"),
+                {"name": quoted_name},
+            ).scalar()
+
+        with self._lock:
+            self._tables.pop(key, None)
+            if object_id is not None:
+                self._load_columns([object_id])
+            self._write_file()
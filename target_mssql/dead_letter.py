@@ -0,0 +1,145 @@
+"""mssql dead-letter output for rows the target table refused."""
+
+from __future__ import annotations
+
+import json
+import threading
+import typing as t
+from datetime import datetime, timezone
+from pathlib import Path
+
+import sqlalchemy as sa
+
+if t.TYPE_CHECKING:
+    import logging
+
+
+class DeadLetterLimitError(Exception):
+    """Raised when more rows have been dead-lettered than allowed."""
+
+
+class DeadLetterWriter:
+    """Write rejected records, with the reason they were rejected, somewhere safe.
+
+    Records go to a `<stream_name>.jsonl` file in `dead_letter_path`, to the
+    `dead_letter_table` in the target database, or both.  When neither is
+    configured there is nowhere to put them, see `enabled`.
+    """
+
+    def __init__(
+        self,
+        engine: sa.Engine,
+        stream_name: str,
+        config: dict,
+        logger: logging.Logger,
+    ) -> None:
+        """Class Default Init.
+
+        Args:
+            engine: The engine of the target database.
+            stream_name: The stream the records came from.
+            config: The target config.
+            logger: The sink's logger.
+        """
+        self._engine = engine
+        self.stream_name = stream_name
+        self.logger = logger
+        self.max_rows: int = config.get("dead_letter_max_rows", 1000)
+        self.row_count: int = 0
+        self._lock = threading.Lock()
+        self._table: sa.Table | None = None
+
+        dead_letter_path = config.get("dead_letter_path")
+        self.file_path: Path | None = (
+            Path(dead_letter_path) / f"{stream_name}.jsonl"
+            if dead_letter_path
+            else None
+        )
+        self.table_name: str | None = config.get("dead_letter_table")
+
+    @property
+    def enabled(self) -> bool:
+        """Return True when there is a dead-letter file or table.
+
+        Returns:
+            True if dead_letter_path or dead_letter_table is set.
+        """
+        return self.file_path is not None or bool(self.table_name)
+
+    @property
+    def table(self) -> sa.Table:
+        """Return the dead-letter table, creating it if it isn't there.
+
+        Returns:
+            The dead-letter table.
+        """
+        if self._table is None:
+            schema_name, _, table_name = self.table_name.rpartition(".")
+            self._table = sa.Table(
+                table_name,
+                sa.MetaData(),
+                sa.Column("stream_name", sa.types.NVARCHAR(255), nullable=False),
+                sa.Column("error", sa.types.NVARCHAR(None), nullable=False),
+                sa.Column("record", sa.types.NVARCHAR(None), nullable=False),
+                sa.Column("failed_at", sa.types.DateTime(), nullable=False),
+                schema=schema_name or None,
+            )
+            self._table.create(self._engine, checkfirst=True)
+        return self._table
+
+    def write(self, records: list[dict], error: str) -> None:
+        """Dead-letter some records.
+
+        Args:
+            records: The rejected records.
+            error: The error text from the database.
+
+        Raises:
+            DeadLetterLimitError: If dead_letter_max_rows has been reached.
+        """
+        with self._lock:
+            self.row_count += len(records)
+            failed_at = datetime.now(timezone.utc)
+            lines = [
+                {
+                    "stream_name": self.stream_name,
+                    "error": error,
+                    "record": record,
+                    "failed_at": failed_at.isoformat(),
+                }
+                for record in records
+            ]
+
+            if self.file_path is not None:
+                self.file_path.parent.mkdir(parents=True, exist_ok=True)
+                with self.file_path.open("a", encoding="utf-8") as dead_letter_file:
+                    for line in lines:
+                        dead_letter_file.write(json.dumps(line, default=str) + "\n")
+
+            if self.table_name:
+                with self._engine.connect() as conn, conn.begin():
+                    conn.execute(
+                        self.table.insert(),
+                        [
+                            {
+                                **line,
+                                "record": json.dumps(line["record"], default=str),
+                                "failed_at": failed_at.replace(tzinfo=None),
+                            }
+                            for line in lines
+                        ],
+                    )
+
+            self.logger.warning(
+                "Dead-lettered %s records from %s: %s",
+                len(records),
+                self.stream_name,
+                error,
+            )
+
+            if self.row_count > self.max_rows:
+                msg = (
+                    f"{self.row_count} records from {self.stream_name} were rejected, "
+                    f"more than the dead_letter_max_rows of {self.max_rows}."
+                )
+                raise DeadLetterLimitError(msg)
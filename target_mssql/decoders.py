@@ -0,0 +1,128 @@
+"""mssql typed decoding of JSONL batch file lines."""
+
+from __future__ import annotations
+
+import datetime as dt
+import decimal
+import time
+import typing as t
+
+import msgspec
+from singer_sdk.helpers._typing import get_datelike_property_type
+
+if t.TYPE_CHECKING:
+    from .instrumentation import StageTimer
+
+# JSON schema types with a single msgspec type.  Anything else is
+# decoded as plain JSON.
+JSONSCHEMA_TYPES: dict[str, type] = {
+    "string": str,
+    "integer": int,
+    "number": decimal.Decimal,
+    "boolean": bool,
+}
+DATELIKE_TYPES: dict[str, type] = {
+    "date-time": dt.datetime,
+    "date": dt.date,
+    "time": dt.time,
+}
+
+
+def get_property_type(property_schema: dict) -> t.Any:  # noqa: ANN401
+    """Return the msgspec type a property's values decode to.
+
+    Numbers decode to Decimal like the SDK's reader does, date and time
+    strings to datetime objects and base64 strings to bytes.  Every type
+    allows null.
+
+    Args:
+        property_schema: The property's JSON schema.
+
+    Returns:
+        A type usable as a msgspec Struct field annotation.
+    """
+    types = property_schema.get("type") or []
+    if isinstance(types, str):
+        types = [types]
+    types = [json_type for json_type in types if json_type != "null"]
+    if len(types) != 1 or types[0] not in JSONSCHEMA_TYPES:
+        return t.Any
+
+    if types[0] == "string":
+        datelike_type = get_datelike_property_type(property_schema)
+        if datelike_type:
+            return t.Optional[DATELIKE_TYPES[datelike_type]]
+        if property_schema.get("contentEncoding") == "base64":
+            return t.Optional[bytes]
+    return t.Optional[JSONSCHEMA_TYPES[types[0]]]
+
+
+class BatchRowDecoder:
+    """Decode batch file lines straight into tuples of typed values.
+
+    A `msgspec.Struct` with one field per schema property is built from
+    the stream's schema.  Decoding a line into it parses dates, decodes
+    base64 and turns numbers into Decimal as part of reading the JSON, so
+    there is no dict to walk afterwards.  A line the Struct refuses, a
+    timestamp in an odd format for example, is decoded as a plain dict
+    instead so the usual record handling can deal with it.
+    """
+
+    def __init__(
+        self,
+        schema: dict,
+        fallback: t.Callable[[bytes], dict],
+        stage_timer: StageTimer | None = None,
+    ) -> None:
+        """Class Default Init.
+
+        Args:
+            schema: The stream's JSON schema.
+            fallback: Decodes a line the Struct refuses into a dict.
+            stage_timer: Times each line as the decode stage when given.
+        """
+        properties: dict = schema.get("properties", {})
+        self.keys: tuple[str, ...] = tuple(properties)
+        # Property names can be anything so the fields get safe
+        # names and are renamed to the property name
+        fields = [
+            (f"field_{number}", get_property_type(property_schema), None)
+            for number, property_schema in enumerate(properties.values())
+        ]
+        self.row_type = msgspec.defstruct(
+            "BatchRow",
+            fields,
+            rename={f"field_{number}": key for number, key in enumerate(self.keys)},
+            gc=False,
+        )
+        # Untyped properties get Decimal for floats like the SDK's reader
+        decoder = msgspec.json.Decoder(self.row_type, float_hook=decimal.Decimal)
+        self._decode = decoder.decode
+        self.fallback = fallback
+        if stage_timer is None or not stage_timer.enabled:
+            stage_timer = None
+        self.stage_timer = stage_timer
+
+    def decode(self, line: bytes) -> tuple | dict:
+        """Decode one line.
+
+        Args:
+            line: A line of a JSONL batch file.
+
+        Returns:
+            The values in `keys` order, or a dict when the line didn't
+            match the schema's types.
+        """
+        if self.stage_timer is None:
+            return self._decode_line(line)
+        started = time.perf_counter()
+        try:
+            return self._decode_line(line)
+        finally:
+            self.stage_timer.add("decode", time.perf_counter() - started)
+
+    def _decode_line(self, line: bytes) -> tuple | dict:
+        try:
+            return msgspec.structs.astuple(self._decode(line))
+        except msgspec.ValidationError:
+            return self.fallback(line)
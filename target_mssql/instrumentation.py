@@ -0,0 +1,196 @@
+"""mssql load path timing and profiling."""
+
+from __future__ import annotations
+
+import bisect
+import cProfile
+import threading
+import time
+import typing as t
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+from singer_sdk.contrib.msgspec import MsgSpecReader
+
+from .metrics import MSSQLMetric, log_metric
+
+if t.TYPE_CHECKING:
+    import logging
+
+# Upper bounds, in seconds, of the histogram buckets
+STAGE_HISTOGRAM_BOUNDS: tuple[float, ...] = (
+    0.0001, 0.001, 0.01, 0.1, 1.0, 10.0, 60.0, float("inf"),
+)
+
+_NO_TIMER = nullcontext()
+
+
+class StageTimer:
+    """Add up how long each stage of the load path takes.
+
+    A stage is timed with `with timer.time("execute"):` or by handing an
+    elapsed time to `add`.  Each stage keeps a call count, the total and
+    largest time and a histogram of call times.  When the timer is turned
+    off `time` hands back a shared do-nothing context so the cost is one
+    attribute check.
+    """
+
+    def __init__(self, stream_name: str | None, *, enabled: bool) -> None:
+        """Class Default Init.
+
+        Args:
+            stream_name: The stream the stages belong to, None for the target.
+            enabled: False to skip all timing.
+        """
+        self.stream_name = stream_name
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stages: dict[str, dict[str, t.Any]] = {}
+
+    def time(self, stage: str, count: int = 1) -> t.ContextManager:
+        """Time a block of code.
+
+        Args:
+            stage: The stage name.
+            count: How many items the block handles, records for example.
+
+        Returns:
+            A context manager.
+        """
+        if not self.enabled:
+            return _NO_TIMER
+        return self._time(stage, count)
+
+    @contextmanager
+    def _time(self, stage: str, count: int) -> t.Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - started, count)
+
+    def add(self, stage: str, seconds: float, count: int = 1) -> None:
+        """Record time spent in a stage.
+
+        Args:
+            stage: The stage name.
+            seconds: The elapsed time.
+            count: How many items were handled in that time.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = {
+                    "calls": 0,
+                    "items": 0,
+                    "seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "histogram": [0] * len(STAGE_HISTOGRAM_BOUNDS),
+                }
+            stats["calls"] += 1
+            stats["items"] += count
+            stats["seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            stats["histogram"][bisect.bisect_left(STAGE_HISTOGRAM_BOUNDS, seconds)] += 1
+
+    def summary(self) -> dict[str, dict[str, t.Any]]:
+        """Return the stage statistics.
+
+        Returns:
+            A dictionary of stage statistics keyed on stage name.
+        """
+        with self._lock:
+            return {
+                stage: {
+                    **stats,
+                    "histogram": {
+                        str(bound): calls
+                        for bound, calls in zip(
+                            STAGE_HISTOGRAM_BOUNDS, stats["histogram"]
+                        )
+                    },
+                }
+                for stage, stats in self._stages.items()
+            }
+
+    def emit(self) -> None:
+        """Emit a Singer METRIC message for each stage."""
+        for stage, stats in self.summary().items():
+            log_metric(
+                "timer",
+                MSSQLMetric.STAGE_DURATION,
+                round(stats["seconds"], 6),
+                self.stream_name,
+                stage=stage,
+                calls=stats["calls"],
+                items=stats["items"],
+                max_seconds=round(stats["max_seconds"], 6),
+                histogram=stats["histogram"],
+            )
+
+
+class TimedMsgSpecReader(MsgSpecReader):
+    """MsgSpecReader that times JSON decoding when it has a stage timer."""
+
+    stage_timer: StageTimer | None = None
+
+    def deserialize_json(self, line: str) -> dict:
+        """Deserialize a line of json.
+
+        Args:
+            line: A single line of json.
+
+        Returns:
+            A dictionary of the deserialized json.
+        """
+        if self.stage_timer is None:
+            return super().deserialize_json(line)
+        started = time.perf_counter()
+        try:
+            return super().deserialize_json(line)
+        finally:
+            self.stage_timer.add("decode", time.perf_counter() - started)
+
+
+class StreamProfiler:
+    """cProfile the writes of one stream.
+
+    Only one thread can be profiled at a time so writes that run while
+    another write is being profiled are left out.
+    """
+
+    def __init__(self, path: str, stream_name: str, logger: logging.Logger) -> None:
+        """Class Default Init.
+
+        Args:
+            path: The directory to write `<stream_name>.prof` to.
+            stream_name: The stream being profiled.
+            logger: The sink's logger.
+        """
+        self.file_path = Path(path) / f"{stream_name}.prof"
+        self.logger = logger
+        self._profile = cProfile.Profile()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def profile(self) -> t.Iterator[None]:
+        """Profile a block of code if no other thread is being profiled."""
+        if not self._lock.acquire(blocking=False):
+            yield
+            return
+        try:
+            self._profile.enable()
+            try:
+                yield
+            finally:
+                self._profile.disable()
+        finally:
+            self._lock.release()
+
+    def dump(self) -> None:
+        """Write the profile out in pstats format."""
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._profile.dump_stats(self.file_path)
+        self.logger.info("Wrote profile to %s", self.file_path)
@@ -0,0 +1,41 @@
+"""mssql target metrics."""
+
+from __future__ import annotations
+
+import enum
+import os
+import typing as t
+
+from singer_sdk import metrics
+
+
+class MSSQLMetric(str, enum.Enum):
+    """Metrics emitted by target-mssql on top of the SDK's."""
+
+    BATCH_SIZE = "batch_size"
+    STAGE_DURATION = "stage_duration"
+
+
+def log_metric(
+    metric_type: str,
+    metric: MSSQLMetric,
+    value: t.Any,  # noqa: ANN401
+    stream_name: str | None,
+    **tags: t.Any,
+) -> None:
+    """Emit a Singer METRIC log line for a stream.
+
+    Args:
+        metric_type: The metric type such as `gauge` or `timer`.
+        metric: The metric.
+        value: The measurement.
+        stream_name: The stream it was measured on, None for the whole target.
+        tags: Any extra tags.
+    """
+    if stream_name is not None:
+        tags[metrics.Tag.STREAM] = stream_name
+    tags[metrics.Tag.PID] = os.getpid()
+    metrics.log(
+        metrics.get_metrics_logger(),
+        metrics.Point(metric_type, metric, value, tags),
+    )
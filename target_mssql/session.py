@@ -0,0 +1,192 @@
+"""mssql connections held by a sink between batches."""
+
+from __future__ import annotations
+
+import threading
+import time
+import typing as t
+import weakref
+from contextlib import contextmanager
+
+from sqlalchemy import exc
+
+if t.TYPE_CHECKING:
+    import logging
+
+    import sqlalchemy as sa
+
+
+class SessionRegistry:
+    """The connection sessions sharing an engine's pool.
+
+    Sessions hold on to idle connections between drains, so with more
+    streams than the pool has connections the pool can run dry.  Before
+    a new connection is checked out of a full pool the one that has sat
+    idle longest, in any session, is handed back so the checkout doesn't
+    wait for the pool timeout.
+    """
+
+    def __init__(self, engine: sa.Engine, capacity: int | None) -> None:
+        """Class Default Init.
+
+        Args:
+            engine: The connector's engine.
+            capacity: How many connections the pool hands out at once, None
+                when it has no limit.
+        """
+        self.engine = engine
+        self.capacity = capacity
+        self._sessions: weakref.WeakSet[ConnectionSession] = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def add(self, session: ConnectionSession) -> None:
+        """Start tracking a session.
+
+        Args:
+            session: The session.
+        """
+        with self._lock:
+            self._sessions.add(session)
+
+    def discard(self, session: ConnectionSession) -> None:
+        """Stop tracking a session.
+
+        Args:
+            session: The session.
+        """
+        with self._lock:
+            self._sessions.discard(session)
+
+    def make_room(self) -> None:
+        """Hand back the longest idle session connection if the pool is full."""
+        if self.capacity is None:
+            return
+        with self._lock:
+            if self.engine.pool.checkedout() < self.capacity:
+                return
+            idle_sessions = [
+                (idle_since, session)
+                for session in list(self._sessions)
+                if (idle_since := session.oldest_idle()) is not None
+            ]
+            if idle_sessions:
+                min(idle_sessions, key=lambda item: item[0])[1].release_oldest()
+
+
+class ConnectionSession:
+    """Keep a sink's connections open for the life of the stream.
+
+    Handing a connection back to the engine's pool and checking it out
+    again costs a pre-ping round trip per batch.  The session keeps the
+    connections it has opened and hands them straight back out.  Only a
+    connection that has sat idle for longer than `idle_seconds` goes back
+    through the pool, where it is pinged.  There is one connection per
+    concurrent writer so parallel and batch file writes each get their
+    own.
+
+    Idle connections are also handed back when the pool runs out and
+    another checkout needs one, see `SessionRegistry`.
+    """
+
+    def __init__(
+        self,
+        engine: sa.Engine,
+        *,
+        idle_seconds: float,
+        logger: logging.Logger,
+        registry: SessionRegistry | None = None,
+    ) -> None:
+        """Class Default Init.
+
+        Args:
+            engine: The connector's engine.
+            idle_seconds: How long a connection can sit unused before it is
+                checked again.
+            logger: The sink's logger.
+            registry: The sessions sharing the engine's pool.
+        """
+        self.engine = engine
+        self.idle_seconds = idle_seconds
+        self.logger = logger
+        self.registry = registry
+        self._idle: list[tuple[sa.engine.Connection, float]] = []
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.add(self)
+
+    @contextmanager
+    def connect(self) -> t.Iterator[sa.engine.Connection]:
+        """Lend out a connection.
+
+        A connection that was invalidated by a disconnect is dropped
+        rather than kept so the next block gets a fresh one.
+
+        Yields:
+            An open connection.
+        """
+        conn = self._checkout()
+        try:
+            yield conn
+        except BaseException as e:
+            disconnected = isinstance(e, exc.DBAPIError) and e.connection_invalidated
+            if conn.invalidated or disconnected:
+                self.logger.warning("Dropping a connection after a disconnect: %s", e)
+                self._discard(conn)
+            else:
+                self._checkin(conn)
+            raise
+        self._checkin(conn)
+
+    def close(self) -> None:
+        """Hand every held connection back to the pool."""
+        if self.registry is not None:
+            self.registry.discard(self)
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def oldest_idle(self) -> float | None:
+        """Return when the longest idle connection was last used.
+
+        Returns:
+            A `time.monotonic` reading, None when no connection is idle.
+        """
+        with self._lock:
+            return self._idle[0][1] if self._idle else None
+
+    def release_oldest(self) -> None:
+        """Hand the longest idle connection back to the pool."""
+        with self._lock:
+            if not self._idle:
+                return
+            conn, _ = self._idle.pop(0)
+        self._discard(conn)
+
+    def _checkout(self) -> sa.engine.Connection:
+        with self._lock:
+            conn, last_used = self._idle.pop() if self._idle else (None, 0.0)
+        if conn is not None and time.monotonic() - last_used <= self.idle_seconds:
+            return conn
+        if conn is not None:
+            # Let the pool ping it before it is trusted again
+            self._discard(conn)
+        if self.registry is not None:
+            self.registry.make_room()
+        return self.engine.connect()
+
+    def _checkin(self, conn: sa.engine.Connection) -> None:
+        try:
+            if conn.in_transaction():
+                conn.rollback()
+        except exc.SQLAlchemyError:
+            self._discard(conn)
+            return
+        with self._lock:
+            self._idle.append((conn, time.monotonic()))
+
+    def _discard(self, conn: sa.engine.Connection) -> None:
+        try:
+            conn.close()
+        except exc.SQLAlchemyError as e:
+            self.logger.debug("Unable to close a connection: %s", e)
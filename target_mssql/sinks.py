@@ -3,12 +3,23 @@
 from __future__ import annotations
 
 import asyncio
+import collections
+import copy
+import hashlib
+import importlib.util
+import json
 import os
+import re
+import threading
+import time
 import typing as t
 import urllib.parse
 from base64 import b64decode
-from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext, suppress
+from dataclasses import dataclass
 from decimal import Decimal
+from functools import cached_property
 from gzip import GzipFile
 from gzip import open as gzip_open
 from pathlib import Path
@@ -21,14 +32,33 @@ from singer_sdk.helpers._batch import (
     BatchFileFormat,
     StorageTarget,
 )
+from singer_sdk.helpers._compat import (
+    date_fromisoformat,
+    datetime_fromisoformat,
+    time_fromisoformat,
+)
+from singer_sdk.helpers._typing import (
+    get_datelike_property_type,
+    handle_invalid_timestamp_in_record,
+)
+from singer_sdk.helpers.capabilities import TargetLoadMethods
 from singer_sdk.sinks import SQLSink
 from sqlalchemy import exc
 from sqlalchemy.dialects import mssql
 
+from .batch_size import AdaptiveBatchSize
+from .catalog import CatalogCache
+from .dead_letter import DeadLetterWriter
+from .decoders import BatchRowDecoder
+from .instrumentation import StageTimer, StreamProfiler
+from .metrics import MSSQLMetric, log_metric
+from .session import ConnectionSession, SessionRegistry
+
 if t.TYPE_CHECKING:
     from singer_sdk.target_base import Target
 
 _C = t.TypeVar("_C", bound=SQLConnector)
+_T = t.TypeVar("_T")
 
 MSSQL_PK_CHAR_MAX: int = 450
 MSSQL_BIGINT_MIN: int = -9223372036854775808
@@ -47,6 +77,150 @@ MSSQL_FLOAT_MIN:Decimal = Decimal("-1.79e308")
 MSSQL_FLOAT_MAX:Decimal = Decimal("1.79e308")
 MSSQL_REAL_MIN:Decimal = Decimal("-3.40e38")
 MSSQL_REAL_MAX:Decimal = Decimal("3.40e38")
+MSSQL_MAX_PARAMETERS: int = 2100
+MSSQL_MAX_VALUES_ROWS: int = 1000
+# Error numbers SQL Server raises for something wrong with a row rather
+# than with the connection, the server or the statement.  Only batches
+# failing with these are split to find the bad rows.
+MSSQL_ROW_ERROR_NUMBERS: frozenset[int] = frozenset({
+    220,   # Arithmetic overflow for a data type
+    241,   # Conversion failed converting date and/or time from string
+    242,   # Conversion of a date produced an out of range value
+    245,   # Conversion failed converting a value to a data type
+    515,   # Cannot insert NULL into a column that doesn't allow it
+    547,   # Statement conflicted with a FOREIGN KEY or CHECK constraint
+    2601,  # Duplicate key row in a unique index
+    2627,  # Violation of a PRIMARY KEY or UNIQUE constraint
+    2628,  # String or binary data would be truncated in a column
+    8114,  # Error converting a data type
+    8115,  # Arithmetic overflow converting to a data type
+    8152,  # String or binary data would be truncated
+    8672,  # MERGE attempted to update or delete the same row more than once
+})
+MSSQL_DEADLOCK_ERROR_NUMBER: int = 1205
+# How many times a batch chosen as a deadlock victim is written again
+MSSQL_DEADLOCK_RETRIES: int = 3
+# Columnstore inserts of at least this many rows go straight to a
+# compressed rowgroup instead of the delta store
+MSSQL_COLUMNSTORE_ROWGROUP_ROWS: int = 102400
+# The longest NVARCHAR and VARCHAR/VARBINARY lengths that stay in row
+MSSQL_NVARCHAR_MAX_LENGTH: int = 4000
+MSSQL_VARCHAR_MAX_LENGTH: int = 8000
+# The smallest length infer_column_sizes will give a column
+MSSQL_MIN_SIZED_LENGTH: int = 16
+BATCH_FILE_CHUNK_BYTES: int = 64 * 1024 * 1024
+# Drain threads when the engine's pool has no limit, the SDK's default
+# max_parallelism
+DEFAULT_DRAIN_WORKERS: int = 8
+# The table's extended property listing the indexes a bulk load disabled
+DISABLED_INDEXES_PROPERTY: str = "target_mssql_disabled_indexes"
+DATELIKE_PARSERS: dict[str, t.Callable[[str], t.Any]] = {
+    "date-time": datetime_fromisoformat,
+    "date": date_fromisoformat,
+    "time": time_fromisoformat,
+}
+
+
+class ParallelWriteError(RuntimeError):
+    """Raised when some slices of a parallel write failed."""
+
+
+@dataclass
+class ArrowIPCEncoding(BaseBatchFileEncoding):
+    """Arrow IPC encoding for batch files.
+
+    Registering the subclass lets BATCH messages with a format of
+    `arrow` be parsed by the SDK.
+    """
+
+    __encoding_format__ = "arrow"
+
+
+@dataclass(frozen=True)
+class PreprocessPlan:
+    """The conversions a stream's records need before they are written.
+
+    Built once from the stream's schema so each record only touches the
+    columns that actually need work.
+    """
+
+    columns: frozenset[str]
+    """Every property in the schema.  Anything else is dropped."""
+
+    base64_columns: tuple[str, ...]
+    """Properties with a base64 contentEncoding that are decoded to bytes."""
+
+    datelike_columns: tuple[tuple[str, str], ...]
+    """Property and format pairs for date, time, and date-time properties."""
+
+    @property
+    def converted_columns(self) -> tuple[str, ...]:
+        """Return every property whose values need converting."""
+        return self.base64_columns + tuple(key for key, _ in self.datelike_columns)
+
+    @classmethod
+    def from_schema(cls, schema: dict) -> PreprocessPlan:
+        """Build the plan from a stream's JSON schema.
+
+        Args:
+            schema: The stream's JSON schema.
+
+        Returns:
+            A new PreprocessPlan.
+        """
+        properties: dict = schema.get("properties", {})
+        base64_columns = []
+        datelike_columns = []
+        for key, property_schema in properties.items():
+            if property_schema.get("contentEncoding") == "base64":
+                base64_columns.append(key)
+            datelike_type = get_datelike_property_type(property_schema)
+            if datelike_type:
+                datelike_columns.append((key, datelike_type))
+
+        return cls(
+            columns=frozenset(properties),
+            base64_columns=tuple(base64_columns),
+            datelike_columns=tuple(datelike_columns),
+        )
+
+
+@dataclass(frozen=True)
+class TableStorage:
+    """How the tables the target creates are stored.
+
+    The default is a rowstore table with no compression on the default
+    filegroup, the same as a plain CREATE TABLE.
+    """
+
+    columnstore: bool = False
+    """Store the table as a clustered columnstore index."""
+
+    compression: str | None = None
+    """NONE, ROW or PAGE data compression for rowstore tables."""
+
+    filegroup: str | None = None
+    """The filegroup the table is created on."""
+
+    @classmethod
+    def from_config(cls, config: dict | None) -> TableStorage | None:
+        """Build the storage options from a table_storage setting.
+
+        Args:
+            config: The table_storage setting.
+
+        Returns:
+            A new TableStorage or None when nothing differs from the default.
+        """
+        if not config:
+            return None
+        compression = config.get("compression")
+        storage = cls(
+            columnstore=bool(config.get("columnstore", False)),
+            compression=compression.upper() if compression else None,
+            filegroup=config.get("filegroup"),
+        )
+        return None if storage == cls() else storage
 
 
 class MSSQLConnector(SQLConnector):
@@ -58,13 +232,19 @@ class MSSQLConnector(SQLConnector):
     allow_column_add: bool = True  # Whether ADD COLUMN is supported.
     allow_column_rename: bool = True  # Whether RENAME COLUMN is supported.
     allow_column_alter: bool = False  # Whether altering column types is supported.
-    allow_merge_upsert: bool = False  # Whether MERGE UPSERT is supported.
+    allow_merge_upsert: bool = True  # Whether MERGE UPSERT is supported.
     allow_overwrite: bool = True  # Whether overwrite load method is supported.
     allow_temp_tables: bool = True  # Whether temp tables are supported.
 
     _target_schemas: set[str] | None = None
     """This holds the Target's schema names in lower case."""
 
+    _catalog: CatalogCache | None = None
+    """The catalog cache, only used when catalog_cache_path is set."""
+
+    _recovery_model: str | None = None
+    """The target database's recovery model, looked up on first use."""
+
     def __init__(
             self,
             config: dict | None = None,
@@ -76,13 +256,58 @@ class MSSQLConnector(SQLConnector):
         if config["driver_type"] == "pyodbc":
             pyodbc.pooling = False
 
+        # JSON schema to SQL type translations keyed on a hash of the
+        # property schema.  Wide schemas repeat the same types a lot.
+        self._sql_type_cache: dict[str, sa.types.TypeEngine] = {}
+        self.sql_type_cache_hits: int = 0
+        self.sql_type_cache_misses: int = 0
+
+        # Writes the sinks have handed to their writer threads that
+        # haven't been checked yet.  State waits on these.
+        self._pending_writes: list[Future] = []
+        self._pending_writes_lock = threading.Lock()
+
+        # User-defined table types used for TVP inserts, keyed on
+        # the target table.
+        self._table_types: dict[str, str] = {}
+        self._table_types_lock = threading.Lock()
+
+        # Storage options for tables the sinks may create, keyed on
+        # the lower case full table name.
+        self._table_storage: dict[str, TableStorage] = {}
+
+        # The thread pool full sinks are drained on when
+        # concurrent_drains is on, made on first use.
+        self._drain_executor: ThreadPoolExecutor | None = None
+        self._drain_executor_lock = threading.Lock()
+
+        # The persistent_connection sessions sharing the pool, made
+        # by the first sink that keeps one.
+        self._session_registry: SessionRegistry | None = None
+        self._session_registry_lock = threading.Lock()
+
         super().__init__(config, sqlalchemy_url)
 
     @contextmanager
     def _connect(self) -> t.Iterator[sa.engine.Connection]:
+        if self._session_registry is not None:
+            self._session_registry.make_room()
         with self._engine.connect() as conn:
             yield conn
 
+    def get_session_registry(self) -> SessionRegistry:
+        """Return the registry of the sinks' connection sessions.
+
+        Returns:
+            The registry, sized to the engine's pool.
+        """
+        with self._session_registry_lock:
+            if self._session_registry is None:
+                self._session_registry = SessionRegistry(
+                    self._engine, self.get_pool_capacity()
+                )
+            return self._session_registry
+
     def get_sqlalchemy_url(self, config: dict[str, t.Any]) -> str:
         """Generates a SQLAlchemy URL for mssql.
 
@@ -135,9 +360,42 @@ class MSSQLConnector(SQLConnector):
             for key, value in self.config["sqlalchemy_eng_params"].items():
                 eng_config.update({f"{eng_prefix}{key}": value})
 
-        return sa.engine_from_config(eng_config, prefix=eng_prefix)
+        engine = sa.engine_from_config(eng_config, prefix=eng_prefix)
+        if self.config.get("stage_metrics"):
+            for event_name, listener in (
+                ("before_execute", self._before_execute),
+                ("before_cursor_execute", self._before_cursor_execute),
+                ("after_cursor_execute", self._after_cursor_execute),
+            ):
+                sa.event.listen(engine, event_name, listener, named=True)
+        return engine
 
-    def to_sql_type(self, jsonschema_type: dict) -> None:
+    @staticmethod
+    def _before_execute(**kwargs: t.Any) -> None:
+        """Note when a statement is handed to SQLAlchemy, before it is compiled."""
+        kwargs["conn"].info["stage_started"] = time.perf_counter()
+
+    @staticmethod
+    def _before_cursor_execute(**kwargs: t.Any) -> None:
+        """Time the compile stage and note when the driver is called."""
+        conn: sa.engine.Connection = kwargs["conn"]
+        now = time.perf_counter()
+        started = conn.info.pop("stage_started", None)
+        stage_timer = conn.info.get("stage_timer")
+        if stage_timer is not None and started is not None:
+            stage_timer.add("compile", now - started)
+        conn.info["cursor_started"] = now
+
+    @staticmethod
+    def _after_cursor_execute(**kwargs: t.Any) -> None:
+        """Time the execute stage."""
+        conn: sa.engine.Connection = kwargs["conn"]
+        started = conn.info.pop("cursor_started", None)
+        stage_timer = conn.info.get("stage_timer")
+        if stage_timer is not None and started is not None:
+            stage_timer.add("execute", time.perf_counter() - started)
+
+    def to_sql_type(self, jsonschema_type: dict) -> sa.types.TypeEngine:
         """Returns a JSON Schema equivalent for the given SQL type.
 
         By default will call `typing.to_sql_type()`.
@@ -147,17 +405,168 @@ class MSSQLConnector(SQLConnector):
         typing logic. If overriding this method, developers should call the
         default implementation from the base class for all unhandled cases.
 
+        The translation is cached on a hash of the property schema so each
+        distinct property schema is only worked out once.
+
         Args:
             jsonschema_type: The JSON Schema representation of the source type.
 
         Returns:
             The SQLAlchemy type representation of the data type.
         """
-        msg = f"json schema type: {jsonschema_type}"
-        self.logger.info(msg)
-        if self.config.get("hd_jsonschema_types", False):
-            return self.hd_to_sql_type(jsonschema_type)
-        return self.org_to_sql_type(jsonschema_type)
+        cache_key = self.get_sql_type_cache_key(jsonschema_type)
+        sql_type = self._sql_type_cache.get(cache_key)
+        if sql_type is None:
+            if self.config.get("hd_jsonschema_types", False):
+                sql_type = self.hd_to_sql_type(jsonschema_type)
+            else:
+                sql_type = self.org_to_sql_type(jsonschema_type)
+            self.logger.debug("json schema type: %s is %s", jsonschema_type, sql_type)
+            return self._cache_sql_type(cache_key, sql_type)
+
+        self.sql_type_cache_hits += 1
+        # Hand out a copy since callers like to_sql_pk_type change the length
+        return copy.copy(sql_type)
+
+    @staticmethod
+    def get_sql_type_cache_key(jsonschema_type: dict) -> str:
+        """Return a canonical hash of a property schema.
+
+        Args:
+            jsonschema_type: The JSON Schema representation of the source type.
+
+        Returns:
+            A hex digest that is the same for equal schemas.
+        """
+        canonical = json.dumps(jsonschema_type, sort_keys=True, default=str)
+        return hashlib.sha1(canonical.encode(), usedforsecurity=False).hexdigest()
+
+    def _cache_sql_type(
+        self,
+        cache_key: str,
+        sql_type: sa.types.TypeEngine,
+    ) -> sa.types.TypeEngine:
+        """Store a translated type and return a copy of it.
+
+        Args:
+            cache_key: The key from get_sql_type_cache_key.
+            sql_type: The translated SQL type.
+
+        Returns:
+            A copy of the SQL type.
+        """
+        self.sql_type_cache_misses += 1
+        self._sql_type_cache[cache_key] = sql_type
+        return copy.copy(sql_type)
+
+    def sql_type_cache_info(self) -> dict[str, int]:
+        """Return the SQL type cache statistics.
+
+        Returns:
+            The number of hits, misses, and cached types.
+        """
+        return {
+            "hits": self.sql_type_cache_hits,
+            "misses": self.sql_type_cache_misses,
+            "size": len(self._sql_type_cache),
+        }
+
+    def track_write(self, future: Future) -> None:
+        """Remember a write that is running in the background.
+
+        Args:
+            future: The future of the write.
+        """
+        with self._pending_writes_lock:
+            self._pending_writes.append(future)
+
+    def wait_for_writes(self) -> None:
+        """Block until every background write has committed.
+
+        Raises:
+            Exception: The first error raised by a background write.
+        """
+        with self._pending_writes_lock:
+            futures = self._pending_writes
+            self._pending_writes = []
+        for future in futures:
+            future.result()
+
+    def get_pool_capacity(self) -> int | None:
+        """Return how many connections the engine's pool will hand out at once.
+
+        Returns:
+            The pool's size plus max_overflow, or None when the pool has
+            no limit.
+        """
+        pool = self._engine.pool
+        if not isinstance(pool, sa.pool.QueuePool):
+            return None
+        max_overflow = getattr(pool, "_max_overflow", 0)
+        if max_overflow < 0:
+            return None
+        return pool.size() + max_overflow
+
+    def get_connections_per_drain(self) -> int:
+        """Return the most connections one drain can have checked out at once.
+
+        A drain writes its slices over `parallel_writers` connections at the
+        same time, so the biggest `parallel_writers` of any stream is used.
+
+        Returns:
+            The number of connections.
+        """
+        parallel_writers: int = self.config.get("parallel_writers", 1)
+        stream_options: dict = self.config.get("stream_options") or {}
+        return max(
+            1,
+            parallel_writers,
+            *(
+                options.get("parallel_writers", parallel_writers)
+                for options in stream_options.values()
+            ),
+        )
+
+    def get_drain_executor(self) -> ThreadPoolExecutor:
+        """Return the thread pool shared by every sink for concurrent drains.
+
+        The pool is sized so every drain in flight can check out all the
+        connections it needs without waiting on the engine's pool.  The
+        connections BATCH messages and table setup on the main thread use
+        are kept back first.  `max_parallelism` caps it lower.
+
+        Returns:
+            The drain thread pool.
+        """
+        with self._drain_executor_lock:
+            if self._drain_executor is None:
+                capacity = self.get_pool_capacity()
+                per_drain = self.get_connections_per_drain()
+                if capacity is None:
+                    max_workers = DEFAULT_DRAIN_WORKERS
+                else:
+                    file_workers = max(1, self.config.get("batch_file_workers", 1))
+                    reserved = file_workers * per_drain
+                    max_workers = max(1, (capacity - reserved) // per_drain)
+                if self.config.get("max_parallelism"):
+                    max_workers = min(max_workers, self.config["max_parallelism"])
+                self.logger.info(
+                    "Draining sinks on %d threads with up to %d connections each",
+                    max_workers,
+                    per_drain,
+                )
+                self._drain_executor = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix="drain",
+                )
+            return self._drain_executor
+
+    def shutdown_drains(self) -> None:
+        """Wait for the drains in flight then stop the drain thread pool."""
+        with self._drain_executor_lock:
+            executor, self._drain_executor = self._drain_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
 
     def org_to_sql_type(self, jsonschema_type: dict) -> sa.types.TypeEngine:
         """Returns a JSON Schema equivalent for the given SQL type.
@@ -280,6 +689,12 @@ class MSSQLConnector(SQLConnector):
         Returns:
             The SQLAlchemy type representation of the data type.
         """
+        cache_key = f"pk:{self.get_sql_type_cache_key(jsonschema_type)}"
+        cached_type = self._sql_type_cache.get(cache_key)
+        if cached_type is not None:
+            self.sql_type_cache_hits += 1
+            return copy.copy(cached_type)
+
         sql_type: sa.types.TypeEngine = self.to_sql_type(jsonschema_type)
 
         if isinstance(sql_type, str):
@@ -300,7 +715,32 @@ class MSSQLConnector(SQLConnector):
             else:
                 sql_type.length = MSSQL_PK_CHAR_MAX
 
-        return sql_type
+        return self._cache_sql_type(cache_key, sql_type)
+
+    @property
+    def catalog(self) -> CatalogCache | None:
+        """Return the catalog cache when one has been configured.
+
+        Returns:
+            The CatalogCache or None if catalog_cache_path is not set.
+        """
+        if self._catalog is None and self.config.get("catalog_cache_path"):
+            self._catalog = CatalogCache(
+                engine=self._engine,
+                path=self.config["catalog_cache_path"],
+                logger=self.logger,
+            )
+        return self._catalog
+
+    def refresh_catalog_table(self, full_table_name: str) -> None:
+        """Update the catalog cache after we change a table.
+
+        Args:
+            full_table_name: The fully qualified table name.
+        """
+        if self.catalog is not None:
+            _, schema_name, table_name = self.parse_full_table_name(full_table_name)
+            self.catalog.refresh_table(schema_name, table_name)
 
     def schema_exists(self, schema_name: str) -> bool:
         """Determine if the target database schema already exists.
@@ -330,6 +770,9 @@ class MSSQLConnector(SQLConnector):
 
     def set_target_schemas(self) -> None:
         """Populate the Connectors list of the Target's existing schema."""
+        if self.catalog is not None:
+            self._target_schemas = self.catalog.schema_names
+            return
         self._target_schemas = {str(schema_name).lower() for schema_name in sa.inspect(self._engine).get_schema_names()}
 
     def create_schema(self, schema_name: str) -> None:
@@ -345,6 +788,50 @@ class MSSQLConnector(SQLConnector):
             conn.execute(sa.schema.CreateSchema(schema_name))
 
         self._target_schemas.add(schema_name.lower())
+        if self.catalog is not None:
+            self.catalog.add_schema(schema_name)
+
+    def table_exists(self, full_table_name: str) -> bool:
+        """Determine if the target table already exists.
+
+        Args:
+            full_table_name: the target table name.
+
+        Returns:
+            True if table exists, False if not.
+        """
+        if self.catalog is None:
+            return super().table_exists(full_table_name)
+
+        _, schema_name, table_name = self.parse_full_table_name(full_table_name)
+        return self.catalog.get_table(schema_name, table_name) is not None
+
+    def get_table_columns(
+        self,
+        full_table_name: str,
+        column_names: list[str] | None = None,
+    ) -> dict[str, sa.Column]:
+        """Return a list of table columns.
+
+        Served from the catalog cache when there is one.
+
+        Args:
+            full_table_name: Fully qualified table name.
+            column_names: A list of column names to filter to.
+
+        Returns:
+            An ordered list of column objects.
+        """
+        if self.catalog is None:
+            return super().get_table_columns(full_table_name, column_names)
+
+        _, schema_name, table_name = self.parse_full_table_name(full_table_name)
+        wanted = {col.casefold() for col in column_names or []}
+        return {
+            column.name: column
+            for column in self.catalog.get_columns(schema_name, table_name)
+            if not wanted or column.name.casefold() in wanted
+        }
 
     def create_empty_table(
         self,
@@ -399,7 +886,162 @@ class MSSQLConnector(SQLConnector):
                         self.to_sql_type(property_jsonschema),
                     ),
                 )
-        sa.Table(table_name, meta, *columns).create(self._engine)
+        table = sa.Table(table_name, meta, *columns)
+        storage = self._table_storage.get(str(full_table_name).lower())
+        if storage is None:
+            table.create(self._engine)
+        else:
+            self.create_table_with_storage(table, storage)
+        self.refresh_catalog_table(full_table_name)
+
+    def set_table_storage(
+        self, full_table_name: str, storage: TableStorage | None
+    ) -> None:
+        """Set how a table is stored if it gets created.
+
+        Args:
+            full_table_name: The fully qualified table name.
+            storage: The storage options, None for a plain table.
+        """
+        if storage is None:
+            self._table_storage.pop(str(full_table_name).lower(), None)
+        else:
+            self._table_storage[str(full_table_name).lower()] = storage
+
+    def create_table_with_storage(self, table: sa.Table, storage: TableStorage) -> None:
+        """Create a table with columnstore, compression or filegroup options.
+
+        A clustered columnstore table keeps its primary key as a
+        nonclustered index.  Compression only applies to rowstore tables
+        since columnstore has its own.
+
+        Args:
+            table: The table to create.
+            storage: The storage options.
+        """
+        preparer = self._dialect.identifier_preparer
+        full_table_name = preparer.format_table(table)
+        on_filegroup = (
+            f" ON {preparer.quote(storage.filegroup)}" if storage.filegroup else ""
+        )
+
+        if storage.columnstore and table.primary_key.columns:
+            table.primary_key.dialect_kwargs["mssql_clustered"] = False
+        # The filegroup has to come before the table options
+        create_ddl = str(
+            sa.schema.CreateTable(table).compile(dialect=self._dialect)
+        ).rstrip()
+        create_ddl += on_filegroup
+        if not storage.columnstore and storage.compression:
+            create_ddl += f" WITH (DATA_COMPRESSION = {storage.compression})"
+        self.raw_conn_execute(create_ddl)
+
+        if storage.columnstore:
+            if storage.compression:
+                self.logger.warning(
+                    "compression %s is ignored for the columnstore table %s",
+                    storage.compression,
+                    full_table_name,
+                )
+            index_name = preparer.quote(f"cci_{table.name[:124]}")
+            self.raw_conn_execute(
+                f"CREATE CLUSTERED COLUMNSTORE INDEX {index_name} "
+                f"ON {full_table_name}{on_filegroup}"
+            )
+
+    def prepare_table(
+        self,
+        full_table_name: str,
+        schema: dict,
+        primary_keys: t.Sequence[str],
+        partition_keys: list[str] | None = None,
+        as_temp_table: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
+        """Adapt target table to provided schema if possible.
+
+        New and overwritten tables are left to the SDK.  For an existing
+        table the columns are read once and every missing column is added
+        in a single ALTER TABLE, so a schema that gains many columns costs
+        one round trip and one schema lock instead of one per column.
+
+        Args:
+            full_table_name: the target table name.
+            schema: the JSON Schema for the table.
+            primary_keys: list of key properties.
+            partition_keys: list of partition keys.
+            as_temp_table: True to create a temp table.
+        """
+        if (
+            self.config.get("load_method") == TargetLoadMethods.OVERWRITE
+            or not self.table_exists(full_table_name=full_table_name)
+        ):
+            super().prepare_table(
+                full_table_name=full_table_name,
+                schema=schema,
+                primary_keys=primary_keys,
+                partition_keys=partition_keys,
+                as_temp_table=as_temp_table,
+            )
+            return
+
+        existing_columns = self.get_table_columns(full_table_name)
+        new_columns: list[tuple[str, sa.types.TypeEngine]] = []
+        for property_name, property_def in schema["properties"].items():
+            sql_type = self.to_sql_type(property_def)
+            existing_column = existing_columns.get(property_name)
+            if existing_column is None:
+                new_columns.append((property_name, sql_type))
+            elif str(existing_column.type) != str(sql_type):
+                self._adapt_column_type(
+                    full_table_name, column_name=property_name, sql_type=sql_type
+                )
+
+        if new_columns:
+            self.add_columns(full_table_name, new_columns)
+
+        self.prepare_primary_key(
+            full_table_name=full_table_name,
+            primary_keys=primary_keys,
+        )
+
+    def add_columns(
+        self,
+        full_table_name: str,
+        columns: list[tuple[str, sa.types.TypeEngine]],
+    ) -> None:
+        """Add several columns with one ALTER TABLE in one transaction.
+
+        Args:
+            full_table_name: The target table name.
+            columns: The name and type of each new column.
+
+        Raises:
+            NotImplementedError: if adding columns is not supported.
+        """
+        if not self.allow_column_add:
+            msg = "Adding columns is not supported."
+            raise NotImplementedError(msg)
+
+        # The mssql dialect only compiles columns that belong to a table
+        _, schema_name, table_name = self.parse_full_table_name(full_table_name)
+        table = sa.Table(
+            table_name,
+            sa.MetaData(),
+            *[sa.Column(column_name, sql_type) for column_name, sql_type in columns],
+            schema=schema_name,
+        )
+        column_clauses = [
+            sa.schema.CreateColumn(column).compile(self._engine).string
+            for column in table.columns
+        ]
+        column_add_ddl = (
+            f"ALTER TABLE {self.quote_table_name(full_table_name)} "
+            f"ADD {', '.join(column_clauses)}"
+        )
+        self.logger.info(column_add_ddl)
+        with self._connect() as conn, conn.begin():
+            conn.exec_driver_sql(column_add_ddl)
+        self.refresh_catalog_table(full_table_name)
 
     def _create_empty_column(
         self,
@@ -427,6 +1069,7 @@ class MSSQLConnector(SQLConnector):
             column_type=sql_type
         )
         self.raw_conn_execute(str(column_add_ddl))
+        self.refresh_catalog_table(full_table_name)
 
     def rename_column(
             self,
@@ -454,6 +1097,88 @@ class MSSQLConnector(SQLConnector):
             new_column_name=new_name
         )
         self.raw_conn_execute(str(column_rename_ddl))
+        self.refresh_catalog_table(full_table_name)
+
+    def get_table_type(
+        self,
+        conn: sa.engine.Connection,
+        schema_name: str,
+        table_name: str,
+        columns: t.Sequence[sa.Column],
+    ) -> str:
+        """Return a user-defined table type with the given columns.
+
+        The type name ends in a hash of the column definitions so when the
+        table's columns change a new type is created.  Types left behind
+        for the table's earlier columns, by this run or an earlier one,
+        are then dropped.
+
+        Anything run on `conn` is committed before this returns, so call it
+        before the write's transaction is begun.
+
+        Args:
+            conn: The connection the write will use.
+            schema_name: The schema to create the type in.
+            table_name: The table the type is for.
+            columns: The table's columns.
+
+        Returns:
+            The name of the table type, without the schema.
+        """
+        preparer = self._dialect.identifier_preparer
+        column_definitions = [
+            f"{preparer.quote(column.name)} {column.type.compile(self._dialect)} NULL"
+            for column in columns
+        ]
+        digest = hashlib.sha1(
+            "\n".join(column_definitions).encode(),
+            usedforsecurity=False,
+        ).hexdigest()[:12]
+        # Type names are limited to 128 characters like every other name
+        type_prefix = f"{table_name[:111]}_tvp_"
+        type_name = f"{type_prefix}{digest}"
+        cache_key = f"{schema_name}.{table_name}".lower()
+
+        with self._table_types_lock:
+            if self._table_types.get(cache_key) == type_name:
+                return type_name
+
+            full_type_name = (
+                f"{preparer.quote_schema(schema_name)}.{preparer.quote(type_name)}"
+            )
+            type_id = conn.execute(
+                sa.text("SELECT TYPE_ID(:type_name)"),
+                {"type_name": full_type_name},
+            ).scalar()
+            if type_id is None:
+                conn.exec_driver_sql(f"CREATE TYPE {full_type_name} AS TABLE ({', '.join(column_definitions)})")  # noqa: E501
+            conn.commit()
+            self._table_types[cache_key] = type_name
+
+            old_type_names = [
+                name
+                for name in conn.execute(
+                    sa.text(
+                        "SELECT name FROM sys.table_types "
+                        "WHERE schema_id = SCHEMA_ID(:schema_name) "
+                        "AND name <> :type_name"
+                    ),
+                    {"schema_name": schema_name, "type_name": type_name},
+                ).scalars()
+                if re.fullmatch(f"{re.escape(type_prefix)}[0-9a-f]{{12}}", name)
+            ]
+            conn.commit()
+            for old_type_name in old_type_names:
+                try:
+                    conn.exec_driver_sql(f"DROP TYPE {preparer.quote_schema(schema_name)}.{preparer.quote(old_type_name)}")  # noqa: E501
+                    conn.commit()
+                except exc.DBAPIError as e:  # noqa: PERF203
+                    # Another load may still be using it
+                    conn.rollback()
+                    self.logger.warning(
+                        "Unable to drop table type %s: %s", old_type_name, e
+                    )
+            return type_name
 
     def raw_conn_execute(self, sql_command: str) -> None:
         """Run direct SQL commands via SQLA raw connection.
@@ -474,62 +1199,473 @@ class MSSQLConnector(SQLConnector):
         finally:
             raw_conn.close()
 
-    @staticmethod
-    def get_column_rename_ddl(
-        table_name: str,
-        column_name: str,
-        new_column_name: str
-    ) -> sa.DDL:
-        """Get the create column DDL statement.
-
-        Override this if your database uses
-        a different syntax for renaming columns.
+    def is_clustered_columnstore(self, full_table_name: str) -> bool:
+        """Determine if a table is stored as a clustered columnstore index.
 
         Args:
-            table_name: Fully qualified table name of column to alter.
-            column_name: Existing column name.
-            new_column_name: New column name.
+            full_table_name: The fully qualified table name.
 
         Returns:
-            A sqlalchemy DDL instance.
+            True if the table has a clustered columnstore index.
         """
-        full_column_name = f"'{table_name}.{column_name}'"
-        new_column_name = f"'{new_column_name}'"
-        object_type: str = "'COLUMN'"
+        with self._connect() as conn:
+            return bool(
+                conn.execute(
+                    sa.text(
+                        "SELECT COUNT(*) FROM sys.indexes "
+                        "WHERE object_id = OBJECT_ID(:table_name) AND type = 5"
+                    ),
+                    {"table_name": self.quote_table_name(full_table_name)},
+                ).scalar()
+            )
 
-        return sa.DDL(
-            "EXEC sp_rename %(full_column_name)s, %(new_column_name)s, %(object_type)s",
-            {
-                "full_column_name": full_column_name,
-                "new_column_name": new_column_name,
-                "object_type": object_type,
-            },
-        )
+    def allows_minimal_logging(self) -> bool:
+        """Determine if the database's recovery model allows minimally logged inserts.
 
-    def get_column_add_ddl(
-        self,
-        table_name: str,
-        column_name: str,
-        column_type: sa.types.TypeEngine
-    ) -> sa.DDL:
-        """Get the create column DDL statement.
+        Only the SIMPLE and BULK_LOGGED recovery models log TABLOCK inserts
+        minimally.  Under FULL every row is logged anyway so bulk load mode
+        is left off.
 
-        Override this if your database uses a different syntax for creating columns.
+        Returns:
+            True if the recovery model is SIMPLE or BULK_LOGGED.
+        """
+        if self._recovery_model is None:
+            with self._connect() as conn:
+                self._recovery_model = str(
+                    conn.execute(
+                        sa.text("SELECT recovery_model_desc FROM sys.databases WHERE name = DB_NAME()")  # noqa: E501
+                    ).scalar()
+                )
+            if self._recovery_model not in {"SIMPLE", "BULK_LOGGED"}:
+                self.logger.warning(
+                    "The database uses the %s recovery model so inserts can't be "
+                    "minimally logged. bulk_load is being ignored.",
+                    self._recovery_model,
+                )
+        return self._recovery_model in {"SIMPLE", "BULK_LOGGED"}
+
+    def disable_indexes(self, full_table_name: str) -> list[str]:
+        """Disable a table's nonclustered indexes.
+
+        Indexes behind a primary key or a unique constraint, unique indexes
+        and indexes that are already disabled are left alone.  The names
+        are recorded on the table first, in the DISABLED_INDEXES_PROPERTY
+        extended property, so a run that dies before rebuilding them leaves
+        a note for the next one.
 
         Args:
-            table_name: Fully qualified table name of column to alter.
-            column_name: Column name to create.
-            column_type: New column sqlalchemy type.
+            full_table_name: The fully qualified table name.
 
         Returns:
-            A sqlalchemy DDL instance.
+            The names of the indexes that were disabled.
         """
-        create_column_clause = sa.schema.CreateColumn(
-            sa.Column(
-                column_name,
-                column_type,
+        with self._connect() as conn:
+            index_names = list(
+                conn.execute(
+                    sa.text(
+                        "SELECT name FROM sys.indexes "
+                        "WHERE object_id = OBJECT_ID(:table_name) "
+                        "AND type_desc = 'NONCLUSTERED' "
+                        "AND is_primary_key = 0 AND is_unique_constraint = 0 "
+                        "AND is_unique = 0 AND is_disabled = 0"
+                    ),
+                    {"table_name": self.quote_table_name(full_table_name)},
+                ).scalars()
             )
+        if not index_names:
+            return index_names
+
+        self.record_disabled_indexes(
+            full_table_name,
+            [*self.get_disabled_index_record(full_table_name), *index_names],
         )
+        for index_name in index_names:
+            self.raw_conn_execute(
+                f"ALTER INDEX {self._dialect.identifier_preparer.quote(index_name)} "
+                f"ON {self.quote_table_name(full_table_name)} DISABLE"
+            )
+        return index_names
+
+    def rebuild_indexes(self, full_table_name: str, index_names: list[str]) -> None:
+        """Rebuild indexes that were disabled for a bulk load.
+
+        The record of them left by `disable_indexes` is dropped once they
+        have all been rebuilt.
+
+        Args:
+            full_table_name: The fully qualified table name.
+            index_names: The indexes to rebuild.
+        """
+        for index_name in index_names:
+            self.raw_conn_execute(
+                f"ALTER INDEX {self._dialect.identifier_preparer.quote(index_name)} "
+                f"ON {self.quote_table_name(full_table_name)} REBUILD"
+            )
+        self.record_disabled_indexes(full_table_name, [])
+
+    def get_disabled_index_record(self, full_table_name: str) -> list[str]:
+        """Return the indexes an earlier bulk load disabled and never rebuilt.
+
+        Args:
+            full_table_name: The fully qualified table name.
+
+        Returns:
+            The index names recorded on the table.
+        """
+        with self._connect() as conn:
+            value = conn.execute(
+                sa.text(
+                    "SELECT CAST(value AS NVARCHAR(MAX)) FROM sys.extended_properties "
+                    "WHERE class = 1 AND major_id = OBJECT_ID(:table_name) "
+                    "AND minor_id = 0 AND name = :property_name"
+                ),
+                {
+                    "table_name": self.quote_table_name(full_table_name),
+                    "property_name": DISABLED_INDEXES_PROPERTY,
+                },
+            ).scalar()
+        return json.loads(value) if value else []
+
+    def record_disabled_indexes(
+        self, full_table_name: str, index_names: list[str]
+    ) -> None:
+        """Record the table's disabled indexes in an extended property.
+
+        Args:
+            full_table_name: The fully qualified table name.
+            index_names: The disabled indexes.  An empty list drops the
+                property.
+        """
+        _, schema_name, table_name = self.parse_full_table_name(full_table_name)
+        level_arguments = (
+            "@level0type = N'SCHEMA', @level0name = :schema_name, "
+            "@level1type = N'TABLE', @level1name = :table_name"
+        )
+        parameters = {
+            "property_name": DISABLED_INDEXES_PROPERTY,
+            "schema_name": schema_name or "dbo",
+            "table_name": table_name,
+        }
+        with self._connect() as conn:
+            conn.execute(
+                sa.text(
+                    # level_arguments only holds bind parameters
+                    "IF EXISTS (SELECT 1 FROM sys.extended_properties "  # noqa: S608
+                    "WHERE class = 1 AND major_id = OBJECT_ID(:full_table_name) "
+                    "AND minor_id = 0 AND name = :property_name) "
+                    "EXEC sys.sp_dropextendedproperty @name = :property_name, "
+                    f"{level_arguments}"
+                ),
+                {
+                    **parameters,
+                    "full_table_name": self.quote_table_name(full_table_name),
+                },
+            )
+            if index_names:
+                conn.execute(
+                    sa.text(
+                        "EXEC sys.sp_addextendedproperty @name = :property_name, "
+                        f"@value = :value, {level_arguments}"
+                    ),
+                    {**parameters, "value": json.dumps(sorted(set(index_names)))},
+                )
+            conn.commit()
+
+    def quote_table_name(self, full_table_name: str) -> str:
+        """Return a quoted schema.table name.
+
+        Args:
+            full_table_name: The fully qualified table name.
+
+        Returns:
+            The quoted name.
+        """
+        _, schema_name, table_name = self.parse_full_table_name(full_table_name)
+        preparer = self._dialect.identifier_preparer
+        if schema_name:
+            return f"{preparer.quote_schema(schema_name)}.{preparer.quote(table_name)}"
+        return preparer.quote(table_name)
+
+    def size_schema(
+        self,
+        schema: dict,
+        records: list[dict],
+        key_properties: t.Sequence[str],
+    ) -> dict:
+        """Return a copy of a schema with sizes picked from sample records.
+
+        Strings and base64 binaries with no maxLength get one with room to
+        grow over the longest value sampled.  Values too long to stay in
+        row leave the column as max.  Integers with no bounds get the INT
+        range, or BIGINT when the sampled values are already near the
+        INT limits.  Key properties are left to to_sql_pk_type.
+
+        Args:
+            schema: The stream's JSON schema.
+            records: The sample records.
+            key_properties: The stream's key properties.
+
+        Returns:
+            The sized schema.
+        """
+        sized_schema = copy.deepcopy(schema)
+        for name, property_schema in sized_schema.get("properties", {}).items():
+            types = property_schema.get("type") or []
+            if isinstance(types, str):
+                types = [types]
+            if name in key_properties:
+                continue
+            values = [
+                record[name] for record in records if record.get(name) is not None
+            ]
+            if not values:
+                continue
+
+            if "string" in types and "maxLength" not in property_schema and not property_schema.get("format"):  # noqa: E501
+                if property_schema.get("contentEncoding") == "base64":
+                    # RECORD values are already decoded, batch file values
+                    # are still base64 where four characters hold three bytes
+                    longest = max(
+                        len(value) if isinstance(value, bytes) else len(value) * 3 // 4
+                        for value in values
+                    )
+                    length = self.get_sized_length(longest, MSSQL_VARCHAR_MAX_LENGTH)
+                else:
+                    longest = max(self.get_value_length(value) for value in values)
+                    length = self.get_sized_length(longest, MSSQL_NVARCHAR_MAX_LENGTH)
+                if length is not None:
+                    property_schema["maxLength"] = length
+
+            elif (
+                "integer" in types
+                and "minimum" not in property_schema
+                and "maximum" not in property_schema
+                and all(isinstance(value, int) for value in values)
+            ):
+                largest = max(abs(value) for value in values)
+                if largest * 16 <= MSSQL_INT_MAX:
+                    property_schema["minimum"] = MSSQL_INT_MIN
+                    property_schema["maximum"] = MSSQL_INT_MAX
+                else:
+                    property_schema["minimum"] = MSSQL_BIGINT_MIN
+                    property_schema["maximum"] = MSSQL_BIGINT_MAX
+        return sized_schema
+
+    def get_widened_type(
+        self,
+        sql_type: sa.types.TypeEngine,
+        values: t.Iterable[t.Any],
+    ) -> sa.types.TypeEngine | None:
+        """Return a wider column type if some values don't fit the current one.
+
+        Args:
+            sql_type: The column's current type.
+            values: The values about to be written to the column.
+
+        Returns:
+            The new type or None if every value fits.
+        """
+        if isinstance(sql_type, (sa.String, sa.VARBINARY)) and sql_type.length:
+            is_binary = isinstance(sql_type, sa.VARBINARY)
+            longest = max(
+                (
+                    len(value) if is_binary else self.get_value_length(value)
+                    for value in values
+                    if isinstance(value, (str, bytes))
+                ),
+                default=0,
+            )
+            if longest <= sql_type.length:
+                return None
+            limit = MSSQL_NVARCHAR_MAX_LENGTH if isinstance(sql_type, sa.Unicode) else MSSQL_VARCHAR_MAX_LENGTH  # noqa: E501
+            widened_type = copy.copy(sql_type)
+            widened_type.length = self.get_sized_length(longest, limit)
+            return widened_type
+
+        if isinstance(sql_type, sa.Integer) and not isinstance(sql_type, sa.BigInteger):
+            if isinstance(sql_type, mssql.TINYINT):
+                minimum, maximum = MSSQL_TINYINT_MIN, MSSQL_TINYINT_MAX
+            elif isinstance(sql_type, sa.SmallInteger):
+                minimum, maximum = MSSQL_SMALLINT_MIN, MSSQL_SMALLINT_MAX
+            else:
+                minimum, maximum = MSSQL_INT_MIN, MSSQL_INT_MAX
+            for value in values:
+                if isinstance(value, int) and not minimum <= value <= maximum:
+                    return mssql.BIGINT()
+        return None
+
+    def alter_column_type(
+        self,
+        full_table_name: str,
+        column: sa.Column,
+        sql_type: sa.types.TypeEngine,
+    ) -> None:
+        """Change the type of a column, keeping its nullability.
+
+        Args:
+            full_table_name: The fully qualified table name.
+            column: The column to change.
+            sql_type: The new type.
+        """
+        self.raw_conn_execute(
+            f"ALTER TABLE {self.quote_table_name(full_table_name)} "
+            f"ALTER COLUMN {self._dialect.identifier_preparer.quote(column.name)} "
+            f"{sql_type.compile(dialect=self._dialect)} "
+            f"{'NULL' if column.nullable else 'NOT NULL'}"
+        )
+        self.refresh_catalog_table(full_table_name)
+
+    @staticmethod
+    def get_sized_length(longest: int, limit: int) -> int | None:
+        """Return a column length with room to grow over the longest value.
+
+        Args:
+            longest: The length of the longest value.
+            limit: The longest length that stays in row.
+
+        Returns:
+            The smallest power of two at least twice the longest value, or
+            None for max when that would pass the limit.
+        """
+        if longest * 2 > limit:
+            return None
+        length = MSSQL_MIN_SIZED_LENGTH
+        while length < longest * 2:
+            length *= 2
+        return min(length, limit)
+
+    @staticmethod
+    def get_value_length(value: str) -> int:
+        """Return a length that fits a string in VARCHAR or NVARCHAR.
+
+        UTF-8 never takes fewer bytes than UTF-16 takes code units so
+        the UTF-8 length is safe for either.
+
+        Args:
+            value: The string.
+
+        Returns:
+            The length in characters for ASCII or UTF-8 bytes otherwise.
+        """
+        return len(value) if value.isascii() else len(value.encode())
+
+    def get_shadow_table_name(self, full_table_name: str) -> str:
+        """Return the name of the table an overwrite swap loads into.
+
+        Args:
+            full_table_name: The fully qualified name of the live table.
+
+        Returns:
+            The fully qualified shadow table name.
+        """
+        db_name, schema_name, table_name = self.parse_full_table_name(full_table_name)
+        return self.get_fully_qualified_name(
+            table_name=f"{table_name[:122]}__swap",
+            schema_name=schema_name,
+            db_name=db_name,
+        )
+
+    def swap_table(self, shadow_table_name: str, full_table_name: str) -> None:
+        """Replace a table with its fully loaded shadow table.
+
+        Both renames happen in one short transaction so readers see either
+        the old table or the new one.  The old table is dropped after the
+        swap has committed.
+
+        Args:
+            shadow_table_name: The fully qualified name of the loaded table.
+            full_table_name: The fully qualified name of the live table.
+        """
+        _, schema_name, table_name = self.parse_full_table_name(full_table_name)
+        old_table_part = f"{table_name[:123]}__old"
+        old_table_name = self.get_fully_qualified_name(
+            table_name=old_table_part,
+            schema_name=schema_name,
+        )
+
+        self.logger.info("Swapping %s in for %s", shadow_table_name, full_table_name)
+        rename_sql = sa.text("EXEC sp_rename @objname = :objname, @newname = :newname")
+        with self._connect() as conn, conn.begin():
+            # Left over from a swap that failed before the drop
+            conn.exec_driver_sql(
+                f"DROP TABLE IF EXISTS {self.quote_table_name(old_table_name)}"
+            )
+            conn.execute(
+                rename_sql,
+                {
+                    "objname": self.quote_table_name(full_table_name),
+                    "newname": old_table_part,
+                },
+            )
+            conn.execute(
+                rename_sql,
+                {
+                    "objname": self.quote_table_name(shadow_table_name),
+                    "newname": table_name,
+                },
+            )
+
+        self.raw_conn_execute(f"DROP TABLE {self.quote_table_name(old_table_name)}")
+        self.refresh_catalog_table(full_table_name)
+        self.refresh_catalog_table(shadow_table_name)
+
+    @staticmethod
+    def get_column_rename_ddl(
+        table_name: str,
+        column_name: str,
+        new_column_name: str
+    ) -> sa.DDL:
+        """Get the create column DDL statement.
+
+        Override this if your database uses
+        a different syntax for renaming columns.
+
+        Args:
+            table_name: Fully qualified table name of column to alter.
+            column_name: Existing column name.
+            new_column_name: New column name.
+
+        Returns:
+            A sqlalchemy DDL instance.
+        """
+        full_column_name = f"'{table_name}.{column_name}'"
+        new_column_name = f"'{new_column_name}'"
+        object_type: str = "'COLUMN'"
+
+        return sa.DDL(
+            "EXEC sp_rename %(full_column_name)s, %(new_column_name)s, %(object_type)s",
+            {
+                "full_column_name": full_column_name,
+                "new_column_name": new_column_name,
+                "object_type": object_type,
+            },
+        )
+
+    def get_column_add_ddl(
+        self,
+        table_name: str,
+        column_name: str,
+        column_type: sa.types.TypeEngine
+    ) -> sa.DDL:
+        """Get the create column DDL statement.
+
+        Override this if your database uses a different syntax for creating columns.
+
+        Args:
+            table_name: Fully qualified table name of column to alter.
+            column_name: Column name to create.
+            column_type: New column sqlalchemy type.
+
+        Returns:
+            A sqlalchemy DDL instance.
+        """
+        column = sa.Column(
+            column_name,
+            column_type,
+        )
+        # The mssql dialect only compiles columns that belong to a table
+        sa.Table("column_add", sa.MetaData(), column)
+        create_column_clause = sa.schema.CreateColumn(column)
         compiled = create_column_clause.compile(self._engine).string
         return sa.DDL(
             "ALTER TABLE %(table_name)s ADD %(create_column_clause)s",
@@ -547,6 +1683,24 @@ class MSSQLSink(SQLSink):
 
     _target_table: sa.Table = None
     _insert_statement: sa.Insert = None
+    _row_converters: list[tuple[str, t.Callable | None]] | None = None
+    _record_keys: list[str] | None = None
+    _insertable_columns: list[sa.Column] | None = None
+    _positional_insert_sql: dict[str, str] | None = None
+    _staging_table: sa.Table | None = None
+    _bulk_copy_warned: bool = False
+    _tvp_warned: bool = False
+    _tvp_insert_sql: dict[str, str] | None = None
+    _table_type_name: str | None = None
+    _multi_row_insert_sql: dict[tuple[str, int], str] | None = None
+    _dead_letter_writer: DeadLetterWriter | None = None
+    _writer: ThreadPoolExecutor | None = None
+    _slice_writers: ThreadPoolExecutor | None = None
+    _batch_sizer: AdaptiveBatchSize | None = None
+    _disabled_indexes: list[str] | None = None
+    _table_swapped: bool = False
+    _table_deferred: bool = False
+    _columnstore: bool | None = None
 
     def __init__(
         self,
@@ -566,6 +1720,26 @@ class MSSQLSink(SQLSink):
             connector: Optional connector to reuse.
         """
         self.message_reader_class = target.message_reader_class()
+        self._record_counter_lock = threading.Lock()
+        self._table_lock = threading.Lock()
+        self._write_futures: collections.deque[Future] = collections.deque()
+        self._write_futures_lock = threading.Lock()
+
+        # Stage timings are kept on the target too so it can write a
+        # summary of every stream at the end of the run.
+        self.stage_timer = StageTimer(
+            stream_name, enabled=target.config.get("stage_metrics", False)
+        )
+        target.stage_timers[stream_name] = self.stage_timer
+        if self.stage_timer.enabled:
+            self.message_reader_class.stage_timer = self.stage_timer
+        self.profiler: StreamProfiler | None = None
+        if target.config.get("profile_stream") == stream_name:
+            self.profiler = StreamProfiler(
+                target.config.get("profile_path", "."),
+                stream_name,
+                target.logger,
+            )
 
         super().__init__(target, stream_name, schema, key_properties, connector)
 
@@ -595,6 +1769,285 @@ class MSSQLSink(SQLSink):
         """
         return self._target_table
 
+    def stream_option(self, key: str, default: t.Any = None) -> t.Any:  # noqa: ANN401
+        """Return a setting for this stream.
+
+        Settings in `stream_options` for the stream win over the
+        top level setting of the same name.
+
+        Args:
+            key: The setting name.
+            default: What to return when the setting isn't there.
+
+        Returns:
+            The setting's value.
+        """
+        stream_options: dict = self.config.get("stream_options") or {}
+        return stream_options.get(self.stream_name, {}).get(
+            key, self.config.get(key, default)
+        )
+
+    @property
+    def insert_method(self) -> str:
+        """Return the method used to send batches to the target table.
+
+        Returns:
+            One of `insert`, `bulk_copy`, `tvp` or `multi_row_values`.
+        """
+        return self.config.get("insert_method", "insert")
+
+    @property
+    def full_table_name(self) -> str:
+        """Return the fully qualified name of the table being loaded.
+
+        An overwrite swap loads a shadow table that replaces the live table
+        once the stream is done.
+
+        Returns:
+            The fully qualified table name.
+        """
+        full_table_name = super().full_table_name
+        if self.use_table_swap:
+            return self.connector.get_shadow_table_name(full_table_name)
+        return full_table_name
+
+    @cached_property
+    def table_storage(self) -> TableStorage | None:
+        """Return how this stream's table is stored if the target creates it.
+
+        Returns:
+            The table_storage setting or None for a plain table.
+        """
+        return TableStorage.from_config(self.stream_option("table_storage"))
+
+    def setup(self) -> None:
+        """Set up Sink.
+
+        The table storage options are handed to the connector before the
+        SDK creates the table.  With infer_column_sizes on a new table is
+        only created once the first batch arrives.
+        """
+        self.connector.set_table_storage(self.full_table_name, self.table_storage)
+        if self.infer_column_sizes and not self.connector.table_exists(
+            self.full_table_name
+        ):
+            if self.schema_name:
+                self.connector.prepare_schema(self.schema_name)
+            self._table_deferred = True
+            return
+        super().setup()
+
+    @property
+    def infer_column_sizes(self) -> bool:
+        """Return True when column sizes are picked from the data.
+
+        Returns:
+            The infer_column_sizes setting.
+        """
+        return self.stream_option("infer_column_sizes", default=False)
+
+    def create_deferred_table(self, records: list[dict] | None) -> None:
+        """Create a table that setup left for the first batch.
+
+        Args:
+            records: The first batch, before it is conformed, or None to
+                create the table from the schema alone.
+        """
+        with self._table_lock:
+            if not self._table_deferred:
+                return
+            schema = self.schema
+            if records:
+                with self.stage_timer.time("sizing", len(records)):
+                    schema = self.connector.size_schema(
+                        schema, records, self._key_properties
+                    )
+            self.connector.prepare_table(
+                full_table_name=self.full_table_name,
+                schema=self.conform_schema(schema),
+                primary_keys=self.key_properties,
+                as_temp_table=False,
+            )
+            self._table_deferred = False
+
+    def widen_columns(self, rows: list[dict] | list[tuple]) -> None:
+        """Widen the columns some of a batch's values don't fit in.
+
+        Rows can be conformed records or tuples in target table column
+        order.  Primary key columns are never changed.
+
+        Args:
+            rows: The batch about to be written.
+        """
+        if not rows or not self.get_widened_columns(rows):
+            return
+
+        # Check again under the lock so two workers can't
+        # both widen the same column to different sizes.
+        with self._table_lock:
+            widened_columns = self.get_widened_columns(rows)
+            for column, widened_type in widened_columns:
+                self.logger.info(
+                    "Widening %s.%s from %s to %s",
+                    self.full_table_name,
+                    column.name,
+                    column.type,
+                    widened_type,
+                )
+                self.connector.alter_column_type(
+                    self.full_table_name, column, widened_type
+                )
+            if widened_columns:
+                self.set_target_table(self.full_table_name)
+                self._insert_statement = self.get_insert_statement(self.target_table)
+                self._row_converters = None
+                self._record_keys = None
+                self._insertable_columns = None
+                self._staging_table = None
+
+    def get_widened_columns(
+        self,
+        rows: list[dict] | list[tuple],
+    ) -> list[tuple[sa.Column, sa.types.TypeEngine]]:
+        """Return the columns of the target table that need widening.
+
+        Args:
+            rows: Conformed records or row tuples.
+
+        Returns:
+            Column and new type pairs.
+        """
+        widened_columns = []
+        by_position = isinstance(rows[0], tuple)
+        columns = (
+            self.get_insertable_columns()
+            if by_position
+            else list(self.target_table.columns)
+        )
+        with self.stage_timer.time("sizing", len(rows)):
+            for position, column in enumerate(columns):
+                if column.primary_key:
+                    continue
+                if by_position:
+                    values = (row[position] for row in rows)
+                else:
+                    values = (row.get(column.name) for row in rows)
+                widened_type = self.connector.get_widened_type(column.type, values)
+                if widened_type is not None:
+                    widened_columns.append((column, widened_type))
+        return widened_columns
+
+    @cached_property
+    def use_table_swap(self) -> bool:
+        """Return True when an overwrite load goes through a shadow table.
+
+        A table that doesn't exist yet has no readers so it is loaded
+        directly.
+
+        Returns:
+            True if load_method is overwrite, overwrite_strategy is swap and
+            the table already exists.
+        """
+        return (
+            self.config.get("load_method") == TargetLoadMethods.OVERWRITE
+            and self.stream_option("overwrite_strategy", "drop") == "swap"
+            and self.connector.table_exists(super().full_table_name)
+        )
+
+    @cached_property
+    def use_bulk_load(self) -> bool:
+        """Return True when inserts should take a table lock.
+
+        Returns:
+            True if bulk_load is on and the recovery model allows minimal logging.
+        """
+        return (
+            bool(self.stream_option("bulk_load", default=False))
+            and self.connector.allows_minimal_logging()
+        )
+
+    @property
+    def table_hint(self) -> str:
+        """Return the table hint that goes after the table name of an INSERT.
+
+        Returns:
+            ` WITH (TABLOCK)` in bulk load mode, otherwise an empty string.
+        """
+        return " WITH (TABLOCK)" if self.use_bulk_load else ""
+
+    def get_insert_statement(self, table: sa.Table) -> sa.Insert:
+        """Return an INSERT for a table, with TABLOCK in bulk load mode.
+
+        Args:
+            table: The target table or a staging table with the same columns.
+
+        Returns:
+            The insert statement.
+        """
+        insert_statement = table.insert()
+        if self.use_bulk_load:
+            insert_statement = insert_statement.with_hint(
+                "WITH (TABLOCK)", dialect_name="mssql"
+            )
+        return insert_statement
+
+    def start_bulk_load(self) -> None:
+        """Disable the target table's nonclustered indexes for the load.
+
+        Only done in bulk load mode with bulk_load_disable_indexes on.  The
+        indexes are rebuilt when the sink is cleaned up, or as soon as one
+        of its writes fails.
+
+        Indexes an earlier run disabled and never got to rebuild are taken
+        over by this load, or rebuilt now when this run won't bulk load.
+        """
+        disable_indexes = self.stream_option("bulk_load_disable_indexes", default=False)
+        if self._disabled_indexes is not None or not disable_indexes:
+            return
+
+        left_disabled = self.connector.get_disabled_index_record(self.full_table_name)
+        if not self.use_bulk_load:
+            if left_disabled:
+                self.logger.info(
+                    "Rebuilding indexes an earlier load left disabled: %s",
+                    left_disabled,
+                )
+                self.connector.rebuild_indexes(self.full_table_name, left_disabled)
+            self._disabled_indexes = []
+            return
+
+        self._disabled_indexes = [
+            *left_disabled,
+            *self.connector.disable_indexes(self.full_table_name),
+        ]
+
+    def finish_bulk_load(self) -> None:
+        """Rebuild the indexes `start_bulk_load` disabled."""
+        if self._disabled_indexes:
+            self.connector.rebuild_indexes(self.full_table_name, self._disabled_indexes)
+        self._disabled_indexes = None
+
+    @contextmanager
+    def rebuilding_indexes_on_error(self) -> t.Iterator[None]:
+        """Rebuild the disabled indexes if the block fails.
+
+        Yields:
+            Nothing.
+        """
+        try:
+            yield
+        except BaseException:
+            if self._disabled_indexes:
+                try:
+                    self.finish_bulk_load()
+                except Exception:
+                    self.logger.exception(
+                        "Unable to rebuild the disabled indexes of %s, "
+                        "the next load with bulk_load_disable_indexes on will",
+                        self.full_table_name,
+                    )
+            raise
+
     def conform_name(
         self,
         name: str,
@@ -623,9 +2076,24 @@ class MSSQLSink(SQLSink):
         return name
         # return super().conform_name(name)
 
+    @cached_property
+    def preprocess_plan(self) -> PreprocessPlan:
+        """Return the record conversion plan for the stream's schema.
+
+        A new sink is created whenever the SCHEMA changes so the plan
+        only has to be worked out once per sink.
+
+        Returns:
+            The PreprocessPlan for this sink's schema.
+        """
+        return PreprocessPlan.from_schema(self.schema)
+
     def preprocess_record(self, record: dict, context: dict) -> dict:  # noqa: ARG002
         """Process incoming record and return a modified result.
 
+        The SDK has already parsed the date and time values of a RECORD
+        message so only the binary columns need to be decoded here.
+
         Args:
             record: Individual record in the stream.
             context: Stream partition or context dictionary.
@@ -633,71 +2101,571 @@ class MSSQLSink(SQLSink):
         Returns:
             A new, processed record.
         """
-        # Get the Stream Properties Dictornary from the Schema
-        properties: dict = self.schema.get("properties")
-
-        for key, value in record.items():
-            if value is not None:
-                # Get the Item/Column property
-                property_schema: dict = properties.get(key)
-                # Decode base64 binary fields in record
-                if property_schema.get("contentEncoding") == "base64":
+        with self.stage_timer.time("preprocess"):
+            plan = self.preprocess_plan
+
+            # Drop fields the schema doesn't know about
+            if not plan.columns.issuperset(record):
+                for key in record.keys() - plan.columns:
+                    del record[key]
+
+            # Decode base64 binary fields in record
+            for key in plan.base64_columns:
+                value = record.get(key)
+                if value is not None:
                     record[key] = b64decode(value)
 
-        return record
+            return record
 
+    def preprocess_records(self, records: list[dict]) -> list[dict]:
+        """Process a whole batch of records one column at a time.
 
-    async def cleanup_batch_files(self, head: str, tail: str) -> None:
-        """ASYNC function to cleanup batch files after ingestion.
+        Batch file records don't go through the SDK's record handling so
+        the date and time values are parsed here as well as the binary
+        values being decoded.
 
         Args:
-            file_path: The Path object to the file.
-        """
-        head_path  = urllib.parse.urlparse(head).path
-        if os.name == "nt" and head_path.startswith("/"):
-           head_path = head_path[1:]
-        Path(head_path,tail).unlink()
+            records: The decoded records of a batch file.
 
-    def process_batch_files(
+        Returns:
+            The processed records.
+        """
+        with self.stage_timer.time("preprocess", len(records)):
+            plan = self.preprocess_plan
+
+            for record in records:
+                if not plan.columns.issuperset(record):
+                    for key in record.keys() - plan.columns:
+                        del record[key]
+
+            for key in plan.converted_columns:
+                present = [record for record in records if record.get(key) is not None]
+                values = self.preprocess_column(
+                    key, [record[key] for record in present]
+                )
+                for record, value in zip(present, values):
+                    record[key] = value
+
+            return records
+
+    def preprocess_column(self, key: str, values: list[t.Any]) -> list[t.Any]:
+        """Convert the values of one column of a batch.
+
+        Args:
+            key: The property name.
+            values: The values of the column.
+
+        Returns:
+            The converted values.
+        """
+        plan = self.preprocess_plan
+
+        if key in plan.base64_columns:
+            # Parquet and Arrow binary columns are already bytes
+            with self.stage_timer.time("base64", len(values)):
+                return [
+                    b64decode(value) if isinstance(value, str) else value
+                    for value in values
+                ]
+
+        datelike_type = dict(plan.datelike_columns).get(key)
+        if datelike_type is None:
+            return values
+
+        parse = DATELIKE_PARSERS[datelike_type]
+        converted: list[t.Any] = []
+        for value in values:
+            if isinstance(value, str):
+                try:
+                    value = parse(value)  # noqa: PLW2901
+                except ValueError as ex:
+                    value = handle_invalid_timestamp_in_record(  # noqa: PLW2901
+                        {},
+                        [key],
+                        value,
+                        datelike_type,
+                        ex,
+                        self.datetime_error_treatment,
+                        self.logger,
+                    )
+            converted.append(value)
+        return converted
+
+    async def cleanup_batch_files(self, head: str, tail: str) -> None:
+        """ASYNC function to cleanup batch files after ingestion.
+
+        Args:
+            file_path: The Path object to the file.
+        """
+        head_path  = urllib.parse.urlparse(head).path
+        if os.name == "nt" and head_path.startswith("/"):
+           head_path = head_path[1:]
+        Path(head_path,tail).unlink()
+
+    @cached_property
+    def session(self) -> ConnectionSession | None:
+        """Return the connections this sink keeps between batches.
+
+        Returns:
+            The session or None if persistent_connection is off.
+        """
+        if not self.config.get("persistent_connection", False):
+            return None
+        return ConnectionSession(
+            self.connector._engine,  # noqa: SLF001
+            idle_seconds=self.config.get("connection_idle_seconds", 60),
+            logger=self.logger,
+            registry=self.connector.get_session_registry(),
+        )
+
+    @property
+    def pipelined_writes(self) -> bool:
+        """Return True when batches are written by a background thread.
+
+        Returns:
+            The pipelined_writes setting.
+        """
+        return self.config.get("pipelined_writes", False)
+
+    @property
+    def concurrent_drains(self) -> bool:
+        """Return True when batches are written on the connector's drain pool.
+
+        Returns:
+            The concurrent_drains setting.
+        """
+        return self.config.get("concurrent_drains", False)
+
+    def process_batch(self, context: dict) -> None:
+        """Process a batch with the given batch context.
+
+        With `pipelined_writes` on the batch is handed to the sink's writer
+        thread and the target goes back to reading messages.  Once
+        `pipelined_queue_size` batches are waiting we block on the oldest
+        one so memory stays bounded.
+
+        With `concurrent_drains` on the batch goes to the thread pool all
+        the sinks share instead, so sinks that fill up together are written
+        at the same time.  A sink only has one write on that pool at a time
+        so its batches still commit in order.
+
+        Args:
+            context: Stream partition or context dictionary.
+        """
+        if self.concurrent_drains:
+            self.flush_writes()
+            drain_executor = self.connector.get_drain_executor()
+            self.track_write(drain_executor.submit(self.drain_batch, context))
+            return
+
+        if not self.pipelined_writes:
+            self.drain_batch(context)
+            return
+
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix=f"{self.stream_name}-writer",
+            )
+
+        self.flush_writes(keep=self.config.get("pipelined_queue_size", 2) - 1)
+        self.track_write(self._writer.submit(self.drain_batch, context))
+
+    def track_write(self, future: Future) -> None:
+        """Remember a write of this sink's that is running in the background.
+
+        Args:
+            future: The future of the write.
+        """
+        with self._write_futures_lock:
+            self._write_futures.append(future)
+        self.connector.track_write(future)
+
+    def drain_batch(self, context: dict) -> None:
+        """Write a drained batch, rebuilding disabled indexes if it fails.
+
+        Args:
+            context: Stream partition or context dictionary.
+        """
+        with self.rebuilding_indexes_on_error():
+            self.write_batch_context(context)
+
+    def write_batch_context(self, context: dict) -> None:
+        """Write the records of a drained batch, under the profiler if there is one.
+
+        Args:
+            context: Stream partition or context dictionary.
+        """
+        with self.profiling():
+            super().process_batch(context)
+
+    def profiling(self) -> t.ContextManager:
+        """Return the stream profiler's context, or a do-nothing one.
+
+        Returns:
+            A context manager.
+        """
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.profile()
+
+    def flush_writes(self, keep: int = 0) -> None:
+        """Wait for this sink's background writes to commit.
+
+        Args:
+            keep: Stop once only this many writes are still in flight.
+        """
+        while True:
+            with self._write_futures_lock:
+                if len(self._write_futures) <= keep:
+                    return
+                future = self._write_futures.popleft()
+            future.result()
+
+    def clean_up(self) -> None:
+        """Finish any background writes before the sink goes away.
+
+        An overwrite swap's shadow table is only swapped in once every
+        write has committed.
+        """
+        try:
+            try:
+                self.flush_writes()
+                # A stream with no records still gets its table
+                if self._table_deferred:
+                    self.create_deferred_table(None)
+            finally:
+                if self._writer is not None:
+                    self._writer.shutdown(wait=True)
+                    self._writer = None
+                if self._slice_writers is not None:
+                    self._slice_writers.shutdown(wait=True)
+                    self._slice_writers = None
+                if self.session is not None:
+                    self.session.close()
+                self.finish_bulk_load()
+            if self.use_table_swap and not self._table_swapped:
+                with self.stage_timer.time("swap"):
+                    self.connector.swap_table(
+                        self.full_table_name, super().full_table_name
+                    )
+                self._table_swapped = True
+        finally:
+            self.stage_timer.emit()
+            if self.profiler is not None:
+                self.profiler.dump()
+        super().clean_up()
+
+    def process_batch_files(
         self,
         encoding: BaseBatchFileEncoding,
         files: t.Sequence[str],
     ) -> None:
         """Process a batch file with the given batch context.
 
+        When `batch_file_workers` is more than one the files are decoded
+        and loaded by a pool of worker threads.  Each worker writes on its
+        own pooled connection.
+
         Args:
             encoding: The batch file encoding.
             files: The batch files to process.
+        """
+        storage = self.batch_config.storage if self.batch_config else None
+
+        # Batch files are written right away so anything queued
+        # from RECORD messages has to land first.
+        self.flush_writes()
+
+        with self.rebuilding_indexes_on_error():
+            if self._table_deferred:
+                self.create_deferred_table(
+                    self.read_batch_file_sample(encoding, files[0], storage)
+                )
+
+            # The workers share the target table and insert statement
+            # so get them in place before any of them start.
+            if self.target_table is None:
+                self.set_target_table(self.full_table_name)
+            if self._insert_statement is None:
+                self._insert_statement = self.get_insert_statement(self.target_table)
+                self.start_bulk_load()
+
+            workers: int = min(self.config.get("batch_file_workers", 1), len(files))
+            if workers <= 1:
+                for path in files:
+                    self.process_batch_file(encoding, path, storage)
+                return
+
+            with ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix=f"{self.stream_name}-batch",
+            ) as executor:
+                futures = [
+                    executor.submit(self.process_batch_file, encoding, path, storage)
+                    for path in files
+                ]
+                for future in as_completed(futures):
+                    future.result()
+
+    def process_batch_file(
+        self,
+        encoding: BaseBatchFileEncoding,
+        path: str,
+        storage: StorageTarget | None,
+    ) -> None:
+        """Load a single batch file and then delete it.
+
+        The file is only removed after all of its records have been
+        committed.
+
+        Args:
+            encoding: The batch file encoding.
+            path: The URL of the batch file.
+            storage: The configured batch storage, if any.
 
         Raises:
             NotImplementedError: If the batch file encoding is not supported.
+            ModuleNotFoundError: If the file is Parquet or Arrow and pyarrow
+                isn't installed.
         """
         file: GzipFile | t.IO
-        storage = self.batch_config.storage if self.batch_config else None
-
-        for path in files:
-            head, tail = StorageTarget.split_url(path)
-            file_storage = storage or StorageTarget.from_url(head)
+        head, tail = StorageTarget.split_url(path)
+        file_storage = storage or StorageTarget.from_url(head)
+
+        arrow_formats = (BatchFileFormat.PARQUET, ArrowIPCEncoding.__encoding_format__)
+        if encoding.format in arrow_formats and not importlib.util.find_spec("pyarrow"):
+            msg = (
+                "Loading Parquet and Arrow batch files needs pyarrow. "
+                "Install it with the parquet extra: pip install 'target-mssql[parquet]'"
+            )
+            raise ModuleNotFoundError(msg, name="pyarrow")
 
+        with self.profiling():
             if encoding.format == BatchFileFormat.JSONL:
                 with file_storage.open(tail, mode="rb") as file:
                     if encoding.compression == "gzip":
                         with gzip_open(file) as context_file:
-                            context = {
-                                "records": [
-                                    self.message_reader_class.deserialize_json(line) for line in context_file
-                                ]
-                            }
+                            self.process_batch_file_lines(context_file)
                     else:
-                        context = {"records": [self.message_reader_class.deserialize_json(line) for line in file]}
-                    self.record_counter_metric.increment(len(context["records"]))
-                    self.process_batch(context)
+                        self.process_batch_file_lines(file)
+            elif encoding.format == BatchFileFormat.PARQUET:
+                import pyarrow.parquet as pq  # noqa: PLC0415
+
+                with file_storage.open(tail, mode="rb") as file:
+                    parquet_file = pq.ParquetFile(file)
+                    self.process_record_batches(parquet_file.iter_batches(batch_size=self.max_size))
+            elif encoding.format == ArrowIPCEncoding.__encoding_format__:
+                import pyarrow as pa  # noqa: PLC0415
+
+                with file_storage.open(tail, mode="rb") as file:
+                    try:
+                        reader = pa.ipc.open_file(file)
+                        batches = (
+                            reader.get_batch(i)
+                            for i in range(reader.num_record_batches)
+                        )
+                    except pa.ArrowInvalid:
+                        # Not the random access file format so read it as a stream
+                        file.seek(0)
+                        batches = pa.ipc.open_stream(file)
+                    self.process_record_batches(batches)
             else:
                 msg = f"Unsupported batch encoding format: {encoding.format}"
                 raise NotImplementedError(msg)
 
-            # Delete Files Once injested.
-            asyncio.run(self.cleanup_batch_files(head,tail))
+        # Delete Files Once injested.
+        asyncio.run(self.cleanup_batch_files(head,tail))
+
+    def process_batch_file_lines(self, lines: t.Iterable[bytes]) -> None:
+        """Load the lines of a JSONL batch file one chunk at a time.
+
+        Chunks are written before this returns, never handed to the
+        background writers, so the file isn't deleted until every one of
+        its rows has committed.
+
+        With typed_batch_decoding on the lines are decoded straight into
+        typed values and written as rows like Parquet and Arrow batches.
+
+        Args:
+            lines: The lines of an open batch file.
+        """
+        decoder = self.batch_row_decoder
+        if decoder is None:
+            for records in self.read_batch_file_chunks(lines):
+                with self._record_counter_lock:
+                    self.record_counter_metric.increment(len(records))
+                self.write_batch_context({"records": self.preprocess_records(records)})
+            return
+
+        for values in self.read_batch_file_chunks(lines, decoder.decode):
+            with self._record_counter_lock:
+                self.record_counter_metric.increment(len(values))
+            self.write_columns(self.decoded_columns(decoder, values), len(values))
+
+    @cached_property
+    def batch_row_decoder(self) -> BatchRowDecoder | None:
+        """Return the typed decoder for JSONL batch file lines.
+
+        Returns:
+            The decoder or None if typed_batch_decoding is off.
+        """
+        if not self.config.get("typed_batch_decoding", False):
+            return None
+        return BatchRowDecoder(
+            self.schema,
+            self.message_reader_class.deserialize_json,
+            self.stage_timer,
+        )
+
+    def decoded_columns(
+        self,
+        decoder: BatchRowDecoder,
+        values: list[tuple | dict],
+    ) -> dict[str, list[t.Any]]:
+        """Turn decoded lines into lists of values keyed by column name.
+
+        Lines that came back as dicts go through `preprocess_records` first
+        so their dates and binaries are converted like any batch record.
+
+        Args:
+            decoder: The decoder the lines were read with.
+            values: Value tuples in decoder key order, or dicts.
+
+        Returns:
+            Lists of values keyed by conformed column name.
+        """
+        fallback = [value for value in values if isinstance(value, dict)]
+        if fallback:
+            self.preprocess_records(fallback)
+            keys = decoder.keys
+            values = [
+                tuple(value.get(key) for key in keys)
+                if isinstance(value, dict)
+                else value
+                for value in values
+            ]
+        return {
+            self.conform_name(key, "column"): list(column)
+            for key, column in zip(decoder.keys, zip(*values))
+        }
+
+    def process_record_batches(self, batches: t.Iterable[t.Any]) -> None:
+        """Load Arrow record batches without building a dict for each row.
+
+        Each batch is read column by column.  Columns that need converting
+        are run through `preprocess_column` and the columns are zipped
+        into row tuples in target table column order.
+
+        Args:
+            batches: pyarrow RecordBatch objects from a Parquet or Arrow file.
+        """
+        plan = self.preprocess_plan
+        for batch in batches:
+            if batch.num_rows == 0:
+                continue
+            columns: dict[str, list[t.Any]] = {}
+            for name, column in zip(batch.schema.names, batch.columns):
+                key = self.conform_name(name, "column")
+                if key not in plan.columns:
+                    continue
+                values = column.to_pylist()
+                if key in plan.converted_columns:
+                    values = self.preprocess_column(key, values)
+                columns[key] = values
+
+            with self._record_counter_lock:
+                self.record_counter_metric.increment(batch.num_rows)
+            self.write_columns(columns, batch.num_rows)
+
+    def write_columns(self, columns: dict[str, list[t.Any]], num_rows: int) -> None:
+        """Write columnar values read from a batch file.
+
+        They are zipped into row tuples unless the stream sends identity
+        values, see `use_positional_rows`.  Then they are written as
+        records holding only the columns the file has.
+
+        Args:
+            columns: Lists of values keyed by column name.
+            num_rows: The number of rows in the batch.
+        """
+        if not (self.use_merge_upsert or self.use_positional_rows):
+            records = [dict(zip(columns, values)) for values in zip(*columns.values())]
+            if self.infer_column_sizes:
+                self.widen_columns(records)
+            self.write_batch(records, self.write_records)
+            return
+
+        rows = self.columns_to_rows(self.connector._dialect, columns, num_rows)  # noqa: SLF001
+        if self.infer_column_sizes:
+            self.widen_columns(rows)
+        self.bulk_insert_rows(rows)
+
+    def read_batch_file_sample(
+        self,
+        encoding: BaseBatchFileEncoding,
+        path: str,
+        storage: StorageTarget | None,
+    ) -> list[dict] | None:
+        """Read the first chunk of a JSONL batch file to size a new table from.
+
+        Args:
+            encoding: The batch file encoding.
+            path: The URL of the batch file.
+            storage: The configured batch storage, if any.
+
+        Returns:
+            The decoded records or None for other formats.
+        """
+        if encoding.format != BatchFileFormat.JSONL:
+            return None
+
+        head, tail = StorageTarget.split_url(path)
+        file_storage = storage or StorageTarget.from_url(head)
+        with file_storage.open(tail, mode="rb") as file:
+            if encoding.compression == "gzip":
+                with gzip_open(file) as context_file:
+                    return next(self.read_batch_file_chunks(context_file), None)
+            return next(self.read_batch_file_chunks(file), None)
+
+    def read_batch_file_chunks(
+        self,
+        lines: t.Iterable[bytes],
+        decode: t.Callable[[bytes], t.Any] | None = None,
+    ) -> t.Iterator[list[t.Any]]:
+        """Decode JSONL lines into chunks of records.
+
+        The file is read as a stream so only one chunk is ever held in
+        memory.  A chunk is flushed once it reaches `batch_size_rows`
+        records or `batch_file_chunk_bytes` bytes of JSON, whichever
+        comes first.
+
+        Args:
+            lines: The lines of an open batch file.
+            decode: Decodes one line, the message reader's deserialize_json
+                when not given.
+
+        Yields:
+            Lists of decoded records.
+        """
+        max_rows: int = self.max_size
+        max_bytes: int = self.config.get(
+            "batch_file_chunk_bytes", BATCH_FILE_CHUNK_BYTES
+        )
+        deserialize_json = decode or self.message_reader_class.deserialize_json
+
+        records: list[dict] = []
+        chunk_bytes: int = 0
+        for line in lines:
+            records.append(deserialize_json(line))
+            chunk_bytes += len(line)
+            if len(records) >= max_rows or chunk_bytes >= max_bytes:
+                yield records
+                records = []
+                chunk_bytes = 0
+
+        if records:
+            yield records
 
     def set_target_table(self, full_table_name: str) -> None:
         """Populates the property _target_table."""
@@ -709,6 +2677,16 @@ class MSSQLSink(SQLSink):
         # for the Table class instance
         meta = sa.MetaData()
 
+        # The catalog cache already has the columns so we can
+        # skip the trip to the server
+        if self.connector.catalog is not None:
+            columns = self.connector.catalog.get_columns(schema_name, table_name)
+            if columns:
+                self._target_table = sa.Table(
+                    table_name, meta, *columns, schema=schema_name
+                )
+                return
+
         # This is the Table instance that will autoload
         # all the info about the table from the target server
         table: sa.Table = sa.Table(table_name, meta, autoload_with=self.connector._engine, schema=schema_name)
@@ -736,25 +2714,1244 @@ class MSSQLSink(SQLSink):
         Returns:
             True if table exists, False if not, None if unsure or undetectable.
         """
+        if self._table_deferred:
+            self.create_deferred_table(records)
+
         if self.target_table is None:
             self.set_target_table(full_table_name)
 
         if self._insert_statement is None:
-            self._insert_statement = self.target_table.insert()
+            self._insert_statement = self.get_insert_statement(self.target_table)
+            self.start_bulk_load()
+
+        # Records are read straight into row tuples when nothing
+        # needs them as dicts, so they never get conformed
+        if self.use_merge_upsert or self.use_positional_rows:
+            rows = self.records_to_rows(
+                self.connector._dialect,  # noqa: SLF001
+                records,
+                self.get_record_keys(),
+            )
+            if self.infer_column_sizes:
+                self.widen_columns(rows)
+            return self.bulk_insert_rows(rows)
 
-        conformed_records = [self.conform_record(record) for record in records]
+        with self.stage_timer.time("conform", len(records)):
+            conformed_records = [self.conform_record(record) for record in records]
 
-        # This is a insert based off SQLA example
-        # https://docs.sqlalchemy.org/en/20/dialects/mssql.html#insert-behavior
+        if self.infer_column_sizes:
+            self.widen_columns(conformed_records)
+
+        return self.write_batch(conformed_records, self.write_records)
+
+    @property
+    def use_positional_rows(self) -> bool:
+        """Return True when batches can be sent as row tuples.
+
+        Row tuples only hold the insertable columns, see
+        `get_insertable_columns`.  A stream that sends its own values for
+        an identity column keeps the SQLAlchemy insert, which turns on
+        IDENTITY_INSERT for them.
+
+        Returns:
+            True if none of the insertable columns is an identity column.
+        """
+        return not any(
+            self.is_server_filled(column) for column in self.get_insertable_columns()
+        )
+
+    @staticmethod
+    def is_server_filled(column: sa.Column) -> bool:
+        """Return True for columns the server fills in when an INSERT leaves them out.
+
+        Reflected and catalog cache tables both carry this.
+
+        Args:
+            column: A target table column.
+
+        Returns:
+            True for identity, computed and DEFAULT columns.
+        """
+        return (
+            column.identity is not None
+            or column.autoincrement is True
+            or column.computed is not None
+            or column.server_default is not None
+        )
+
+    def get_insertable_columns(self) -> list[sa.Column]:
+        """Return the target table columns a row tuple holds values for.
+
+        Columns the server fills in are left out unless the stream has a
+        property for them, so INSERTs never send NULL over an identity or
+        a DEFAULT.  Computed columns are always left out.
+
+        Returns:
+            The columns in target table column order.
+        """
+        if self._insertable_columns is None:
+            properties = {
+                self.conform_name(name, "column").casefold()
+                for name in self.schema.get("properties", {})
+            }
+            self._insertable_columns = [
+                column
+                for column in self.target_table.columns
+                if column.computed is None
+                and (
+                    column.name.casefold() in properties
+                    or not self.is_server_filled(column)
+                )
+            ]
+        return self._insertable_columns
+
+    def get_row_columns(self, table: sa.Table) -> list[sa.Column]:
+        """Return the columns row tuples hold values for in a table.
+
+        Args:
+            table: The target table or the staging table.
+
+        Returns:
+            The insertable columns of the target table, or every column of
+            the staging table.
+        """
+        if table is self.target_table:
+            return self.get_insertable_columns()
+        return list(table.columns)
+
+    def get_record_keys(self) -> list[str]:
+        """Return the record key for each insertable column of the target table.
+
+        Reading records by these keys gives the same values as conforming
+        them and reading by column name.
+
+        Returns:
+            The keys in row tuple order.
+        """
+        if self._record_keys is None:
+            conformed_names = {
+                key: self.conform_name(key) for key in self.schema.get("properties", {})
+            }
+            self._check_conformed_names_not_duplicated(conformed_names)
+            keys_by_column = {
+                name.casefold(): key for key, name in conformed_names.items()
+            }
+            self._record_keys = [
+                keys_by_column.get(column.name.casefold(), column.name)
+                for column in self.get_insertable_columns()
+            ]
+        return self._record_keys
+
+    def write_records(self, records: list[dict[str, t.Any]]) -> int:
+        """Insert conformed records in their own transaction.
+
+        Args:
+            records: The conformed records.
+
+        Returns:
+            The number of rows written.
+        """
+        with self.write_transaction() as conn:
+            return self.insert_records(conn, self.target_table, records)
+
+    def bulk_insert_rows(self, rows: list[tuple]) -> int:
+        """Write row tuples that are already in target table column order.
+
+        Args:
+            rows: The row tuples.
+
+        Returns:
+            The number of rows written.
+        """
+        if self.use_merge_upsert:
+            rows = self.deduplicate_rows(rows)
+
+        return self.write_batch(rows, self.write_rows)
+
+    @property
+    def batch_sizer(self) -> AdaptiveBatchSize | None:
+        """Return the adaptive batch size controller.
+
+        Returns:
+            The controller or None if adaptive_batch_size is off.
+        """
+        adaptive = self.stream_option("adaptive_batch_size", default=False)
+        if self._batch_sizer is None and adaptive:
+            self._batch_sizer = AdaptiveBatchSize(
+                size=super().max_size,
+                min_rows=self.stream_option("adaptive_batch_min_rows", 1000),
+                max_rows=self.stream_option("adaptive_batch_max_rows", 100000),
+                target_seconds=self.stream_option("adaptive_batch_target_seconds", 5.0),
+                max_bytes=self.stream_option("adaptive_batch_max_bytes", 268435456),
+            )
+        return self._batch_sizer
+
+    @property
+    def max_size(self) -> int:
+        """Get maximum batch size.
+
+        When adaptive_batch_size is on this is whatever size the last
+        writes worked out to.  Clustered columnstore tables round it to
+        whole compressed rowgroups for each parallel writer so the rows
+        skip the delta store.
+
+        Returns:
+            Maximum batch size
+        """
+        size = super().max_size if self.batch_sizer is None else self.batch_sizer.size
+        if self.is_columnstore:
+            rowgroup_rows = MSSQL_COLUMNSTORE_ROWGROUP_ROWS * max(1, self.stream_option("parallel_writers", 1))  # noqa: E501
+            size = max(1, round(size / rowgroup_rows)) * rowgroup_rows
+        return size
+
+    @property
+    def is_columnstore(self) -> bool:
+        """Return True when the target table is a clustered columnstore.
+
+        A table that is still to be created will be one if table_storage
+        says so.  An existing table is looked up once, whatever
+        table_storage says.
+
+        Returns:
+            True if the table uses a clustered columnstore index.
+        """
+        if self._table_deferred:
+            return self.table_storage is not None and self.table_storage.columnstore
+        if self._columnstore is None:
+            self._columnstore = self.connector.is_clustered_columnstore(
+                self.full_table_name
+            )
+        return self._columnstore
+
+    def write_batch(
+        self,
+        batch: list[_T],
+        write: t.Callable[[list[_T]], int],
+    ) -> int:
+        """Write a batch and let the batch size controller know how it went.
+
+        Args:
+            batch: Conformed records or row tuples.
+            write: The function that writes a batch in one transaction.
+
+        Returns:
+            The number of rows written.
+        """
+        started = time.perf_counter()
+        rowcount = self.write_slices(batch, write)
+        if self.batch_sizer is not None:
+            self.adapt_batch_size(batch, time.perf_counter() - started)
+        return rowcount
+
+    def adapt_batch_size(self, batch: list[t.Any], seconds: float) -> None:
+        """Resize the next batches from how long this one took to write.
+
+        The memory a batch takes is estimated from the JSON size of up to
+        ten rows spread through it.
+
+        Args:
+            batch: The batch that was written.
+            seconds: How long it took to write, commit included.
+        """
+        if not batch:
+            return
+        sample = batch[::max(1, len(batch) // 10)][:10]
+        sample_bytes = sum(len(json.dumps(item, default=str)) for item in sample)
+        batch_bytes = sample_bytes * len(batch) // len(sample)
+
+        old_size = self.batch_sizer.size
+        new_size = self.batch_sizer.observe(len(batch), seconds, batch_bytes)
+        if new_size != old_size:
+            self.logger.debug(
+                "Batch of %s rows took %.2fs, batch size is now %s.",
+                len(batch),
+                seconds,
+                new_size,
+            )
+        log_metric("gauge", MSSQLMetric.BATCH_SIZE, new_size, self.stream_name)
+
+    def write_slices(
+        self,
+        batch: list[_T],
+        write: t.Callable[[list[_T]], int],
+    ) -> int:
+        """Write a batch, split over `parallel_writers` connections if asked.
+
+        Each slice is written and retried on its own, so one slice failing
+        doesn't roll back the others.  Rows are put in slices by a hash of
+        their primary key so writers don't fight over the same keys.
+
+        Args:
+            batch: Conformed records or row tuples.
+            write: The function that writes a batch in one transaction.
+
+        Returns:
+            The number of rows written.
+
+        Raises:
+            ParallelWriteError: If any slice could not be written.
+        """
+        writers: int = min(self.stream_option("parallel_writers", 1), len(batch))
+        if writers <= 1:
+            return self.write_with_retry(batch, write)
+
+        if self._slice_writers is None:
+            self._slice_writers = ThreadPoolExecutor(
+                max_workers=self.stream_option("parallel_writers", 1),
+                thread_name_prefix=f"{self.stream_name}-slice",
+            )
+
+        futures = {
+            self._slice_writers.submit(
+                self.write_with_retry, batch_slice, write
+            ): number
+            for number, batch_slice in enumerate(self.slice_batch(batch, writers))
+            if batch_slice
+        }
         rowcount: int = 0
-        try:
-            with self.connector._connect() as conn, conn.begin():  # noqa: SLF001
-                result:sa.CursorResult = conn.execute(
-                    self._insert_statement,
-                    conformed_records)
-            rowcount = result.rowcount
-        except exc.SQLAlchemyError as e:
-            error = str(e.__dict__["orig"])
-            self.logger.info(error)
+        errors: dict[int, BaseException] = {}
+        for future in as_completed(futures):
+            error = future.exception()
+            if error is None:
+                rowcount += future.result()
+            else:
+                errors[futures[future]] = error
+
+        if errors:
+            for number, error in sorted(errors.items()):
+                self.logger.error(
+                    "Slice %s of %s for %s failed: %s",
+                    number + 1,
+                    writers,
+                    self.stream_name,
+                    self.get_error_text(error),
+                )
+            msg = (
+                f"{len(errors)} of {writers} slices of a {self.stream_name} batch "
+                "failed. "
+                f"The other slices, {rowcount} rows, were committed."
+            )
+            raise ParallelWriteError(msg) from next(iter(errors.values()))
 
         return rowcount
+
+    def slice_batch(self, batch: list[_T], slices: int) -> list[list[_T]]:
+        """Split a batch into slices by primary key hash.
+
+        Streams without key properties are dealt out round robin.
+
+        Args:
+            batch: Conformed records or row tuples.
+            slices: The number of slices.
+
+        Returns:
+            The slices, some of which may be empty.
+        """
+        batch_slices: list[list[_T]] = [[] for _ in range(slices)]
+        if not self.key_properties:
+            for number, item in enumerate(batch):
+                batch_slices[number % slices].append(item)
+            return batch_slices
+
+        key_indexes = self.get_key_indexes()
+        for item in batch:
+            if isinstance(item, dict):
+                key = tuple(item.get(key) for key in self.key_properties)
+            else:
+                key = tuple(item[index] for index in key_indexes)
+            batch_slices[hash(key) % slices].append(item)
+        return batch_slices
+
+    def write_rows(self, rows: list[tuple]) -> int:
+        """Insert or merge row tuples in their own transaction.
+
+        Args:
+            rows: Row tuples in target table column order.
+
+        Returns:
+            The number of rows written.
+        """
+        with self.write_transaction() as conn:
+            if self.use_merge_upsert:
+                return self.upsert_rows(conn, rows)
+            return self.insert_rows(conn, self.target_table, rows)
+
+    @contextmanager
+    def write_transaction(self) -> t.Iterator[sa.engine.Connection]:
+        """Open a connection and a transaction that commits when the block ends.
+
+        With persistent_connection on the connection comes from the sink's
+        session instead of the engine's pool.
+
+        The commit is timed as its own stage and the connection carries the
+        sink's stage timer so the connector can time compile and execute.
+
+        Yields:
+            The open connection.
+        """
+        connect = (
+            self.connector._connect  # noqa: SLF001
+            if self.session is None
+            else self.session.connect
+        )
+        with connect() as conn:
+            conn.info["stage_timer"] = self.stage_timer
+            try:
+                if self.insert_method == "tvp" and conn.dialect.driver == "pyodbc":
+                    # Creating the table type commits so it happens first
+                    self._table_type_name = self.connector.get_table_type(
+                        conn,
+                        self.target_table.schema or "dbo",
+                        self.table_name,
+                        self.get_insertable_columns(),
+                    )
+                transaction = conn.begin()
+                try:
+                    yield conn
+                except BaseException:
+                    transaction.rollback()
+                    raise
+                with self.stage_timer.time("commit"):
+                    transaction.commit()
+            finally:
+                conn.info.pop("stage_timer", None)
+
+    @property
+    def write_errors(self) -> tuple[type[Exception], ...]:
+        """Return the exceptions that mean a batch was refused.
+
+        Bulk copy calls the driver directly so its errors aren't wrapped
+        by SQLAlchemy.
+
+        Returns:
+            A tuple of exception classes.
+        """
+        return (exc.SQLAlchemyError, self.connector._dialect.dbapi.Error)  # noqa: SLF001
+
+    @property
+    def dead_letter_writer(self) -> DeadLetterWriter:
+        """Return where rejected records go.
+
+        Returns:
+            The sink's DeadLetterWriter.
+        """
+        if self._dead_letter_writer is None:
+            self._dead_letter_writer = DeadLetterWriter(
+                engine=self.connector._engine,  # noqa: SLF001
+                stream_name=self.stream_name,
+                config=self.config,
+                logger=self.logger,
+            )
+        return self._dead_letter_writer
+
+    def write_with_retry(
+        self,
+        batch: list[_T],
+        write: t.Callable[[list[_T]], int],
+    ) -> int:
+        """Write a batch and bisect it if the database refuses one of its rows.
+
+        Only errors a row can cause are bisected, and only when there is a
+        dead-letter file or table to put the bad rows in.  Anything else,
+        pool timeouts, login and permission failures and the like, fails
+        the write so no rows are lost.
+
+        Args:
+            batch: Conformed records or row tuples.
+            write: The function that writes `batch` in one transaction.
+
+        Returns:
+            The number of rows written.
+
+        Raises:
+            Exception: The write's error when it isn't a row error or there
+                is nowhere to dead-letter the rows.
+        """
+        if not batch:
+            return 0
+        try:
+            return self.write_whole(batch, write)
+        except self.write_errors as e:
+            if not self.is_row_error(e) or not self.dead_letter_writer.enabled:
+                raise
+            error = e
+        return self.bisect_batch(batch, write, error, depth=0)
+
+    def write_whole(
+        self,
+        batch: list[_T],
+        write: t.Callable[[list[_T]], int],
+    ) -> int:
+        """Write a batch, writing it again after a disconnect or a deadlock.
+
+        A dropped connection or being picked as a deadlock victim says
+        nothing about the rows, so the whole batch is tried again.
+
+        Args:
+            batch: Conformed records or row tuples.
+            write: The function that writes `batch` in one transaction.
+
+        Returns:
+            The number of rows written.
+        """
+        disconnects = 0
+        deadlocks = 0
+        while True:
+            try:
+                return write(batch)
+            except self.write_errors as e:  # noqa: PERF203
+                if self.is_disconnect(e) and not disconnects:
+                    disconnects += 1
+                    self.logger.warning(
+                        "Lost the connection writing %s, retrying: %s",
+                        self.stream_name,
+                        e,
+                    )
+                elif self.is_deadlock(e) and deadlocks < MSSQL_DEADLOCK_RETRIES:
+                    deadlocks += 1
+                    self.logger.warning(
+                        "Batch of %s rows for %s was a deadlock victim, retrying: %s",
+                        len(batch),
+                        self.stream_name,
+                        self.get_error_text(e),
+                    )
+                    time.sleep(0.5 * deadlocks)
+                else:
+                    raise
+
+    @staticmethod
+    def is_disconnect(error: Exception) -> bool:
+        """Determine if a write failed because the connection was lost.
+
+        Args:
+            error: The exception raised by the write.
+
+        Returns:
+            True if SQLAlchemy invalidated the connection.
+        """
+        return isinstance(error, exc.DBAPIError) and error.connection_invalidated
+
+    @classmethod
+    def is_deadlock(cls, error: Exception) -> bool:
+        """Determine if a write failed because it was chosen as a deadlock victim.
+
+        Args:
+            error: The exception raised by the write.
+
+        Returns:
+            True for SQL Server error 1205.
+        """
+        return cls.get_error_number(error) == MSSQL_DEADLOCK_ERROR_NUMBER
+
+    def is_row_error(self, error: Exception) -> bool:
+        """Determine if a write failed because of the data in one of its rows.
+
+        Integrity and data errors always are.  SQL Server raises a lot of
+        row errors as plain database errors, pymssql raises most as
+        OperationalError, so those are told apart by error number.
+
+        Args:
+            error: The exception raised by the write.
+
+        Returns:
+            True if splitting the batch could find rows to dead-letter.
+        """
+        if self.is_disconnect(error):
+            return False
+        dbapi = self.connector._dialect.dbapi  # noqa: SLF001
+        row_errors = (
+            exc.IntegrityError,
+            exc.DataError,
+            dbapi.IntegrityError,
+            dbapi.DataError,
+        )
+        if isinstance(error, row_errors):
+            return True
+        return self.get_error_number(error) in MSSQL_ROW_ERROR_NUMBERS
+
+    @staticmethod
+    def get_error_number(error: Exception) -> int | None:
+        """Return the SQL Server error number behind a write error.
+
+        pymssql puts the number first in the error's args.  pyodbc puts it
+        in brackets at the end of the message, before the ODBC call name.
+
+        Args:
+            error: A SQLAlchemy or driver error.
+
+        Returns:
+            The error number, or None when there isn't one.
+        """
+        orig = getattr(error, "orig", None) or error
+        args = getattr(orig, "args", ())
+        if args and isinstance(args[0], int):
+            return args[0]
+        match = re.search(r"\((\d+)\) \(SQL\w+\)", str(orig))
+        return int(match.group(1)) if match else None
+
+    def bisect_batch(
+        self,
+        batch: list[_T],
+        write: t.Callable[[list[_T]], int],
+        error: Exception,
+        depth: int,
+    ) -> int:
+        """Split a failed batch in half and retry each half.
+
+        Halves that fail are split again until the bad rows are on their
+        own or `dead_letter_max_depth` is reached, then they are sent to
+        the dead-letter output.  Each retry is its own transaction so the
+        good halves stay committed.
+
+        Args:
+            batch: The batch that failed.
+            write: The function that writes a batch in one transaction.
+            error: The error the batch failed with.
+            depth: How many times this batch has been split already.
+
+        Returns:
+            The number of rows written.
+        """
+        if len(batch) == 1 or depth >= self.config.get("dead_letter_max_depth", 16):
+            self.dead_letter(batch, error)
+            return 0
+
+        self.logger.info(
+            "Batch of %s rows failed, retrying it in halves: %s",
+            len(batch),
+            self.get_error_text(error),
+        )
+        middle = len(batch) // 2
+        rowcount: int = 0
+        for half in (batch[:middle], batch[middle:]):
+            try:
+                rowcount += self.write_whole(half, write)
+            except self.write_errors as e:  # noqa: PERF203
+                if not self.is_row_error(e):
+                    raise
+                rowcount += self.bisect_batch(half, write, e, depth + 1)
+        return rowcount
+
+    def dead_letter(self, batch: list[dict] | list[tuple], error: Exception) -> None:
+        """Send rejected records or rows to the dead-letter output.
+
+        Args:
+            batch: The rejected conformed records or row tuples.
+            error: The error they were rejected with.
+        """
+        column_names = [column.name for column in self.get_insertable_columns()]
+        records = [
+            item if isinstance(item, dict) else dict(zip(column_names, item))
+            for item in batch
+        ]
+        self.dead_letter_writer.write(records, self.get_error_text(error))
+
+    @staticmethod
+    def get_error_text(error: Exception) -> str:
+        """Return the database's error message.
+
+        Args:
+            error: A SQLAlchemy or driver error.
+
+        Returns:
+            The message of the underlying driver error when there is one.
+        """
+        return str(getattr(error, "orig", None) or error)
+
+    @property
+    def use_merge_upsert(self) -> bool:
+        """Return True when batches should be merged instead of appended.
+
+        Returns:
+            True if the load method is upsert and the stream has key properties.
+        """
+        return (
+            bool(self.key_properties)
+            and self.config.get("load_method") == TargetLoadMethods.UPSERT
+        )
+
+    def insert_records(
+        self,
+        conn: sa.engine.Connection,
+        table: sa.Table,
+        records: list[dict[str, t.Any]],
+    ) -> int:
+        """Send a list of conformed records to a table.
+
+        Unless `insert_method` is `insert` the records are turned into rows
+        and handed to `insert_rows`.
+
+        Args:
+            conn: An open connection with a transaction already started.
+            table: The target table or a staging table with the same columns.
+            records: The conformed records.
+
+        Returns:
+            The number of rows written.
+        """
+        if (
+            self.insert_method in {"bulk_copy", "tvp", "multi_row_values"}
+            and records
+            and self.use_positional_rows
+        ):
+            rows = self.records_to_rows(conn.dialect, records)
+            return self.insert_rows(conn, table, rows)
+
+        # This is a insert based off SQLA example
+        # https://docs.sqlalchemy.org/en/20/dialects/mssql.html#insert-behavior
+        insert_statement = (
+            self._insert_statement
+            if table is self.target_table
+            else self.get_insert_statement(table)
+        )
+        result: sa.CursorResult = conn.execute(insert_statement, records)
+        return result.rowcount
+
+    def insert_rows(
+        self,
+        conn: sa.engine.Connection,
+        table: sa.Table,
+        rows: list[tuple],
+    ) -> int:
+        """Send row tuples to a table.
+
+        When `insert_method` is `bulk_copy` the rows are handed to the
+        driver's bulk API, and when it is `tvp` they are sent as one
+        table-valued parameter.  Otherwise the rows go to pyodbc's
+        executemany when fast_executemany is on.  Without it every driver's
+        executemany is a round trip per row, so the rows are packed into
+        multi-row INSERT ... VALUES statements instead, as SQLAlchemy's
+        insertmanyvalues would.
+
+        Args:
+            conn: An open connection with a transaction already started.
+            table: The target table or a staging table with the same columns.
+            rows: Row tuples in target table column order.
+
+        Returns:
+            The number of rows written.
+        """
+        if not rows:
+            return 0
+
+        if self.insert_method == "bulk_copy" and self.bulk_copy_rows(conn, table, rows):
+            return len(rows)
+
+        if self.insert_method == "tvp" and self.tvp_insert_rows(conn, table, rows):
+            return len(rows)
+
+        fast_executemany = getattr(conn.dialect, "fast_executemany", False)
+        if conn.dialect.driver != "pyodbc" or not fast_executemany:
+            return self.multi_row_insert_rows(conn, table, rows)
+
+        if self.session is not None:
+            # Run it on the kept cursor so the prepared INSERT is reused
+            insert_sql = self.get_positional_insert_sql(conn.dialect, table)
+            timer = self.stage_timer.time("execute", len(rows))
+            with self.driver_cursor(conn) as cursor, timer:
+                cursor.fast_executemany = True
+                cursor.executemany(insert_sql, rows)
+            return len(rows)
+
+        conn.exec_driver_sql(self.get_positional_insert_sql(conn.dialect, table), rows)
+        return len(rows)
+
+    def get_key_indexes(self) -> list[int]:
+        """Return the positions of the key properties in row tuples.
+
+        SQL Server names are case-insensitive, so a table created with
+        `Id` still has the key property `id`.
+
+        Returns:
+            The index of each key property's column.
+        """
+        column_indexes = {
+            column.name.casefold(): index
+            for index, column in enumerate(self.get_insertable_columns())
+        }
+        return [column_indexes[key.casefold()] for key in self.key_properties]
+
+    def deduplicate_rows(self, rows: list[tuple]) -> list[tuple]:
+        """Keep only the last row for each primary key in a batch.
+
+        MERGE will error if more than one source row matches the same
+        target row so duplicates have to be removed before staging.
+
+        Args:
+            rows: Row tuples in target table column order.
+
+        Returns:
+            The rows with duplicate keys removed.
+        """
+        key_indexes = self.get_key_indexes()
+        latest: dict[tuple, tuple] = {}
+        for row in rows:
+            latest[tuple(row[index] for index in key_indexes)] = row
+
+        duplicates = len(rows) - len(latest)
+        if duplicates:
+            self.tally_duplicate_merged(duplicates)
+            return list(latest.values())
+        return rows
+
+    @property
+    def staging_table(self) -> sa.Table:
+        """Return the session temp table used to stage upsert batches.
+
+        Only the names and types of the target table's insertable columns
+        are copied, so the staging table has no IDENTITY, defaults or
+        constraints and every column takes NULL.
+
+        Returns:
+            A Table with the insertable columns of the target table.
+        """
+        if self._staging_table is None:
+            self._staging_table = sa.Table(
+                f"#{self.table_name}_stage",
+                sa.MetaData(),
+                *[
+                    sa.Column(column.name, column.type)
+                    for column in self.get_insertable_columns()
+                ],
+            )
+        return self._staging_table
+
+    def upsert_rows(
+        self,
+        conn: sa.engine.Connection,
+        rows: list[tuple],
+    ) -> int:
+        """Upsert a batch through a staging temp table and one MERGE.
+
+        The batch is loaded into a session #temp table shaped like the
+        target table and then applied with a single MERGE keyed on the
+        stream's primary keys.
+
+        Args:
+            conn: An open connection with a transaction already started.
+            rows: Deduplicated row tuples in target table column order.
+
+        Returns:
+            The number of rows inserted or updated.
+        """
+        preparer = conn.dialect.identifier_preparer
+        staging_name = preparer.format_table(self.staging_table)
+
+        # Pooled connections keep their session so clear out any
+        # staging table an earlier batch may have left behind.
+        conn.execute(sa.text(f"DROP TABLE IF EXISTS {staging_name}"))
+        conn.execute(sa.schema.CreateTable(self.staging_table))
+
+        self.insert_rows(conn, self.staging_table, rows)
+
+        schema_columns = {
+            name.casefold() for name in self.conform_schema(self.schema)["properties"]
+        }
+        row_columns = self.get_insertable_columns()
+        column_names = [
+            column.name
+            for column in row_columns
+            if column.name.casefold() in schema_columns
+        ]
+        key_columns = [row_columns[index].name for index in self.get_key_indexes()]
+        result: sa.CursorResult = conn.execute(
+            sa.text(self.get_merge_sql(conn.dialect, key_columns, column_names))
+        )
+        conn.execute(sa.text(f"DROP TABLE {staging_name}"))
+
+        return result.rowcount
+
+    def get_merge_sql(
+        self,
+        dialect: sa.Dialect,
+        join_keys: t.Sequence[str],
+        column_names: t.Sequence[str],
+    ) -> str:
+        """Generate the MERGE that applies the staging table to the target table.
+
+        Args:
+            dialect: The dialect of the connection the statement will run on.
+            join_keys: The primary key columns to match on.
+            column_names: The columns to update and insert.
+
+        Returns:
+            The MERGE statement as a string.
+        """
+        preparer = dialect.identifier_preparer
+        target_name = preparer.format_table(self.target_table)
+        staging_name = preparer.format_table(self.staging_table)
+        quoted_keys = [preparer.quote(key) for key in join_keys]
+        quoted_columns = [preparer.quote(name) for name in column_names]
+        update_columns = [
+            preparer.quote(name) for name in column_names if name not in join_keys
+        ]
+
+        join_condition = " AND ".join(
+            f"target.{key} = source.{key}" for key in quoted_keys
+        )
+        merge_sql = (
+            f"MERGE INTO {target_name} WITH (HOLDLOCK) AS target\n"
+            f"USING {staging_name} AS source\n"
+            f"ON {join_condition}\n"
+        )
+        if update_columns:
+            set_clause = ", ".join(
+                f"target.{name} = source.{name}" for name in update_columns
+            )
+            merge_sql += f"WHEN MATCHED THEN UPDATE SET {set_clause}\n"
+        merge_sql += (
+            f"WHEN NOT MATCHED THEN INSERT ({', '.join(quoted_columns)})\n"
+            f"VALUES ({', '.join(f'source.{name}' for name in quoted_columns)});"
+        )
+        return merge_sql
+
+    def get_row_converters(
+        self,
+        dialect: sa.Dialect,
+    ) -> list[tuple[str, t.Callable | None]]:
+        """Return the column names and bind processors of the insertable columns.
+
+        The list is in the reflected column order of the target table so
+        records can be turned into positional rows for the driver.
+
+        Args:
+            dialect: The dialect of the connection the rows will be sent on.
+
+        Returns:
+            A list of column name, bind processor pairs.
+        """
+        if self._row_converters is None:
+            self._row_converters = [
+                (column.name, column.type.bind_processor(dialect))
+                for column in self.get_insertable_columns()
+            ]
+        return self._row_converters
+
+    def records_to_rows(
+        self,
+        dialect: sa.Dialect,
+        records: t.Iterable[dict[str, t.Any]],
+        record_keys: list[str] | None = None,
+    ) -> list[tuple]:
+        """Convert conformed records into tuples in target table column order.
+
+        Missing columns are sent as None.  The column bind processors are
+        applied so the values match what SQLAlchemy would have sent.
+
+        Args:
+            dialect: The dialect of the connection the rows will be sent on.
+            records: The conformed records.
+            record_keys: Read each column from these keys instead of the
+                column names, see `get_record_keys`.
+
+        Returns:
+            A list of row tuples.
+        """
+        with self.stage_timer.time("convert"):
+            converters = self.get_row_converters(dialect)
+            if record_keys is not None:
+                converters = [
+                    (key, processor)
+                    for key, (_, processor) in zip(record_keys, converters)
+                ]
+            rows: list[tuple] = []
+            for record in records:
+                row = []
+                for name, processor in converters:
+                    value = record.get(name)
+                    if processor is not None and value is not None:
+                        value = processor(value)
+                    row.append(value)
+                rows.append(tuple(row))
+            return rows
+
+    def columns_to_rows(
+        self,
+        dialect: sa.Dialect,
+        columns: dict[str, list[t.Any]],
+        num_rows: int,
+    ) -> list[tuple]:
+        """Zip columnar values into tuples in target table column order.
+
+        Columns the batch doesn't have are sent as None.
+
+        Args:
+            dialect: The dialect of the connection the rows will be sent on.
+            columns: Lists of values keyed by column name.
+            num_rows: The number of rows in the batch.
+
+        Returns:
+            A list of row tuples.
+        """
+        with self.stage_timer.time("convert", num_rows):
+            missing: list[t.Any] = [None] * num_rows
+            ordered: list[list[t.Any]] = []
+            for name, processor in self.get_row_converters(dialect):
+                values = columns.get(name, missing)
+                if processor is not None and values is not missing:
+                    values = [
+                        None if value is None else processor(value)
+                        for value in values
+                    ]
+                ordered.append(values)
+            return list(zip(*ordered))
+
+    def get_positional_insert_sql(self, dialect: sa.Dialect, table: sa.Table) -> str:
+        """Return a driver level INSERT for a table.
+
+        The statement lists the columns row tuples hold, see
+        `get_row_columns`, and uses the positional placeholder of the driver.
+
+        Args:
+            dialect: The dialect of the connection the statement will run on.
+            table: The target table or a staging table with the same columns.
+
+        Returns:
+            The INSERT statement as a string.
+        """
+        if self._positional_insert_sql is None:
+            self._positional_insert_sql = {}
+        if table.fullname not in self._positional_insert_sql:
+            preparer = dialect.identifier_preparer
+            placeholder = "?" if dialect.paramstyle == "qmark" else "%s"
+            table_name = preparer.format_table(table) + self.table_hint
+            column_names = [
+                preparer.quote(column.name) for column in self.get_row_columns(table)
+            ]
+            insert_into = f"INSERT INTO {table_name} ({', '.join(column_names)})"
+            # pyformat drivers treat a bare % as the start of a placeholder
+            if placeholder == "%s":
+                insert_into = insert_into.replace("%", "%%")
+            values = ", ".join([placeholder] * len(column_names))
+            self._positional_insert_sql[table.fullname] = (
+                f"{insert_into} VALUES ({values})"
+            )
+        return self._positional_insert_sql[table.fullname]
+
+    def bulk_copy_rows(
+        self,
+        conn: sa.engine.Connection,
+        table: sa.Table,
+        rows: list[tuple],
+    ) -> bool:
+        """Load rows with the bulk copy API of the driver.
+
+        pymssql exposes the TDS bulk copy (BCP) API as `Connection.bulk_copy`.
+        pyodbc has no BCP API so the closest thing is an `executemany` with
+        `fast_executemany` turned on, which sends the rows as parameter arrays.
+
+        Args:
+            conn: An open connection with a transaction already started.
+            table: The target table or a staging table with the same columns.
+            rows: Row tuples in target table column order.
+
+        Returns:
+            True if the rows were loaded, False if bulk copy isn't available
+            or the rows leave out some of the table's columns.
+        """
+        dbapi_conn = conn.connection.dbapi_connection
+        if self.connector.config["driver_type"] == "pymssql":
+            # bulk_copy maps row values onto every column of the table
+            if len(self.get_row_columns(table)) != len(table.columns):
+                return False
+            bulk_copy = getattr(dbapi_conn, "bulk_copy", None)
+            if bulk_copy is None:
+                if not self._bulk_copy_warned:
+                    self.logger.warning(
+                        "The installed pymssql does not support bulk_copy. "
+                        "Falling back to INSERT statements."
+                    )
+                    self._bulk_copy_warned = True
+                return False
+            table_name = conn.dialect.identifier_preparer.format_table(table)
+            with self.stage_timer.time("execute", len(rows)):
+                bulk_copy(table_name, rows, tablock=self.use_bulk_load)
+            return True
+
+        cursor = dbapi_conn.cursor()
+        try:
+            cursor.fast_executemany = True
+            with self.stage_timer.time("execute", len(rows)):
+                insert_sql = self.get_positional_insert_sql(conn.dialect, table)
+                cursor.executemany(insert_sql, rows)
+        finally:
+            cursor.close()
+        return True
+
+    @staticmethod
+    def get_multi_row_size(column_count: int) -> int:
+        """Return how many rows fit in one INSERT ... VALUES statement.
+
+        SQL Server allows at most 2100 parameters per statement, and
+        one of those is kept back for the driver, and at most 1000 rows in
+        a VALUES list.
+
+        Args:
+            column_count: The number of columns in the table.
+
+        Returns:
+            The number of rows per statement.
+        """
+        rows = (MSSQL_MAX_PARAMETERS - 1) // max(column_count, 1)
+        return max(1, min(MSSQL_MAX_VALUES_ROWS, rows))
+
+    def get_multi_row_insert_sql(
+        self,
+        dialect: sa.Dialect,
+        table: sa.Table,
+        row_count: int,
+    ) -> str:
+        """Return an INSERT with a VALUES list of `row_count` rows.
+
+        A batch only ever needs two row counts, a full statement and the
+        remainder, so the statement text is cached per row count.
+
+        Args:
+            dialect: The dialect of the connection the statement will run on.
+            table: The target table or a staging table with the same columns.
+            row_count: The number of rows in the VALUES list.
+
+        Returns:
+            The INSERT statement as a string.
+        """
+        if self._multi_row_insert_sql is None:
+            self._multi_row_insert_sql = {}
+        cache_key = (table.fullname, row_count)
+        if cache_key not in self._multi_row_insert_sql:
+            positional_sql = self.get_positional_insert_sql(dialect, table)
+            insert_into, _, values = positional_sql.rpartition(" VALUES ")
+            self._multi_row_insert_sql[cache_key] = (
+                f"{insert_into} VALUES {', '.join([values] * row_count)}"
+            )
+        return self._multi_row_insert_sql[cache_key]
+
+    def multi_row_insert_rows(
+        self,
+        conn: sa.engine.Connection,
+        table: sa.Table,
+        rows: list[tuple],
+    ) -> int:
+        """Send rows as multi-row INSERT ... VALUES statements.
+
+        pymssql has no fast_executemany so an executemany is one round trip
+        per row.  Packing rows into the VALUES list cuts that down to one
+        round trip per `get_multi_row_size` rows.
+
+        Args:
+            conn: An open connection with a transaction already started.
+            table: The target table or a staging table with the same columns.
+            rows: Row tuples in target table column order.
+
+        Returns:
+            The number of rows written.
+        """
+        rows_per_statement = self.get_multi_row_size(len(self.get_row_columns(table)))
+        for start in range(0, len(rows), rows_per_statement):
+            chunk = rows[start:start + rows_per_statement]
+            conn.exec_driver_sql(
+                self.get_multi_row_insert_sql(conn.dialect, table, len(chunk)),
+                tuple(value for row in chunk for value in row),
+            )
+        return len(rows)
+
+    def get_tvp_insert_sql(self, dialect: sa.Dialect, table: sa.Table) -> str:
+        """Return an INSERT ... SELECT that reads a table-valued parameter.
+
+        Args:
+            dialect: The dialect of the connection the statement will run on.
+            table: The target table or a staging table with the same columns.
+
+        Returns:
+            The INSERT statement as a string.
+        """
+        if self._tvp_insert_sql is None:
+            self._tvp_insert_sql = {}
+        if table.fullname not in self._tvp_insert_sql:
+            preparer = dialect.identifier_preparer
+            column_names = ", ".join(
+                preparer.quote(column.name) for column in self.get_row_columns(table)
+            )
+            self._tvp_insert_sql[table.fullname] = (
+                f"INSERT INTO {preparer.format_table(table)}{self.table_hint} "  # noqa: S608
+                f"({column_names}) SELECT {column_names} FROM ?"
+            )
+        return self._tvp_insert_sql[table.fullname]
+
+    def tvp_insert_rows(
+        self,
+        conn: sa.engine.Connection,
+        table: sa.Table,
+        rows: list[tuple],
+    ) -> bool:
+        """Load rows as one table-valued parameter.
+
+        The whole batch goes to the server as a single parameter of a
+        user-defined table type matching the target table and is loaded by
+        one INSERT ... SELECT.  Only pyodbc supports table-valued parameters.
+
+        Args:
+            conn: An open connection with a transaction already started.
+            table: The target table or a staging table with the same columns.
+            rows: Row tuples in target table column order.
+
+        Returns:
+            True if the rows were loaded, False if TVPs aren't available.
+        """
+        if self.connector.config["driver_type"] != "pyodbc":
+            if not self._tvp_warned:
+                self.logger.warning(
+                    "Table-valued parameters need the pyodbc driver. "
+                    "Falling back to INSERT statements."
+                )
+                self._tvp_warned = True
+            return False
+
+        # pyodbc takes the type name and schema as the first two items
+        # of the list, followed by the rows.  write_transaction made sure
+        # the type exists.
+        table_valued_parameter = [
+            self._table_type_name,
+            self.target_table.schema or "dbo",
+            *rows,
+        ]
+        insert_sql = self.get_tvp_insert_sql(conn.dialect, table)
+        timer = self.stage_timer.time("execute", len(rows))
+        with self.driver_cursor(conn) as cursor, timer:
+            cursor.execute(insert_sql, (table_valued_parameter,))
+        return True
+
+    @contextmanager
+    def driver_cursor(self, conn: sa.engine.Connection) -> t.Iterator[t.Any]:
+        """Lend out a DB-API cursor on the connection's driver connection.
+
+        With persistent_connection on the cursor is kept with the driver
+        connection.  pyodbc only prepares a statement (sp_prepare) again
+        when its SQL text changes, so every batch after the first runs the
+        INSERT prepared by the first (sp_execute).
+
+        Args:
+            conn: An open connection.
+
+        Yields:
+            A DB-API cursor.
+        """
+        dbapi_connection = conn.connection.dbapi_connection
+        if self.session is None:
+            cursor = dbapi_connection.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+            return
+
+        cursor = conn.info.get("driver_cursor")
+        if cursor is None:
+            cursor = conn.info["driver_cursor"] = dbapi_connection.cursor()
+        try:
+            yield cursor
+        except BaseException:
+            # Start the next batch on a clean cursor
+            conn.info.pop("driver_cursor", None)
+            with suppress(Exception):
+                cursor.close()
+            raise
@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
+import json
 import sys
+from pathlib import Path
 
 from singer_sdk import typing as th
-from singer_sdk.contrib.msgspec import MsgSpecReader
 from singer_sdk.target_base import SQLTarget
 
+from .instrumentation import StageTimer, TimedMsgSpecReader
 from .sinks import MSSQLSink
 
 
@@ -16,9 +18,58 @@ class Targetmssql(SQLTarget):
 
     name = "target-mssql"
     default_sink_class = MSSQLSink
-    message_reader_class = MsgSpecReader
+    message_reader_class = TimedMsgSpecReader
     message_reader_class.default_input = sys.stdin.buffer
 
+    def __init__(self, *args, **kwargs) -> None:  # noqa: ANN002, ANN003
+        """Class Default Init."""
+        super().__init__(*args, **kwargs)
+
+        # The sinks add their stage timers here as they are created
+        self.stage_timers: dict[str, StageTimer] = {}
+        self.stage_timer = StageTimer(
+            None, enabled=self.config.get("stage_metrics", False)
+        )
+        if self.stage_timer.enabled:
+            self.message_reader.stage_timer = self.stage_timer
+        if self.config.get("max_parallelism"):
+            self.max_parallelism = self.config["max_parallelism"]
+
+    def process_endofpipe(self) -> None:
+        """Drain the sinks then report the target's stage timings."""
+        super().process_endofpipe()
+        self.target_connector.shutdown_drains()
+        if not self.stage_timer.enabled:
+            return
+
+        self.stage_timer.emit()
+        summary_path = self.config.get("stage_metrics_path")
+        if summary_path:
+            summary = {
+                "target": self.stage_timer.summary(),
+                "streams": {
+                    stream_name: stage_timer.summary()
+                    for stream_name, stage_timer in self.stage_timers.items()
+                },
+            }
+            Path(summary_path).write_text(
+                json.dumps(summary, indent=2), encoding="utf-8"
+            )
+            self.logger.info("Wrote stage timings to %s", summary_path)
+
+    def _write_state_message(self, state: dict) -> None:
+        """Emit the stream's latest state once the writes behind it have committed.
+
+        With `pipelined_writes` or `concurrent_drains` on, drained batches
+        may still be in flight on the sinks' writer threads or the drain
+        thread pool.
+
+        Args:
+            state: The latest state.
+        """
+        self.target_connector.wait_for_writes()
+        super()._write_state_message(state)
+
     config_jsonschema = th.PropertiesList(
         th.Property(
             "dialect",
@@ -117,12 +168,17 @@ class Targetmssql(SQLTarget):
                         th.Property(
                             "format",
                             th.StringType,
-                            description="Currently the only format is jsonl",
+                            allowed_values=["jsonl", "parquet", "arrow"],
+                            description=("The batch file format: jsonl, parquet or arrow. "  # noqa: E501
+                                        "parquet and arrow need the `parquet` extra (pyarrow)"  # noqa: E501
+                            )
                         ),
                         th.Property(
                             "compression",
                             th.StringType,
-                            description="Currently the only compression options is gzip",  # noqa: E501
+                            description=("Currently the only compression options is gzip for jsonl files. "  # noqa: E501
+                                        "parquet and arrow files carry their own compression"  # noqa: E501
+                            )
                         )
                     )
                 ),
@@ -148,6 +204,311 @@ class Targetmssql(SQLTarget):
             ),
             description="Optional Batch Message configuration",
         ),
+        th.Property(
+            "batch_file_chunk_bytes",
+            th.IntegerType,
+            default=67108864,
+            description=("Batch files are streamed into the database in chunks. A chunk is written once it holds "  # noqa: E501
+                        "batch_size_rows records or this many bytes of JSON, whichever comes first"  # noqa: E501
+            )
+        ),
+        th.Property(
+            "batch_file_workers",
+            th.IntegerType,
+            default=1,
+            description=("How many batch files from one BATCH message are loaded at the same time. "  # noqa: E501
+                        "Each worker uses its own pooled connection so keep this at or below the "  # noqa: E501
+                        "engine pool_size plus max_overflow"
+            )
+        ),
+        th.Property(
+            "catalog_cache_path",
+            th.StringType,
+            description=("Local file used to cache table and column metadata between runs. "  # noqa: E501
+                        "Tables are only reflected again when their sys.objects.modify_date changes. "  # noqa: E501
+                        "When not set every table is reflected from the server"
+            )
+        ),
+        th.Property(
+            "dead_letter_path",
+            th.StringType,
+            description=("Directory for rejected records. Each stream gets a <stream_name>.jsonl file "  # noqa: E501
+                        "holding the records the database refused and the error text"
+            )
+        ),
+        th.Property(
+            "dead_letter_table",
+            th.StringType,
+            description=("Table for rejected records, as table or schema.table. "
+                        "It is created if it does not exist"
+            )
+        ),
+        th.Property(
+            "dead_letter_max_depth",
+            th.IntegerType,
+            default=16,
+            description=("How many times a failed batch is split in half to find the bad records. "  # noqa: E501
+                        "Whatever is still failing at this depth is dead-lettered. Batches are only "  # noqa: E501
+                        "split when dead_letter_path or dead_letter_table is set, otherwise a "  # noqa: E501
+                        "refused batch fails the run"
+            )
+        ),
+        th.Property(
+            "dead_letter_max_rows",
+            th.IntegerType,
+            default=1000,
+            description="The run fails once more than this many records per stream have been dead-lettered"  # noqa: E501
+        ),
+        th.Property(
+            "typed_batch_decoding",
+            th.BooleanType,
+            default=False,
+            description=("Decode JSONL batch file lines straight into typed values with a msgspec Struct "  # noqa: E501
+                        "built from the stream's schema and write them as rows. Lines that don't "  # noqa: E501
+                        "match the schema's types are decoded and converted the usual way"  # noqa: E501
+            )
+        ),
+        th.Property(
+            "pipelined_writes",
+            th.BooleanType,
+            default=False,
+            description=("Write each stream's batches on a background thread so the next batch is read "  # noqa: E501
+                        "and conformed while the last one is written. State is only emitted once "  # noqa: E501
+                        "the writes behind it have committed"
+            )
+        ),
+        th.Property(
+            "pipelined_queue_size",
+            th.IntegerType,
+            default=2,
+            description="How many batches per stream may wait on the background writer when pipelined_writes is on"  # noqa: E501
+        ),
+        th.Property(
+            "concurrent_drains",
+            th.BooleanType,
+            default=False,
+            description=("Write full sinks' batches on a thread pool shared by every stream so streams that "  # noqa: E501
+                        "fill up together are written at the same time. A stream "
+                        "only has one batch in flight at a time. State is only emitted once every "  # noqa: E501
+                        "stream it covers has committed"
+            )
+        ),
+        th.Property(
+            "max_parallelism",
+            th.IntegerType,
+            description=("How many sinks are drained at the same time. The concurrent_drains pool defaults "  # noqa: E501
+                        "to as many drains as the engine pool_size plus max_overflow can serve, "  # noqa: E501
+                        "each with parallel_writers connections, after batch_file_workers "  # noqa: E501
+                        "connections are kept back for BATCH messages. It is capped at this"  # noqa: E501
+            )
+        ),
+        th.Property(
+            "persistent_connection",
+            th.BooleanType,
+            default=False,
+            description=("Keep each stream's connections open between batches instead of checking "  # noqa: E501
+                        "them out of the pool and pinging them for every batch. With pyodbc the "  # noqa: E501
+                        "INSERT stays prepared on the server from one batch to the next. When the "  # noqa: E501
+                        "pool runs out the connection idle longest goes back to it, and the rest go "  # noqa: E501
+                        "back when their stream finishes"
+            )
+        ),
+        th.Property(
+            "connection_idle_seconds",
+            th.NumberType,
+            default=60,
+            description="With persistent_connection on, a connection idle longer than this is pinged before it is used again"  # noqa: E501
+        ),
+        th.Property(
+            "parallel_writers",
+            th.IntegerType,
+            default=1,
+            description=("Split each batch into this many slices by primary key hash and write them at "  # noqa: E501
+                        "the same time over separate pooled connections. Usually set per stream "  # noqa: E501
+                        "in stream_options"
+            )
+        ),
+        th.Property(
+            "adaptive_batch_size",
+            th.BooleanType,
+            default=False,
+            description=("Grow or shrink each stream's batch size from how fast its last batches were written. "  # noqa: E501
+                        "batch_size_rows is the starting size"
+            )
+        ),
+        th.Property(
+            "adaptive_batch_target_seconds",
+            th.NumberType,
+            default=5.0,
+            description="How long adaptive batch sizing aims for one batch write to take"  # noqa: E501
+        ),
+        th.Property(
+            "adaptive_batch_min_rows",
+            th.IntegerType,
+            default=1000,
+            description="The smallest batch size adaptive batch sizing will pick"
+        ),
+        th.Property(
+            "adaptive_batch_max_rows",
+            th.IntegerType,
+            default=100000,
+            description="The largest batch size adaptive batch sizing will pick"
+        ),
+        th.Property(
+            "adaptive_batch_max_bytes",
+            th.IntegerType,
+            default=268435456,
+            description="Adaptive batch sizing keeps the estimated memory of one batch under this many bytes"  # noqa: E501
+        ),
+        th.Property(
+            "infer_column_sizes",
+            th.BooleanType,
+            default=False,
+            description=("Create new tables from their first batch, giving strings with no maxLength a "  # noqa: E501
+                        "bounded length and integers with no bounds INT or BIGINT from the values seen. "  # noqa: E501
+                        "Columns are widened with ALTER COLUMN when longer or larger values arrive"  # noqa: E501
+            )
+        ),
+        th.Property(
+            "table_storage",
+            th.ObjectType(
+                th.Property(
+                    "columnstore",
+                    th.BooleanType,
+                    description="Store the table as a clustered columnstore index"
+                ),
+                th.Property(
+                    "compression",
+                    th.StringType,
+                    allowed_values=["NONE", "ROW", "PAGE"],
+                    description="Data compression for rowstore tables"
+                ),
+                th.Property(
+                    "filegroup",
+                    th.StringType,
+                    description="The filegroup the table is created on"
+                ),
+            ),
+            description=("How tables the target creates are stored. Batches for tables that are a "  # noqa: E501
+                        "clustered columnstore, whether created here or already, are rounded to whole "  # noqa: E501
+                        "102,400 row compressed rowgroups per parallel writer"
+            )
+        ),
+        th.Property(
+            "overwrite_strategy",
+            th.StringType,
+            default="drop",
+            allowed_values=["drop", "swap"],
+            description=("How load_method overwrite replaces an existing table. drop drops and recreates it "  # noqa: E501
+                        "before loading. swap loads a <table>__swap shadow table and renames it in "  # noqa: E501
+                        "place of the old table in one short transaction once the stream is done"  # noqa: E501
+            )
+        ),
+        th.Property(
+            "bulk_load",
+            th.BooleanType,
+            default=False,
+            description=("Insert with a TABLOCK hint so loads into heaps and empty tables are minimally logged. "  # noqa: E501
+                        "Only used when the database recovery model is SIMPLE or BULK_LOGGED. "  # noqa: E501
+                        "The table lock makes parallel_writers take turns"
+            )
+        ),
+        th.Property(
+            "bulk_load_disable_indexes",
+            th.BooleanType,
+            default=False,
+            description=("With bulk_load on, disable the table's nonclustered indexes before the first "  # noqa: E501
+                        "insert and rebuild them when the stream finishes or a write fails. Indexes a "  # noqa: E501
+                        "run that died left disabled are rebuilt by the stream's next run"  # noqa: E501
+            )
+        ),
+        th.Property(
+            "stream_options",
+            th.ObjectType(
+                additional_properties=th.ObjectType(
+                    th.Property(
+                        "parallel_writers",
+                        th.IntegerType,
+                        description="parallel_writers for this stream"
+                    ),
+                    th.Property(
+                        "adaptive_batch_size",
+                        th.BooleanType,
+                        description="adaptive_batch_size for this stream"
+                    ),
+                    th.Property(
+                        "infer_column_sizes",
+                        th.BooleanType,
+                        description="infer_column_sizes for this stream"
+                    ),
+                    th.Property(
+                        "table_storage",
+                        th.ObjectType(
+                            th.Property(
+                                "columnstore",
+                                th.BooleanType,
+                                description="Store the table as a clustered columnstore index"  # noqa: E501
+                            ),
+                            th.Property(
+                                "compression",
+                                th.StringType,
+                                allowed_values=["NONE", "ROW", "PAGE"],
+                                description="Data compression for rowstore tables"
+                            ),
+                            th.Property(
+                                "filegroup",
+                                th.StringType,
+                                description="The filegroup the table is created on"
+                            ),
+                        ),
+                        description="table_storage for this stream"
+                    ),
+                    th.Property(
+                        "overwrite_strategy",
+                        th.StringType,
+                        allowed_values=["drop", "swap"],
+                        description="overwrite_strategy for this stream"
+                    ),
+                    th.Property(
+                        "bulk_load",
+                        th.BooleanType,
+                        description="bulk_load for this stream"
+                    ),
+                    th.Property(
+                        "bulk_load_disable_indexes",
+                        th.BooleanType,
+                        description="bulk_load_disable_indexes for this stream"
+                    ),
+                )
+            ),
+            description=("Settings for individual streams keyed on the stream name. "
+                        "These win over the top level setting of the same name"
+            )
+        ),
+        th.Property(
+            "stage_metrics",
+            th.BooleanType,
+            default=False,
+            description=("Time each stage of the load path, decode, preprocess, base64, conform, convert, "  # noqa: E501
+                        "compile, execute and commit, and emit the totals and histograms as METRIC messages"  # noqa: E501
+            )
+        ),
+        th.Property(
+            "stage_metrics_path",
+            th.StringType,
+            description="With stage_metrics on, also write a JSON summary of every stage to this file at the end of the run"  # noqa: E501
+        ),
+        th.Property(
+            "profile_stream",
+            th.StringType,
+            description="Run cProfile over the writes of this stream"
+        ),
+        th.Property(
+            "profile_path",
+            th.StringType,
+            default=".",
+            description="The directory the profile_stream <stream_name>.prof file is written to"  # noqa: E501
+        ),
         th.Property(
             "start_date",
             th.DateTimeType,
@@ -159,6 +520,19 @@ class Targetmssql(SQLTarget):
             default=False,
             description="Turn on translation of Higher Defined(HD) JSON Schema types to SQL Types"  # noqa: E501
         ),
+        th.Property(
+            "insert_method",
+            th.StringType,
+            default="insert",
+            allowed_values=["insert", "bulk_copy", "tvp", "multi_row_values"],
+            description=("How batches are sent to the target table. `insert` uses parameterized INSERT statements. "  # noqa: E501
+                        "`bulk_copy` uses pymssql's TDS bulk copy API or pyodbc fast_executemany. "  # noqa: E501
+                        "`tvp` sends each batch as one pyodbc table-valued parameter. "
+                        "Both fall back to `insert` when the driver can't do them. "
+                        "`multi_row_values` packs as many rows as fit under the 2100 parameter limit "  # noqa: E501
+                        "into each INSERT ... VALUES statement"
+            )
+        ),
     ).to_dict()
 
 
@@ -0,0 +1,322 @@
+"""An in-process DB-API driver and SQLAlchemy dialect that only count.
+
+The fake stands in for pymssql so the whole target, engine and dialect
+included, runs without a SQL Server.  Statements are counted, the last few
+are kept for inspection and rows are counted but not stored.
+"""
+
+from __future__ import annotations
+
+import collections
+import contextlib
+import threading
+import time
+import typing as t
+
+from sqlalchemy.dialects import registry
+from sqlalchemy.dialects.mssql.pymssql import MSDialect_pymssql
+
+__version__ = "2.3.4"
+apilevel = "2.0"
+threadsafety = 1
+paramstyle = "pyformat"
+
+Binary = bytes
+
+DIALECT_NAME = "mssql.pymssql"
+
+SERVER_VERSION = "Microsoft SQL Server 2022 (RTM) - 16.0.1000.6 (X64)"
+
+
+class Error(Exception):
+    """DB-API base error."""
+
+
+class DatabaseError(Error):
+    """DB-API database error."""
+
+
+class InterfaceError(Error):
+    """DB-API interface error."""
+
+
+class OperationalError(DatabaseError):
+    """DB-API operational error."""
+
+
+class IntegrityError(DatabaseError):
+    """DB-API integrity error."""
+
+
+class DataError(DatabaseError):
+    """DB-API data error."""
+
+
+class ProgrammingError(DatabaseError):
+    """DB-API programming error."""
+
+
+class StatementLog:
+    """What the fake server has been asked to do."""
+
+    def __init__(self) -> None:
+        """Class Default Init."""
+        self._lock = threading.Lock()
+        # Tests set this to make the server refuse rows.  It is given
+        # each parameter set and returns the error to raise, if any.
+        self.reject: t.Callable[[t.Any], Exception | None] | None = None
+        # Seconds each INSERT takes, so writes overlap in tests
+        self.delay: float = 0.0
+        # Names sys.table_types lists
+        self.table_types: list[str] = []
+        # Nonclustered indexes bulk_load_disable_indexes finds, and the
+        # table's record of the indexes a load disabled
+        self.indexes: list[str] = []
+        self.disabled_index_record: str | None = None
+        # Whether tables have a clustered columnstore index
+        self.columnstore: bool = False
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget everything counted so far."""
+        self.statements: int = 0
+        self.rows: int = 0
+        self.commits: int = 0
+        self.bulk_copies: int = 0
+        self.last_statements: collections.deque[str] = collections.deque(maxlen=20)
+        self.index_changes: list[str] = []
+
+    def check(self, seq_of_parameters: t.Iterable[t.Any]) -> None:
+        """Raise the error `reject` gives for the first refused parameter set.
+
+        Args:
+            seq_of_parameters: The parameter sets of a statement.
+
+        Raises:
+            Exception: The error from `reject`.
+        """
+        if self.reject is None:
+            return
+        for parameters in seq_of_parameters:
+            error = self.reject(parameters)
+            if error is not None:
+                raise error
+
+    def record(self, statement: str, rows: int) -> None:
+        """Count a statement.
+
+        Args:
+            statement: The SQL text.
+            rows: How many parameter sets it carried.
+        """
+        # Concurrent drains count from several threads
+        with self._lock:
+            self.statements += 1
+            self.last_statements.append(statement)
+            if statement.startswith("ALTER INDEX"):
+                self.index_changes.append(statement)
+            if statement.lstrip().upper().startswith("INSERT"):
+                self.rows += rows
+
+
+statement_log = StatementLog()
+
+
+def _answer(statement: str) -> list[tuple]:
+    """Return canned results for the queries the dialect runs on connect.
+
+    Args:
+        statement: The SQL text.
+
+    Returns:
+        The result rows.
+    """
+    lowered = statement.lower()
+    if "@@version" in lowered:
+        return [(SERVER_VERSION,)]
+    if "schema_name()" in lowered:
+        return [("dbo",)]
+    if "recovery_model_desc" in lowered:
+        return [("SIMPLE",)]
+    if "type_desc = 'nonclustered'" in lowered:
+        return [(name,) for name in statement_log.indexes]
+    if "type = 5" in lowered:
+        return [(int(statement_log.columnstore),)]
+    if "sys.extended_properties" in lowered:
+        return [(statement_log.disabled_index_record,)]
+    if "sys.indexes" in lowered:
+        return []
+    if "sys.table_types" in lowered:
+        return [(name,) for name in statement_log.table_types]
+    if "type_id(" in lowered:
+        return [(None,)]
+    if "db_name()" in lowered:
+        return [("bench",)]
+    if "dm_exec_sessions" in lowered or "transaction_isolation_level" in lowered:
+        return [("READ COMMITTED",)]
+    if lowered.lstrip().startswith("select"):
+        return [(1,)]
+    return []
+
+
+class Cursor:
+    """A DB-API cursor that counts what it is given."""
+
+    def __init__(self) -> None:
+        """Class Default Init."""
+        self.description: list[tuple] | None = None
+        self.rowcount: int = -1
+        self.arraysize: int = 1
+        self.fast_executemany: bool = False
+        self._rows: list[tuple] = []
+
+    def execute(self, statement: str, parameters: t.Any = None) -> None:  # noqa: ANN401, ARG002
+        """Run a statement.
+
+        Args:
+            statement: The SQL text.
+            parameters: The statement parameters.
+        """
+        # Multi-row VALUES lists carry one row per group
+        _, _, values = statement.partition(" VALUES ")
+        rows = values.count("), (") + 1
+        if isinstance(parameters, tuple) and rows > 1:
+            # Check the rows of a multi-row INSERT one by one
+            width = len(parameters) // rows
+            statement_log.check(parameters[start:start + width] for start in range(0, len(parameters), width))
+        elif parameters:
+            statement_log.check([parameters])
+        if statement.startswith("INSERT") and statement_log.delay:
+            time.sleep(statement_log.delay)
+        if "sp_addextendedproperty" in statement:
+            statement_log.disabled_index_record = parameters["value"]
+        elif "sp_dropextendedproperty" in statement:
+            statement_log.disabled_index_record = None
+        statement_log.record(statement, rows)
+        self._rows = _answer(statement)
+        is_query = statement.lstrip().lower().startswith("select")
+        self.description = [("column", None, None, None, None, None, None)] if is_query else None
+        self.rowcount = len(self._rows) if self._rows else 1
+
+    def executemany(self, statement: str, seq_of_parameters: t.Sequence[t.Any]) -> None:
+        """Run a statement once per parameter set.
+
+        Args:
+            statement: The SQL text.
+            seq_of_parameters: The parameter sets.
+        """
+        statement_log.check(seq_of_parameters)
+        if statement_log.delay:
+            time.sleep(statement_log.delay)
+        # pymssql's executemany runs one execute, and one round trip, per row
+        for _ in seq_of_parameters:
+            statement_log.record(statement, 1)
+        rows = len(seq_of_parameters)
+        self._rows = []
+        self.description = None
+        self.rowcount = rows
+
+    def fetchone(self) -> tuple | None:
+        """Return the next result row."""
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchmany(self, size: int | None = None) -> list[tuple]:
+        """Return some result rows."""
+        size = size or self.arraysize
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchall(self) -> list[tuple]:
+        """Return the remaining result rows."""
+        rows, self._rows = self._rows, []
+        return rows
+
+    def nextset(self) -> None:
+        """There is only ever one result set."""
+
+    def setinputsizes(self, *args: t.Any) -> None:
+        """Accepted and ignored."""
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+class Connection:
+    """A DB-API connection with pymssql's bulk_copy."""
+
+    def cursor(self) -> Cursor:
+        """Return a new cursor."""
+        return Cursor()
+
+    def commit(self) -> None:
+        """Count a commit."""
+        statement_log.commits += 1
+
+    def rollback(self) -> None:
+        """Nothing to roll back."""
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+    def autocommit(self, status: bool) -> None:  # noqa: FBT001
+        """Accepted and ignored."""
+
+    def bulk_copy(self, table_name: str, elements: t.Iterable[tuple], **kwargs: t.Any) -> None:  # noqa: ARG002
+        """Count a bulk copy.
+
+        Args:
+            table_name: The table being loaded.
+            elements: The rows.
+            kwargs: Bulk copy options.
+        """
+        elements = list(elements)
+        statement_log.check(elements)
+        statement_log.bulk_copies += 1
+        statement_log.record(f"INSERT BULK {table_name}", len(elements))
+
+
+def connect(*args: t.Any, **kwargs: t.Any) -> Connection:  # noqa: ARG001
+    """Return a new connection.
+
+    Returns:
+        A fake connection.
+    """
+    return Connection()
+
+
+class FakePyMSSQLDialect(MSDialect_pymssql):
+    """The pymssql dialect with the fake driver plugged in."""
+
+    supports_statement_cache = True
+
+    @classmethod
+    def import_dbapi(cls) -> t.Any:  # noqa: ANN401
+        """Return this module as the DB-API driver."""
+        import tests.benchmarks.fake_dbapi as module  # noqa: PLC0415
+
+        return module
+
+    def is_disconnect(self, e: Exception, connection: t.Any, cursor: t.Any) -> bool:  # noqa: ANN401, ARG002
+        """The fake never disconnects."""
+        return False
+
+
+@contextlib.contextmanager
+def installed() -> t.Iterator[None]:
+    """Make `mssql+pymssql://` URLs use the fake driver inside the block.
+
+    Only engines created inside the block get the fake.  The real pymssql
+    dialect is back once the block ends so other tests are not affected.
+
+    Yields:
+        Nothing.
+    """
+    previous = registry.impls.get(DIALECT_NAME)
+    registry.register(DIALECT_NAME, "tests.benchmarks.fake_dbapi", "FakePyMSSQLDialect")
+    try:
+        yield
+    finally:
+        if previous is None:
+            registry.impls.pop(DIALECT_NAME, None)
+        else:
+            registry.impls[DIALECT_NAME] = previous
@@ -0,0 +1,204 @@
+"""Run Targetmssql against the fake driver and measure it.
+
+Run every stream kind and print a report with::
+
+    python -m tests.benchmarks.harness --records 20000 --output report.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+import typing as t
+from pathlib import Path
+
+import sqlalchemy as sa
+
+from target_mssql.sinks import MSSQLConnector, MSSQLSink
+from target_mssql.target import Targetmssql
+from tests.benchmarks import fake_dbapi
+from tests.benchmarks.streams import STREAM_KINDS, get_messages
+
+BENCHMARK_CONFIG: dict[str, t.Any] = {
+    "dialect": "mssql",
+    "driver_type": "pymssql",
+    "host": "fake",
+    "user": "bench",
+    "password": "bench",
+    "database": "bench",
+    "stage_metrics": True,
+}
+
+
+class BenchmarkConnector(MSSQLConnector):
+    """MSSQLConnector that keeps its catalog in memory.
+
+    The fake driver can't answer reflection queries so tables the target
+    creates are remembered here instead.  Everything on the write path is
+    the real connector.
+    """
+
+    def __init__(self, *args: t.Any, **kwargs: t.Any) -> None:
+        """Class Default Init."""
+        super().__init__(*args, **kwargs)
+        self.tables: dict[str, tuple[dict, list[str]]] = {}
+
+    def schema_exists(self, schema_name: str) -> bool:  # noqa: ARG002
+        """Every schema exists."""
+        return True
+
+    def table_exists(self, full_table_name: str) -> bool:
+        """Return True for tables created in this run."""
+        return str(full_table_name) in self.tables
+
+    def create_empty_table(
+        self,
+        full_table_name: str,
+        schema: dict,
+        primary_keys: t.Sequence[str] | None = None,
+        partition_keys: list[str] | None = None,
+        as_temp_table: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
+        """Create the table on the fake server and remember it."""
+        super().create_empty_table(
+            full_table_name,
+            schema,
+            primary_keys,
+            partition_keys,
+            as_temp_table,
+        )
+        self.tables[str(full_table_name)] = (schema, list(primary_keys or []))
+
+    def get_table_columns(
+        self,
+        full_table_name: str,
+        column_names: list[str] | None = None,
+    ) -> dict[str, sa.Column]:
+        """Return the columns of a table created in this run."""
+        schema, primary_keys = self.tables[str(full_table_name)]
+        columns: dict[str, sa.Column] = {}
+        for name, jsonschema_type in schema["properties"].items():
+            if column_names and name not in column_names:
+                continue
+            if name in primary_keys:
+                columns[name] = sa.Column(name, self.to_sql_pk_type(jsonschema_type), primary_key=True)
+            else:
+                columns[name] = sa.Column(name, self.to_sql_type(jsonschema_type))
+        return columns
+
+
+class BenchmarkSink(MSSQLSink):
+    """MSSQLSink that builds its target table from the benchmark catalog."""
+
+    connector_class = BenchmarkConnector
+
+    def set_target_table(self, full_table_name: str) -> None:
+        """Populates the property _target_table."""
+        self._target_table = self.connector.get_table(full_table_name)
+
+
+class BenchmarkTarget(Targetmssql):
+    """Targetmssql wired to the benchmark sink."""
+
+    default_sink_class = BenchmarkSink
+
+
+def max_rss_bytes() -> int:
+    """Return the peak resident set size of this process.
+
+    Returns:
+        Bytes.
+    """
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS bytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def run_benchmark(
+    kind: str,
+    records: int,
+    config: dict[str, t.Any] | None = None,
+    batch_dir: Path | None = None,
+    streams: int = 1,
+) -> dict[str, t.Any]:
+    """Load a synthetic stream and report how it went.
+
+    Args:
+        kind: One of STREAM_KINDS.
+        records: How many records to send.
+        config: Settings layered over BENCHMARK_CONFIG.
+        batch_dir: Where the `batch` kind writes its files, a temporary
+            directory when not given.
+        streams: How many streams of `records` records each to send.
+
+    Returns:
+        Records per second, memory use, what the fake server saw and the
+        per stage timings.
+    """
+    fake_dbapi.statement_log.reset()
+    with tempfile.TemporaryDirectory() as temp_dir, fake_dbapi.installed():
+        messages = get_messages(kind, records, batch_dir or Path(temp_dir), streams=streams)
+        target = BenchmarkTarget(config={**BENCHMARK_CONFIG, **(config or {})})
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()) as state_output:
+            target.listen(io.BytesIO(messages))
+        seconds = time.perf_counter() - started
+        allocated, peak_allocated = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    statement_log = fake_dbapi.statement_log
+    return {
+        "kind": kind,
+        "records": records * streams,
+        "seconds": round(seconds, 4),
+        "records_per_second": round(records * streams / seconds, 1) if seconds else None,
+        "allocated_bytes": allocated,
+        "peak_allocated_bytes": peak_allocated,
+        "max_rss_bytes": max_rss_bytes(),
+        "rows_written": statement_log.rows,
+        "statements": statement_log.statements,
+        "commits": statement_log.commits,
+        "state_messages": len(state_output.getvalue().splitlines()),
+        "stages": {
+            "target": target.stage_timer.summary(),
+            **{name: timer.summary() for name, timer in target.stage_timers.items()},
+        },
+    }
+
+
+def main() -> None:
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--kind", choices=STREAM_KINDS, action="append")
+    parser.add_argument("--insert-method", default="insert")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    reports = []
+    for kind in args.kind or STREAM_KINDS:
+        report = run_benchmark(kind, args.records, {"insert_method": args.insert_method})
+        reports.append(report)
+        print(  # noqa: T201
+            f"{kind:>8}: {report['records_per_second']:>10} records/s "
+            f"peak {report['peak_allocated_bytes'] / 1048576:.1f} MiB allocated "
+            f"{report['max_rss_bytes'] / 1048576:.1f} MiB RSS"
+        )
+        for stage, stats in report["stages"][f"bench_{kind}"].items():
+            print(f"{'':>10}{stage:>12}: {stats['seconds']:.4f}s over {stats['calls']} calls")  # noqa: T201
+
+    if args.output:
+        args.output.write_text(json.dumps(reports, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
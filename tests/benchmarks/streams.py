@@ -0,0 +1,150 @@
+"""Synthetic Singer streams for the benchmarks."""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import json
+import random
+import typing as t
+from pathlib import Path
+
+STREAM_KINDS: tuple[str, ...] = ("narrow", "wide", "binary", "decimal", "batch")
+
+WIDE_COLUMNS: int = 200
+BINARY_BYTES: int = 2048
+DECIMAL_COLUMNS: int = 20
+
+
+def get_schema(kind: str) -> dict:
+    """Return the JSON schema of a synthetic stream.
+
+    Args:
+        kind: One of STREAM_KINDS.
+
+    Returns:
+        The stream's JSON schema.
+    """
+    properties: dict[str, dict] = {"id": {"type": ["integer"]}}
+    if kind in {"narrow", "batch"}:
+        properties["name"] = {"type": ["string", "null"], "maxLength": 100}
+        properties["updated_at"] = {"type": ["string", "null"], "format": "date-time"}
+    elif kind == "wide":
+        for number in range(WIDE_COLUMNS):
+            properties[f"column_{number}"] = {"type": ["string", "null"], "maxLength": 50}
+    elif kind == "binary":
+        properties["payload"] = {"type": ["string", "null"], "contentEncoding": "base64"}
+    elif kind == "decimal":
+        for number in range(DECIMAL_COLUMNS):
+            properties[f"amount_{number}"] = {"type": ["number", "null"]}
+    else:
+        msg = f"Unknown stream kind {kind}"
+        raise ValueError(msg)
+    return {"type": "object", "properties": properties}
+
+
+def get_record(kind: str, number: int, rng: random.Random) -> dict[str, t.Any]:
+    """Return one synthetic record.
+
+    Args:
+        kind: One of STREAM_KINDS.
+        number: The record's id.
+        rng: Random source so runs are repeatable.
+
+    Returns:
+        The record.
+    """
+    record: dict[str, t.Any] = {"id": number}
+    if kind in {"narrow", "batch"}:
+        record["name"] = f"name {number}"
+        record["updated_at"] = "2024-01-02T03:04:05.123456+00:00"
+    elif kind == "wide":
+        for column in range(WIDE_COLUMNS):
+            record[f"column_{column}"] = f"value {number} {column}"
+    elif kind == "binary":
+        record["payload"] = base64.b64encode(rng.randbytes(BINARY_BYTES)).decode()
+    elif kind == "decimal":
+        for column in range(DECIMAL_COLUMNS):
+            record[f"amount_{column}"] = rng.randint(-10**9, 10**9) / 100
+    return record
+
+
+def get_messages(
+    kind: str,
+    records: int,
+    batch_dir: Path,
+    seed: int = 1,
+    streams: int = 1,
+    stream_name: str | None = None,
+) -> bytes:
+    """Return a Singer message stream.
+
+    The `batch` kind writes its records to gzipped JSONL batch files under
+    `batch_dir` and sends BATCH messages for them.
+
+    With more than one stream the streams are named `bench_<kind>_<n>`,
+    each gets `records` records and their messages are interleaved.
+
+    Args:
+        kind: One of STREAM_KINDS.
+        records: The number of records per stream.
+        batch_dir: Where batch files are written.
+        seed: Random seed.
+        streams: The number of streams.
+        stream_name: The name of a single stream, `bench_<kind>` when not
+            given.
+
+    Returns:
+        The messages as JSONL bytes.
+    """
+    if streams > 1:
+        stream_lines = [
+            get_messages(
+                kind,
+                records,
+                batch_dir,
+                seed + number,
+                stream_name=f"bench_{kind}_{number}",
+            ).splitlines(keepends=True)
+            for number in range(streams)
+        ]
+        # Schemas first, then the records of every stream in turn
+        return b"".join(line for lines in zip(*stream_lines) for line in lines)
+
+    rng = random.Random(seed)  # noqa: S311
+    stream = stream_name or f"bench_{kind}"
+    lines = [
+        {
+            "type": "SCHEMA",
+            "stream": stream,
+            "schema": get_schema(kind),
+            "key_properties": ["id"],
+        }
+    ]
+
+    if kind == "batch":
+        files_per_message = 4
+        per_file = max(1, records // files_per_message)
+        manifest = []
+        for file_number, start in enumerate(range(0, records, per_file)):
+            path = batch_dir / f"{stream}-{file_number}.json.gz"
+            with gzip.open(path, "wt", encoding="utf-8") as batch_file:
+                for number in range(start, min(start + per_file, records)):
+                    batch_file.write(json.dumps(get_record(kind, number, rng)) + "\n")
+            manifest.append(path.as_uri())
+        lines.append(
+            {
+                "type": "BATCH",
+                "stream": stream,
+                "encoding": {"format": "jsonl", "compression": "gzip"},
+                "manifest": manifest,
+            }
+        )
+    else:
+        lines.extend(
+            {"type": "RECORD", "stream": stream, "record": get_record(kind, number, rng)}
+            for number in range(records)
+        )
+
+    lines.append({"type": "STATE", "value": {"bookmarks": {stream: {"id": records}}}})
+    return b"".join(json.dumps(line, default=str).encode() + b"\n" for line in lines)
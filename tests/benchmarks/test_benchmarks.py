@@ -0,0 +1,66 @@
+"""Offline benchmarks of the load path.
+
+These run against the fake DB-API driver so they don't need a SQL Server.
+They are deselected by default, run them with `pytest -m benchmark`.  Set
+BENCHMARK_RECORDS to change the stream size and BENCHMARK_OUTPUT to a
+directory to keep a JSON report per run for tracking over time.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from tests.benchmarks.harness import run_benchmark
+from tests.benchmarks.streams import STREAM_KINDS
+
+BENCHMARK_RECORDS = int(os.environ.get("BENCHMARK_RECORDS", "500"))
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.mark.parametrize("insert_method", ["insert", "bulk_copy", "multi_row_values"])
+@pytest.mark.parametrize("kind", STREAM_KINDS)
+def test_benchmark(kind: str, insert_method: str) -> None:
+    """Load a synthetic stream and report its throughput."""
+    report = run_benchmark(kind, BENCHMARK_RECORDS, {"insert_method": insert_method})
+
+    assert report["rows_written"] == BENCHMARK_RECORDS
+    assert report["state_messages"] == 1
+    assert report["stages"][f"bench_{kind}"]
+
+    output = os.environ.get("BENCHMARK_OUTPUT")
+    if output:
+        Path(output).mkdir(parents=True, exist_ok=True)
+        Path(output, f"{kind}-{insert_method}.json").write_text(
+            json.dumps(report, indent=2),
+            encoding="utf-8",
+        )
+
+
+@pytest.mark.parametrize("insert_method", ["insert", "bulk_copy", "multi_row_values"])
+def test_benchmark_typed_batch_decoding(insert_method: str) -> None:
+    """Load batch files through the typed decoder."""
+    report = run_benchmark(
+        "batch",
+        BENCHMARK_RECORDS,
+        {"insert_method": insert_method, "typed_batch_decoding": True},
+    )
+
+    assert report["rows_written"] == BENCHMARK_RECORDS
+    assert report["stages"]["bench_batch"]["decode"]["calls"] == BENCHMARK_RECORDS
+
+
+def test_benchmark_concurrent_drains() -> None:
+    """Drain small batches on the shared drain pool."""
+    report = run_benchmark(
+        "narrow",
+        BENCHMARK_RECORDS,
+        {"concurrent_drains": True, "batch_size_rows": 100},
+    )
+
+    assert report["rows_written"] == BENCHMARK_RECORDS
+    assert report["state_messages"] == 1
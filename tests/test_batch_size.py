@@ -0,0 +1,61 @@
+"""Tests of the adaptive batch size controller."""
+
+from __future__ import annotations
+
+import pytest
+
+from target_mssql.batch_size import AdaptiveBatchSize
+
+
+@pytest.fixture
+def sizer() -> AdaptiveBatchSize:
+    """Return a controller aiming for one second batches."""
+    return AdaptiveBatchSize(
+        size=10_000,
+        min_rows=1_000,
+        max_rows=100_000,
+        target_seconds=1.0,
+        max_bytes=100_000_000,
+    )
+
+
+def test_starting_size_is_kept_in_bounds() -> None:
+    """A starting size outside min_rows and max_rows is clamped."""
+    assert AdaptiveBatchSize(10, 1_000, 100_000, 1.0, 100_000_000).size == 1_000
+    assert AdaptiveBatchSize(10**9, 1_000, 100_000, 1.0, 100_000_000).size == 100_000
+
+
+def test_size_moves_toward_the_target_time(sizer: AdaptiveBatchSize) -> None:
+    """A batch that took half the target time grows the next one to match."""
+    assert sizer.observe(rows=10_000, seconds=0.5, batch_bytes=0) == 20_000
+    assert sizer.observe(rows=20_000, seconds=1.0, batch_bytes=0) == 20_000
+
+
+def test_size_changes_by_at_most_a_factor_of_two(sizer: AdaptiveBatchSize) -> None:
+    """Very fast or very slow writes only double or halve the size."""
+    assert sizer.observe(rows=10_000, seconds=0.01, batch_bytes=0) == 20_000
+    assert sizer.observe(rows=20_000, seconds=100.0, batch_bytes=0) == 10_000
+
+
+def test_size_stays_between_min_and_max_rows(sizer: AdaptiveBatchSize) -> None:
+    """The size never leaves min_rows and max_rows however the writes go."""
+    for _ in range(20):
+        sizer.observe(rows=sizer.size, seconds=0.001, batch_bytes=0)
+    assert sizer.size == 100_000
+
+    for _ in range(20):
+        sizer.observe(rows=sizer.size, seconds=1000.0, batch_bytes=0)
+    assert sizer.size == 1_000
+
+
+def test_size_is_capped_by_max_bytes(sizer: AdaptiveBatchSize) -> None:
+    """Rows of the last batch's size have to fit under max_bytes."""
+    # 10,000 rows of 5 KB each, so 20,000 rows is the most that fits
+    assert sizer.observe(rows=10_000, seconds=0.1, batch_bytes=50_000_000) == 20_000
+    assert sizer.observe(rows=20_000, seconds=0.1, batch_bytes=200_000_000) == 10_000
+
+
+@pytest.mark.parametrize(("rows", "seconds"), [(0, 1.0), (10_000, 0.0)])
+def test_empty_or_untimed_writes_keep_the_size(sizer: AdaptiveBatchSize, rows: int, seconds: float) -> None:
+    """Writes with no rows or no measurable time leave the size alone."""
+    assert sizer.observe(rows=rows, seconds=seconds, batch_bytes=0) == 10_000
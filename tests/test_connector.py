@@ -0,0 +1,123 @@
+"""Tests of the connector's offline helpers."""
+
+from __future__ import annotations
+
+import typing as t
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects import mssql
+
+from target_mssql.catalog import column_from_catalog
+from target_mssql.sinks import (
+    MSSQL_BIGINT_MAX,
+    MSSQL_INT_MAX,
+    MSSQLConnector,
+)
+
+CONFIG = {
+    "dialect": "mssql",
+    "driver_type": "pymssql",
+    "host": "localhost",
+    "user": "user",
+    "password": "password",
+    "database": "database",
+}
+
+
+@pytest.fixture
+def connector() -> MSSQLConnector:
+    """Return a connector that never connects."""
+    return MSSQLConnector(config=CONFIG)
+
+
+@pytest.mark.parametrize("string_type", ["string", ["string", "null"]])
+def test_size_schema_sizes_strings(connector: MSSQLConnector, string_type: str | list[str]) -> None:
+    """Strings get a maxLength twice the longest sample, whether type is a str or a list."""
+    schema = {"properties": {"name": {"type": string_type}}}
+    sized = connector.size_schema(schema, [{"name": "x" * 20}, {"name": None}], [])
+
+    assert sized["properties"]["name"]["maxLength"] == 64
+    assert "maxLength" not in schema["properties"]["name"]
+
+
+@pytest.mark.parametrize("integer_type", ["integer", ["integer", "null"]])
+def test_size_schema_sizes_integers(connector: MSSQLConnector, integer_type: str | list[str]) -> None:
+    """Integers get the INT range, or BIGINT once samples are near the INT limits."""
+    schema = {"properties": {"small": {"type": integer_type}, "large": {"type": integer_type}}}
+    sized = connector.size_schema(schema, [{"small": 5, "large": MSSQL_INT_MAX // 2}], [])
+
+    assert sized["properties"]["small"]["maximum"] == MSSQL_INT_MAX
+    assert sized["properties"]["large"]["maximum"] == MSSQL_BIGINT_MAX
+
+
+def test_size_schema_leaves_keys_formats_and_long_values(connector: MSSQLConnector) -> None:
+    """Keys, dates and values too long to stay in row are left alone."""
+    schema = {
+        "properties": {
+            "id": {"type": "string"},
+            "updated_at": {"type": "string", "format": "date-time"},
+            "notes": {"type": "string"},
+        }
+    }
+    records = [{"id": "a", "updated_at": "2024-01-01T00:00:00", "notes": "x" * 3000}]
+    sized = connector.size_schema(schema, records, ["id"])
+
+    assert sized == schema
+
+
+def test_size_schema_sizes_base64_by_decoded_length(connector: MSSQLConnector) -> None:
+    """base64 strings are sized by the bytes they decode to."""
+    schema = {"properties": {"payload": {"type": "string", "contentEncoding": "base64"}}}
+    sized = connector.size_schema(schema, [{"payload": "A" * 40}], [])
+
+    assert sized["properties"]["payload"]["maxLength"] == 64
+
+
+def test_get_widened_type_strings(connector: MSSQLConnector) -> None:
+    """String columns are widened only when a value no longer fits."""
+    assert connector.get_widened_type(sa.NVARCHAR(16), ["x" * 16, None]) is None
+    assert connector.get_widened_type(sa.NVARCHAR(16), ["x" * 40]).length == 128
+    assert connector.get_widened_type(sa.NVARCHAR(16), ["x" * 3000]).length is None
+
+
+def test_get_widened_type_integers(connector: MSSQLConnector) -> None:
+    """INT columns become BIGINT once a value is out of range."""
+    assert connector.get_widened_type(sa.Integer(), [MSSQL_INT_MAX]) is None
+    assert isinstance(connector.get_widened_type(sa.Integer(), [MSSQL_INT_MAX + 1]), mssql.BIGINT)
+
+
+def get_catalog_column(**overrides: t.Any) -> dict:
+    """Return a cached sys.columns row for an INT column."""
+    return {
+        "name": "id",
+        "type_name": "int",
+        "base_type_name": "int",
+        "max_length": 4,
+        "precision": 10,
+        "scale": 0,
+        "is_nullable": False,
+        "collation_name": None,
+        "is_primary_key": False,
+        "is_identity": False,
+        "identity_seed": None,
+        "identity_increment": None,
+        "default_definition": None,
+        "computed_definition": None,
+        **overrides,
+    }
+
+
+def test_column_from_catalog_keeps_identity_defaults_and_computed() -> None:
+    """Columns rebuilt from the catalog cache know they are filled in by the server."""
+    identity = column_from_catalog(get_catalog_column(is_identity=True, identity_seed=1, identity_increment=1))
+    default = column_from_catalog(get_catalog_column(default_definition="((0))"))
+    computed = column_from_catalog(get_catalog_column(computed_definition="([a]+[b])"))
+    plain = column_from_catalog(get_catalog_column())
+
+    assert identity.identity is not None
+    assert default.server_default is not None
+    assert computed.computed is not None
+    assert plain.identity is None
+    assert plain.server_default is None
+    assert plain.computed is None
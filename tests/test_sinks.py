@@ -0,0 +1,572 @@
+"""Tests of the sink's write path against the fake DB-API driver."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import typing as t
+
+import pytest
+import sqlalchemy as sa
+from singer_sdk.helpers._batch import BaseBatchFileEncoding
+from sqlalchemy.dialects import mssql
+
+from target_mssql.dead_letter import DeadLetterLimitError
+from target_mssql.sinks import MSSQLSink
+from tests.benchmarks import fake_dbapi
+from tests.benchmarks.harness import (
+    BENCHMARK_CONFIG,
+    BenchmarkConnector,
+    BenchmarkTarget,
+    run_benchmark,
+)
+from tests.benchmarks.streams import get_schema
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+RECORDS = 50
+
+
+def get_id(parameters: t.Any) -> t.Any:  # noqa: ANN401
+    """Return the id a parameter set carries, if it is a row."""
+    if isinstance(parameters, dict):
+        return parameters.get("id")
+    if isinstance(parameters, (tuple, list)) and parameters:
+        return parameters[0]
+    return None
+
+
+def reject_ids(ids: set[int], error: t.Callable[[], Exception]) -> t.Callable[[t.Any], Exception | None]:
+    """Return a fake server rule that refuses the rows with these ids."""
+    return lambda parameters: error() if get_id(parameters) in ids else None
+
+
+@pytest.fixture(autouse=True)
+def reset_rejects() -> t.Iterator[None]:
+    """Let every test start with a server that accepts everything."""
+    yield
+    fake_dbapi.statement_log.reject = None
+    fake_dbapi.statement_log.delay = 0.0
+    fake_dbapi.statement_log.table_types = []
+    fake_dbapi.statement_log.indexes = []
+    fake_dbapi.statement_log.disabled_index_record = None
+    fake_dbapi.statement_log.columnstore = False
+
+
+def duplicate_key() -> Exception:
+    """Return the error SQL Server gives for a duplicate primary key."""
+    return fake_dbapi.IntegrityError(2627, b"Violation of PRIMARY KEY constraint")
+
+
+def test_bisect_dead_letters_only_the_bad_rows(tmp_path: Path) -> None:
+    """A refused batch is split until the bad rows are dead-lettered on their own."""
+    fake_dbapi.statement_log.reject = reject_ids({3, 41}, duplicate_key)
+    report = run_benchmark("narrow", RECORDS, {"dead_letter_path": str(tmp_path)})
+
+    assert report["rows_written"] == RECORDS - 2
+    assert report["state_messages"] == 1
+    lines = (tmp_path / "bench_narrow.jsonl").read_text(encoding="utf-8").splitlines()
+    assert sorted(json.loads(line)["record"]["id"] for line in lines) == [3, 41]
+
+
+def test_row_error_without_dead_letter_output_fails() -> None:
+    """With nowhere to put rejected rows the run fails instead of dropping them."""
+    fake_dbapi.statement_log.reject = reject_ids({3}, duplicate_key)
+    with pytest.raises(Exception, match="PRIMARY KEY"):
+        run_benchmark("narrow", RECORDS)
+
+
+def test_data_error_number_is_bisected(tmp_path: Path) -> None:
+    """pymssql raises truncation as OperationalError, the error number marks it a row error."""
+    fake_dbapi.statement_log.reject = reject_ids(
+        {7},
+        lambda: fake_dbapi.OperationalError(8152, b"String or binary data would be truncated"),
+    )
+    report = run_benchmark("narrow", RECORDS, {"dead_letter_path": str(tmp_path)})
+
+    assert report["rows_written"] == RECORDS - 1
+
+
+def test_server_error_is_not_dead_lettered(tmp_path: Path) -> None:
+    """Errors that say nothing about the rows fail the run, nothing is dead-lettered."""
+    fake_dbapi.statement_log.reject = reject_ids(
+        {7},
+        lambda: fake_dbapi.OperationalError(18456, b"Login failed for user"),
+    )
+    with pytest.raises(Exception, match="Login failed"):
+        run_benchmark("narrow", RECORDS, {"dead_letter_path": str(tmp_path)})
+
+    assert not (tmp_path / "bench_narrow.jsonl").exists()
+
+
+def test_deadlock_victim_is_written_again(tmp_path: Path) -> None:
+    """A deadlock victim is retried whole rather than bisected."""
+    deadlocks = []
+
+    def deadlock_once(parameters: t.Any) -> Exception | None:  # noqa: ANN401
+        if get_id(parameters) == 0 and not deadlocks:
+            deadlocks.append(parameters)
+            return fake_dbapi.OperationalError(1205, b"Transaction was deadlocked")
+        return None
+
+    fake_dbapi.statement_log.reject = deadlock_once
+    report = run_benchmark("narrow", RECORDS, {"dead_letter_path": str(tmp_path)})
+
+    assert deadlocks
+    assert report["rows_written"] == RECORDS
+    assert not (tmp_path / "bench_narrow.jsonl").exists()
+
+
+def test_dead_letter_max_rows_fails_the_run(tmp_path: Path) -> None:
+    """The run stops once more rows are rejected than dead_letter_max_rows."""
+    fake_dbapi.statement_log.reject = reject_ids({1, 2, 3}, duplicate_key)
+    with pytest.raises(DeadLetterLimitError):
+        run_benchmark(
+            "narrow",
+            RECORDS,
+            {"dead_letter_path": str(tmp_path), "dead_letter_max_rows": 2},
+        )
+
+
+@pytest.mark.parametrize(
+    ("error", "number"),
+    [
+        (fake_dbapi.IntegrityError(2627, b"Violation of PRIMARY KEY constraint"), 2627),
+        (
+            Exception(
+                "('23000', \"[23000] [Microsoft][ODBC Driver 18 for SQL Server][SQL Server]"
+                "Violation of PRIMARY KEY constraint 'PK_t'. The duplicate key value is (1). "
+                "(2627) (SQLExecDirectW)\")"
+            ),
+            2627,
+        ),
+        (Exception("no number here"), None),
+    ],
+)
+def test_get_error_number(error: Exception, number: int | None) -> None:
+    """Error numbers are read from pymssql args and pyodbc messages."""
+    assert MSSQLSink.get_error_number(error) == number
+
+
+@pytest.mark.parametrize("mode", ["pipelined_writes", "concurrent_drains"])
+def test_batch_file_kept_until_its_rows_commit(tmp_path: Path, mode: str) -> None:
+    """A batch file whose rows failed to commit is not deleted."""
+    fake_dbapi.statement_log.reject = reject_ids(
+        {25},
+        lambda: fake_dbapi.OperationalError(18456, b"Login failed for user"),
+    )
+    with pytest.raises(Exception, match="Login failed"):
+        run_benchmark("batch", 40, {mode: True}, batch_dir=tmp_path)
+
+    remaining = sorted(path.name for path in tmp_path.iterdir())
+    assert remaining == ["bench_batch-2.json.gz", "bench_batch-3.json.gz"]
+
+
+def test_persistent_connections_with_more_streams_than_the_pool(tmp_path: Path) -> None:
+    """Sessions hand their connections back so streams beyond the pool size still load."""
+    report = run_benchmark(
+        "narrow",
+        30,
+        {
+            "persistent_connection": True,
+            "batch_size_rows": 10,
+            "dead_letter_path": str(tmp_path),
+            "sqlalchemy_eng_params": {"pool_size": 2, "max_overflow": 0, "pool_timeout": 1},
+        },
+        streams=6,
+    )
+
+    assert report["rows_written"] == 6 * 30
+    assert report["state_messages"] == 1
+
+
+def test_concurrent_drains_with_parallel_writers_fit_the_pool() -> None:
+    """Drains with several slice connections each don't run the pool dry."""
+    fake_dbapi.statement_log.delay = 0.2
+    report = run_benchmark(
+        "narrow",
+        20,
+        {
+            "concurrent_drains": True,
+            "parallel_writers": 3,
+            "batch_size_rows": 10,
+            "sqlalchemy_eng_params": {"pool_size": 4, "max_overflow": 3, "pool_timeout": 0.1},
+        },
+        streams=4,
+    )
+
+    assert report["rows_written"] == 4 * 20
+
+
+@pytest.mark.parametrize(
+    ("kind", "config"),
+    [
+        ("narrow", {}),
+        ("batch", {}),
+        ("batch", {"typed_batch_decoding": True}),
+    ],
+)
+def test_default_column_is_left_out_of_inserts(
+    monkeypatch: pytest.MonkeyPatch,
+    kind: str,
+    config: dict,
+) -> None:
+    """Tables with a DEFAULT column are not sent positional rows that would NULL it."""
+    get_table_columns = BenchmarkConnector.get_table_columns
+
+    def with_default_column(self: BenchmarkConnector, *args: t.Any, **kwargs: t.Any) -> dict[str, sa.Column]:
+        columns = get_table_columns(self, *args, **kwargs)
+        columns["loaded_at"] = sa.Column("loaded_at", sa.DateTime(), server_default=sa.text("(getdate())"))
+        return columns
+
+    monkeypatch.setattr(BenchmarkConnector, "get_table_columns", with_default_column)
+    report = run_benchmark(kind, 20, config)
+
+    inserts = [
+        statement
+        for statement in fake_dbapi.statement_log.last_statements
+        if statement.startswith("INSERT INTO")
+    ]
+    assert report["rows_written"] == 20
+    assert inserts
+    assert not any("loaded_at" in statement for statement in inserts)
+
+
+def test_parquet_without_pyarrow_says_how_to_install_it(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A Parquet batch file without pyarrow installed names the extra to install."""
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(
+        importlib.util,
+        "find_spec",
+        lambda name, *args: None if name == "pyarrow" else find_spec(name, *args),
+    )
+    with fake_dbapi.installed():
+        target = BenchmarkTarget(config=BENCHMARK_CONFIG)
+        sink = target.get_sink("bench_parquet", schema=get_schema("narrow"), key_properties=["id"])
+        with pytest.raises(ModuleNotFoundError, match=r"target-mssql\[parquet\]"):
+            sink.process_batch_file(
+                BaseBatchFileEncoding.from_dict({"format": "parquet", "compression": None}),
+                "file:///tmp/bench_parquet-0.parquet",
+                None,
+            )
+
+
+def test_table_type_is_made_on_the_write_connection() -> None:
+    """The table type is created on the caller's connection and stale ones are dropped."""
+    fake_dbapi.statement_log.table_types = [
+        "orders_tvp_000000000000",
+        "orders_tvp_x_tvp_111111111111",
+        "orders_tvp_backup",
+    ]
+    columns = [sa.Column("id", sa.Integer()), sa.Column("name", sa.Unicode(32))]
+    with fake_dbapi.installed():
+        connector = BenchmarkConnector(config=BENCHMARK_CONFIG)
+        with connector._connect() as conn:  # noqa: SLF001
+            fake_dbapi.statement_log.reset()
+            type_name = connector.get_table_type(conn, "dbo", "orders", columns)
+            statements = list(fake_dbapi.statement_log.last_statements)
+            assert connector._engine.pool.checkedout() == 1  # noqa: SLF001
+            assert not conn.in_transaction()
+
+            fake_dbapi.statement_log.reset()
+            assert connector.get_table_type(conn, "dbo", "orders", columns) == type_name
+            assert not fake_dbapi.statement_log.last_statements
+
+    assert type_name.startswith("orders_tvp_")
+    assert any(statement.startswith(f"CREATE TYPE dbo.{type_name} AS TABLE") for statement in statements)
+    drops = [statement for statement in statements if statement.startswith("DROP TYPE")]
+    assert drops == ["DROP TYPE dbo.orders_tvp_000000000000"]
+
+
+BULK_LOAD_CONFIG = {"bulk_load": True, "bulk_load_disable_indexes": True}
+
+
+def test_failed_bulk_load_rebuilds_its_indexes() -> None:
+    """Indexes disabled for a bulk load are rebuilt when the load fails."""
+    fake_dbapi.statement_log.indexes = ["ix_name"]
+    fake_dbapi.statement_log.reject = reject_ids(
+        {25},
+        lambda: fake_dbapi.OperationalError(18456, b"Login failed for user"),
+    )
+    with pytest.raises(Exception, match="Login failed"):
+        run_benchmark("narrow", 40, {**BULK_LOAD_CONFIG, "batch_size_rows": 10})
+
+    assert [statement.split()[-1] for statement in fake_dbapi.statement_log.index_changes] == [
+        "DISABLE",
+        "REBUILD",
+    ]
+    assert fake_dbapi.statement_log.disabled_index_record is None
+
+
+def test_indexes_left_disabled_are_taken_over_by_the_next_bulk_load() -> None:
+    """A bulk load rebuilds the indexes an earlier one left disabled along with its own."""
+    fake_dbapi.statement_log.indexes = ["ix_name"]
+    fake_dbapi.statement_log.disabled_index_record = json.dumps(["ix_old"])
+    run_benchmark("narrow", RECORDS, BULK_LOAD_CONFIG)
+
+    rebuilt = [
+        statement.split()[2]
+        for statement in fake_dbapi.statement_log.index_changes
+        if statement.endswith("REBUILD")
+    ]
+    assert rebuilt == ["ix_old", "ix_name"]
+    assert fake_dbapi.statement_log.disabled_index_record is None
+
+
+def test_indexes_left_disabled_are_rebuilt_without_bulk_load() -> None:
+    """Without bulk_load the indexes an earlier load left disabled are rebuilt first."""
+    fake_dbapi.statement_log.indexes = ["ix_name"]
+    fake_dbapi.statement_log.disabled_index_record = json.dumps(["ix_old"])
+    run_benchmark("narrow", RECORDS, {**BULK_LOAD_CONFIG, "bulk_load": False})
+
+    assert fake_dbapi.statement_log.index_changes == ["ALTER INDEX ix_old ON bench_narrow REBUILD"]
+    assert fake_dbapi.statement_log.disabled_index_record is None
+
+
+@pytest.fixture
+def upsert_sink() -> t.Iterator[MSSQLSink]:
+    """Return an upsert sink whose table was created with an `ID` identity key."""
+    with fake_dbapi.installed():
+        target = BenchmarkTarget(config={**BENCHMARK_CONFIG, "load_method": "upsert"})
+        sink = target.get_sink("bench_upsert", schema=get_schema("narrow"), key_properties=["id"])
+        sink._target_table = sa.Table(  # noqa: SLF001
+            "bench_upsert",
+            sa.MetaData(),
+            sa.Column("ID", sa.Integer(), sa.Identity(), primary_key=True),
+            sa.Column("name", sa.Unicode(100)),
+            sa.Column("updated_at", sa.DateTime()),
+        )
+        yield sink
+
+
+def test_deduplicate_rows_keeps_the_last_row_per_key(upsert_sink: MSSQLSink) -> None:
+    """The key column is found whatever case the table spells it in."""
+    rows = [(1, "a", None), (2, "b", None), (1, "c", None)]
+
+    assert upsert_sink.deduplicate_rows(rows) == [(1, "c", None), (2, "b", None)]
+
+
+def test_slice_batch_keeps_a_key_in_one_slice(upsert_sink: MSSQLSink) -> None:
+    """Rows with the same key always land in the same slice."""
+    rows = [(number % 5, f"name {number}", None) for number in range(50)]
+    slices = upsert_sink.slice_batch(rows, 4)
+
+    assert sum(len(batch_slice) for batch_slice in slices) == len(rows)
+    for key in range(5):
+        assert sum(any(row[0] == key for row in batch_slice) for batch_slice in slices) == 1
+
+
+def test_staging_table_has_no_identity(upsert_sink: MSSQLSink) -> None:
+    """The staging table is made from column types alone so it takes any row."""
+    ddl = str(sa.schema.CreateTable(upsert_sink.staging_table).compile(dialect=mssql.dialect()))
+
+    assert "IDENTITY" not in ddl
+    assert "PRIMARY KEY" not in ddl
+    assert "[ID] INTEGER NULL" in ddl
+
+
+def test_get_merge_sql(upsert_sink: MSSQLSink) -> None:
+    """Keys are matched on and every other column is updated."""
+    merge_sql = upsert_sink.get_merge_sql(mssql.dialect(), ["ID"], ["ID", "name"])
+
+    assert merge_sql == (
+        "MERGE INTO bench_upsert WITH (HOLDLOCK) AS target\n"
+        "USING [#bench_upsert_stage] AS source\n"
+        "ON target.[ID] = source.[ID]\n"
+        "WHEN MATCHED THEN UPDATE SET target.name = source.name\n"
+        "WHEN NOT MATCHED THEN INSERT ([ID], name)\n"
+        "VALUES (source.[ID], source.name);"
+    )
+
+
+def test_upsert_stages_with_explicit_columns() -> None:
+    """An upsert creates its staging table from column definitions and merges it."""
+    run_benchmark("narrow", 20, {"load_method": "upsert"})
+    statements = list(fake_dbapi.statement_log.last_statements)
+
+    assert not any("SELECT TOP 0" in statement for statement in statements)
+    assert any(statement.lstrip().startswith("CREATE TABLE [#bench_narrow_stage]") for statement in statements)
+    assert any(statement.startswith("MERGE INTO bench_narrow") for statement in statements)
+
+
+def test_adaptive_batch_size_grows_fast_batches() -> None:
+    """Batches that write quickly grow toward adaptive_batch_max_rows."""
+    fixed = run_benchmark("narrow", 500, {"batch_size_rows": 50})
+    adaptive = run_benchmark(
+        "narrow",
+        500,
+        {
+            "batch_size_rows": 50,
+            "adaptive_batch_size": True,
+            "adaptive_batch_min_rows": 50,
+            "adaptive_batch_max_rows": 200,
+        },
+    )
+
+    assert adaptive["rows_written"] == fixed["rows_written"] == 500
+    # 50, 100, 200 then the last 150 rows instead of ten batches of 50
+    assert fixed["commits"] - adaptive["commits"] == 10 - 4
+
+
+@pytest.mark.parametrize(("column_count", "rows"), [(1, 1000), (3, 699), (201, 10), (3000, 1)])
+def test_get_multi_row_size(column_count: int, rows: int) -> None:
+    """Statements stay under 2100 parameters and 1000 VALUES rows."""
+    assert MSSQLSink.get_multi_row_size(column_count) == rows
+
+
+def test_multi_row_values_chunks_under_the_parameter_limit() -> None:
+    """Each INSERT carries whole rows and fewer than 2100 parameters."""
+    report = run_benchmark("wide", 25, {"insert_method": "multi_row_values"})
+    inserts = [
+        statement
+        for statement in fake_dbapi.statement_log.last_statements
+        if statement.startswith("INSERT INTO")
+    ]
+
+    assert report["rows_written"] == 25
+    # 201 columns fit 10 rows to a statement
+    assert [statement.count("), (") + 1 for statement in inserts] == [10, 10, 5]
+    assert [statement.count("%s") for statement in inserts] == [2010, 2010, 1005]
+
+
+
+def test_pymssql_row_inserts_are_packed_into_multi_row_statements() -> None:
+    """pymssql's executemany is a round trip per row, so rows go out many to a statement."""
+    report = run_benchmark("narrow", 1500, {"insert_method": "insert"})
+
+    assert report["rows_written"] == 1500
+    assert report["statements"] < 20
+
+def test_preprocess_column_leaves_binary_values_alone() -> None:
+    """Only base64 strings are decoded, bytes from Parquet or Arrow are kept."""
+    with fake_dbapi.installed():
+        target = BenchmarkTarget(config=BENCHMARK_CONFIG)
+        sink = target.get_sink("bench_binary", schema=get_schema("binary"), key_properties=["id"])
+
+        assert sink.preprocess_column("payload", [b"\x00\xff", "AP8=", None]) == [b"\x00\xff", b"\x00\xff", None]
+
+
+@pytest.fixture
+def server_filled_sink() -> t.Iterator[MSSQLSink]:
+    """Return a sink whose table has identity, DEFAULT and computed columns."""
+    with fake_dbapi.installed():
+        target = BenchmarkTarget(config={**BENCHMARK_CONFIG, "insert_method": "tvp"})
+        sink = target.get_sink("bench_filled", schema=get_schema("narrow"), key_properties=["id"])
+        sink._target_table = sa.Table(  # noqa: SLF001
+            "bench_filled",
+            sa.MetaData(),
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("row_id", sa.BigInteger(), sa.Identity()),
+            sa.Column("name", sa.Unicode(100)),
+            sa.Column("loaded_at", sa.DateTime(), server_default=sa.text("(getdate())")),
+            sa.Column("updated_at", sa.DateTime()),
+            sa.Column("name_length", sa.Integer(), sa.Computed("len([name])")),
+        )
+        yield sink
+
+
+def test_table_type_and_tvp_insert_leave_out_server_filled_columns(server_filled_sink: MSSQLSink) -> None:
+    """The TVP carries only the columns the stream sends values for."""
+    table = server_filled_sink.target_table
+    insertable = [column.name for column in server_filled_sink.get_insertable_columns()]
+
+    assert insertable == ["id", "name", "updated_at"]
+    assert server_filled_sink.use_positional_rows
+    assert server_filled_sink.get_tvp_insert_sql(mssql.dialect(), table) == (
+        "INSERT INTO bench_filled (id, name, updated_at) SELECT id, name, updated_at FROM ?"
+    )
+    rows = server_filled_sink.records_to_rows(mssql.dialect(), [{"id": 1, "name": "a"}])
+    assert rows == [(1, "a", None)]
+
+
+def test_identity_values_from_the_stream_keep_the_sqlalchemy_insert(server_filled_sink: MSSQLSink) -> None:
+    """A stream that sends its own identity values isn't sent as row tuples."""
+    server_filled_sink.schema["properties"]["row_id"] = {"type": ["integer", "null"]}
+
+    assert "row_id" in [column.name for column in server_filled_sink.get_insertable_columns()]
+    assert not server_filled_sink.use_positional_rows
+
+
+@pytest.mark.parametrize("insert_method", ["multi_row_values", "bulk_copy", "insert"])
+def test_identity_and_default_columns_are_left_out_of_row_inserts(
+    monkeypatch: pytest.MonkeyPatch,
+    insert_method: str,
+) -> None:
+    """Row inserts name only the columns the stream sends, never the server-filled ones."""
+    get_table_columns = BenchmarkConnector.get_table_columns
+
+    def with_server_filled_columns(self: BenchmarkConnector, *args: t.Any, **kwargs: t.Any) -> dict[str, sa.Column]:
+        columns = get_table_columns(self, *args, **kwargs)
+        columns["row_id"] = sa.Column("row_id", sa.BigInteger(), sa.Identity())
+        columns["loaded_at"] = sa.Column("loaded_at", sa.DateTime(), server_default=sa.text("(getdate())"))
+        return columns
+
+    monkeypatch.setattr(BenchmarkConnector, "get_table_columns", with_server_filled_columns)
+    parameter_counts: list[int] = []
+    fake_dbapi.statement_log.reject = lambda parameters: (
+        parameter_counts.append(len(parameters)) if isinstance(parameters, tuple) else None
+    )
+    report = run_benchmark("narrow", 20, {"insert_method": insert_method})
+
+    inserts = [
+        statement
+        for statement in fake_dbapi.statement_log.last_statements
+        if statement.startswith("INSERT INTO")
+    ]
+    assert report["rows_written"] == 20
+    assert inserts
+    assert all(statement.startswith("INSERT INTO bench_narrow (id, name, updated_at) VALUES") for statement in inserts)
+    assert sum(parameter_counts) == 20 * 3
+
+
+@pytest.mark.parametrize(
+    ("table_storage", "columnstore", "max_size"),
+    [
+        ({"columnstore": True}, False, 180_000),
+        (None, True, 204_800),
+        ({"columnstore": True}, True, 204_800),
+    ],
+)
+def test_batches_are_rounded_to_rowgroups_on_columnstore_tables(
+    table_storage: dict | None,
+    columnstore: bool,  # noqa: FBT001
+    max_size: int,
+) -> None:
+    """Only a table that really is a clustered columnstore gets rowgroup sized batches."""
+    fake_dbapi.statement_log.columnstore = columnstore
+    with fake_dbapi.installed():
+        target = BenchmarkTarget(
+            config={**BENCHMARK_CONFIG, "batch_size_rows": 180_000, "table_storage": table_storage},
+        )
+        sink = target.get_sink("bench_columnstore", schema=get_schema("narrow"), key_properties=["id"])
+
+        assert sink.max_size == max_size
+
+
+@pytest.mark.parametrize(("persistent_connection", "extra_checkouts"), [(True, 0), (False, 2 * 9)])
+def test_persistent_connection_checks_out_once_per_stream(
+    persistent_connection: bool,  # noqa: FBT001
+    extra_checkouts: int,
+) -> None:
+    """A stream's session keeps its connection across drains instead of checking it out again."""
+    checkouts: list[int] = []
+
+    def count_checkouts(*args: t.Any) -> None:  # noqa: ARG001
+        checkouts[-1] += 1
+
+    sa.event.listen(sa.pool.Pool, "checkout", count_checkouts)
+    try:
+        for records in (50, 500):
+            checkouts.append(0)
+            run_benchmark(
+                "narrow",
+                records,
+                {"persistent_connection": persistent_connection, "batch_size_rows": 50},
+                streams=2,
+            )
+    finally:
+        sa.event.remove(sa.pool.Pool, "checkout", count_checkouts)
+
+    # One drain per stream, then ten per stream
+    assert checkouts[1] - checkouts[0] == extra_checkouts